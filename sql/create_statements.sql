@@ -49,13 +49,13 @@ CREATE TABLE airport_lab.flights (
 DROP TABLE IF EXISTS airport_lab.problems CASCADE;
 CREATE TABLE airport_lab.problems (
     problem_id SERIAL PRIMARY KEY,
-    problem_type varchar(255) NOT NULL
+    problem_type varchar(255) NOT NULL UNIQUE -- filled with ON CONFLICT DO NOTHING, so filling again adds nothing
 ); 
 
 DROP TABLE IF EXISTS airport_lab.flight_statuses CASCADE;
 CREATE TABLE airport_lab.flight_statuses (
     flight_status_id SERIAL PRIMARY KEY,
-    flight_status_type varchar(255) NOT NULL
+    flight_status_type varchar(255) NOT NULL UNIQUE
 ); 
 
 DROP TABLE IF EXISTS airport_lab.flight_data CASCADE;
@@ -126,13 +126,13 @@ CREATE TABLE airport_lab.bookings (
 DROP TABLE IF EXISTS airport_lab.subsystems CASCADE;
 CREATE TABLE airport_lab.subsystems (
     subsystem_id SERIAL PRIMARY KEY,
-    subsystem_type varchar(255) NOT NULL
+    subsystem_type varchar(255) NOT NULL UNIQUE
 ); 
 
 DROP TABLE IF EXISTS airport_lab.maintenance_types CASCADE;
 CREATE TABLE airport_lab.maintenance_types (
     maintenance_type_id SERIAL PRIMARY KEY,
-    maintenance_type_name varchar(255) NOT NULL
+    maintenance_type_name varchar(255) NOT NULL UNIQUE
 ); 
 
 DROP TABLE IF EXISTS airport_lab.maintenance_events CASCADE;
@@ -144,6 +144,8 @@ CREATE TABLE airport_lab.maintenance_events (
     airport_id VARCHAR(3) NOT NULL,
     subsystem_id INT NOT NULL,
     maintenance_type_id INT NOT NULL,
+    -- start to end of the maintenance, both inclusive, checked by the check_aircraft_maintenance trigger
+    maintenance_window TSRANGE GENERATED ALWAYS AS (tsrange(maintenance_starttime, maintenance_starttime + duration, '[]')) STORED,
     CONSTRAINT fk_aircraft_registration_number
         FOREIGN KEY (aircraft_registration_number) REFERENCES airport_lab.aircrafts (aircraft_registration_number),
     CONSTRAINT fk_airport_id
@@ -154,6 +156,8 @@ CREATE TABLE airport_lab.maintenance_events (
         FOREIGN KEY (maintenance_type_id) REFERENCES airport_lab.maintenance_types (maintenance_type_id)
 ); 
 
+CREATE INDEX maintenance_events_window_idx ON airport_lab.maintenance_events USING GIST (maintenance_window);
+
 DROP TABLE IF EXISTS airport_lab.aircraft_slots CASCADE;
 CREATE TABLE airport_lab.aircraft_slots (
     aircraft_slot_id SERIAL PRIMARY KEY,
@@ -223,15 +227,26 @@ CREATE TABLE airport_lab.customer_feedback_and_survey
 (
     customer_id INT,
     customer_feedback_and_survey_data JSON,
+    -- survey_date of the data, written with it so every row is routed to the partition of its month
+    survey_date DATE NOT NULL,
     CONSTRAINT fk_customer_references_customer_id 
         FOREIGN KEY (customer_id) REFERENCES airport_lab.customers(customer_id)
-);
+) PARTITION BY RANGE (survey_date);
+
+-- monthly partitions are created by the ORM, rows of other months land here
+CREATE TABLE airport_lab.customer_feedback_and_survey_default
+    PARTITION OF airport_lab.customer_feedback_and_survey DEFAULT;
 
+-- same columns as customer_feedback_and_survey plus archived_at, so old partitions of it can be attached here
 DROP TABLE IF EXISTS airport_lab.feedback_archive;
 CREATE TABLE airport_lab.feedback_archive (
-	customer_id INT NOT NULL,
+	customer_id INT,
     CONSTRAINT fk_customer_id
         FOREIGN KEY (customer_id) REFERENCES airport_lab.customers (customer_id),
-    customer_feedback_and_survey_data JSONB NOT NULL,
+    customer_feedback_and_survey_data JSON,
+    survey_date DATE NOT NULL,
     archived_at TIMESTAMP DEFAULT NOW()
-);
\ No newline at end of file
+) PARTITION BY RANGE (survey_date);
+
+CREATE TABLE airport_lab.feedback_archive_default
+    PARTITION OF airport_lab.feedback_archive DEFAULT;
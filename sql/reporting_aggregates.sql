@@ -0,0 +1,123 @@
+/*
+Summary tables of the report queries Q6, Q10, Q11 and Q12 of section_A.sql.
+
+Instead of aggregating the join of bookings, flight_data and flights on every call, the totals are kept per
+flight, per month and per customer. Statement triggers on bookings aggregate the rows of every INSERT, UPDATE,
+DELETE or COPY statement from its transition tables and add them to the totals, so a bulk insert costs one
+grouped upsert per summary instead of one per row. Q11 counts the bookings of a flight by flight_id, its totals
+are the ones of flight_revenue.
+*/
+
+DROP TABLE IF EXISTS airport_lab.flight_revenue;
+CREATE TABLE airport_lab.flight_revenue (
+    flight_id INT NOT NULL PRIMARY KEY,
+    total_revenue NUMERIC NOT NULL,
+    total_bookings BIGINT NOT NULL,
+    paid_bookings BIGINT NOT NULL,
+    unpaid_bookings BIGINT NOT NULL
+);
+
+DROP TABLE IF EXISTS airport_lab.monthly_bookings;
+CREATE TABLE airport_lab.monthly_bookings (
+    booking_month DATE NOT NULL PRIMARY KEY, -- first day of the month
+    total_bookings BIGINT NOT NULL,
+    total_revenue NUMERIC NOT NULL
+);
+
+DROP TABLE IF EXISTS airport_lab.customer_spend;
+CREATE TABLE airport_lab.customer_spend (
+    customer_id INT NOT NULL PRIMARY KEY,
+    total_bookings BIGINT NOT NULL,
+    total_flying_time INTERVAL NOT NULL,
+    total_money_spent NUMERIC NOT NULL
+);
+
+DROP TRIGGER IF EXISTS maintain_booking_summaries_insert ON airport_lab.bookings;
+DROP TRIGGER IF EXISTS maintain_booking_summaries_update ON airport_lab.bookings;
+DROP TRIGGER IF EXISTS maintain_booking_summaries_delete ON airport_lab.bookings;
+DROP FUNCTION IF EXISTS maintain_booking_summaries;
+
+CREATE OR REPLACE FUNCTION maintain_booking_summaries()
+RETURNS TRIGGER AS $$
+DECLARE
+    source RECORD;
+BEGIN
+    -- new rows are added, old rows subtracted, an update does both
+    FOR source IN
+        SELECT name, sign FROM (VALUES ('new_bookings', 1), ('old_bookings', -1)) AS sources (name, sign)
+        WHERE (name = 'new_bookings' AND TG_OP <> 'DELETE') OR (name = 'old_bookings' AND TG_OP <> 'INSERT')
+    LOOP
+        EXECUTE format($summary$
+            INSERT INTO airport_lab.flight_revenue AS summary (flight_id, total_revenue, total_bookings, paid_bookings, unpaid_bookings)
+            SELECT
+                flight_id,
+                $1 * SUM(CASE WHEN payment_status THEN price ELSE 0 END),
+                $1 * COUNT(*),
+                $1 * SUM(CASE WHEN payment_status THEN 1 ELSE 0 END),
+                $1 * SUM(CASE WHEN NOT payment_status THEN 1 ELSE 0 END)
+            FROM %I
+            GROUP BY flight_id
+            ON CONFLICT (flight_id) DO UPDATE SET
+                total_revenue = summary.total_revenue + EXCLUDED.total_revenue,
+                total_bookings = summary.total_bookings + EXCLUDED.total_bookings,
+                paid_bookings = summary.paid_bookings + EXCLUDED.paid_bookings,
+                unpaid_bookings = summary.unpaid_bookings + EXCLUDED.unpaid_bookings
+        $summary$, source.name) USING source.sign;
+
+        EXECUTE format($summary$
+            INSERT INTO airport_lab.monthly_bookings AS summary (booking_month, total_bookings, total_revenue)
+            SELECT
+                date_trunc('month', booking_date_and_time)::DATE,
+                $1 * COUNT(*),
+                $1 * SUM(price)
+            FROM %I
+            GROUP BY 1
+            ON CONFLICT (booking_month) DO UPDATE SET
+                total_bookings = summary.total_bookings + EXCLUDED.total_bookings,
+                total_revenue = summary.total_revenue + EXCLUDED.total_revenue
+        $summary$, source.name) USING source.sign;
+
+        -- flying time is read from the flight of the booking, like the joins of Q12
+        EXECUTE format($summary$
+            INSERT INTO airport_lab.customer_spend AS summary (customer_id, total_bookings, total_flying_time, total_money_spent)
+            SELECT
+                b.customer_id,
+                $1 * COUNT(*),
+                $1 * SUM(f.flight_length),
+                $1 * SUM(b.price)
+            FROM %I b
+            JOIN airport_lab.flight_data fd ON b.flight_id = fd.flight_id
+            JOIN airport_lab.flights f ON fd.flight_number = f.flight_number
+            GROUP BY b.customer_id
+            ON CONFLICT (customer_id) DO UPDATE SET
+                total_bookings = summary.total_bookings + EXCLUDED.total_bookings,
+                total_flying_time = summary.total_flying_time + EXCLUDED.total_flying_time,
+                total_money_spent = summary.total_money_spent + EXCLUDED.total_money_spent
+        $summary$, source.name) USING source.sign;
+    END LOOP;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- transition tables allow one event per trigger
+CREATE TRIGGER maintain_booking_summaries_insert
+AFTER INSERT
+ON airport_lab.bookings
+REFERENCING NEW TABLE AS new_bookings
+FOR EACH STATEMENT
+EXECUTE FUNCTION maintain_booking_summaries();
+
+CREATE TRIGGER maintain_booking_summaries_update
+AFTER UPDATE
+ON airport_lab.bookings
+REFERENCING OLD TABLE AS old_bookings NEW TABLE AS new_bookings
+FOR EACH STATEMENT
+EXECUTE FUNCTION maintain_booking_summaries();
+
+CREATE TRIGGER maintain_booking_summaries_delete
+AFTER DELETE
+ON airport_lab.bookings
+REFERENCING OLD TABLE AS old_bookings
+FOR EACH STATEMENT
+EXECUTE FUNCTION maintain_booking_summaries();
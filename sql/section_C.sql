@@ -2,48 +2,89 @@
 T1
 
 To implement such trigger, we need to compare aircraft registration numbers from flight_data table
-and aircarft from maintance event. Using BETWEEN with start time of mainternace event and its duration,
-we can check whether it overlaps with departure time of a flight
+and aircarft from maintance event. The departure of a flight must not lie in the maintenance window
+(maintenance_window, start time to start time + duration) of its aircraft. The trigger runs once per
+statement on the transition table of the inserted or updated rows, so a bulk insert is checked with
+a single join served by the GiST index on maintenance_window instead of one scan per row. Updates are only
+checked for the flights whose aircraft or departure changed, booking a seat updates available_seating only
 */
 
--- deleting trigger and function if it exists
+-- deleting triggers and function if they exist
 DROP TRIGGER IF EXISTS check_aircraft_maintenance ON airport_lab.flight_data ;
+DROP TRIGGER IF EXISTS check_aircraft_maintenance_update ON airport_lab.flight_data ;
 DROP FUNCTION IF EXISTS check_maintenance_schedule;
 
 CREATE OR REPLACE FUNCTION check_maintenance_schedule()
 RETURNS TRIGGER AS $$
+DECLARE
+    aircrafts TEXT;
+    conflicts TEXT;
+    changed INT[];
 BEGIN
-    IF EXISTS (
-        SELECT 1
-        FROM airport_lab.maintenance_events
-        WHERE NEW.aircraft_registration_number = maintenance_events.aircraft_registration_number
-          -- checking if it oveplaps
-          AND (NEW.scheduled_departure_date + NEW.scheduled_departure_time) BETWEEN maintenance_events.maintenance_starttime
-                                                                               AND (maintenance_events.maintenance_starttime + maintenance_events.duration)
-    ) THEN
---raising an exception 
-        RAISE EXCEPTION 'Aircraft % is scheduled for maintenance during the flight period.',
-                        NEW.aircraft_registration_number;
+    IF TG_OP = 'UPDATE' THEN
+        SELECT array_agg(new_flights.flight_id)
+        INTO changed
+        FROM new_flights
+        LEFT JOIN old_flights ON old_flights.flight_id = new_flights.flight_id
+        WHERE old_flights.flight_id IS NULL
+           OR (new_flights.aircraft_registration_number, new_flights.scheduled_departure_date, new_flights.scheduled_departure_time)
+              IS DISTINCT FROM
+              (old_flights.aircraft_registration_number, old_flights.scheduled_departure_date, old_flights.scheduled_departure_time);
+
+        IF changed IS NULL THEN
+            RETURN NULL;
+        END IF;
     END IF;
 
-    RETURN NEW;
+    SELECT
+        string_agg(DISTINCT new_flights.aircraft_registration_number::TEXT, ', '),
+        string_agg(
+            format('flight %s of aircraft %s departs during maintenance %s (%s)',
+                   new_flights.flight_id, new_flights.aircraft_registration_number,
+                   maintenance_events.maintenance_id, maintenance_events.maintenance_window),
+            E'\n' ORDER BY new_flights.flight_id, maintenance_events.maintenance_id
+        )
+    INTO aircrafts, conflicts
+    FROM new_flights
+    JOIN airport_lab.maintenance_events
+      ON new_flights.aircraft_registration_number = maintenance_events.aircraft_registration_number
+     -- checking if it oveplaps
+     AND maintenance_events.maintenance_window @> (new_flights.scheduled_departure_date + new_flights.scheduled_departure_time)
+    WHERE TG_OP = 'INSERT' OR new_flights.flight_id = ANY(changed);
+
+    IF conflicts IS NOT NULL THEN
+--raising an exception listing every conflicting row
+        RAISE EXCEPTION 'Aircraft % is scheduled for maintenance during the flight period.', aircrafts
+            USING DETAIL = conflicts;
+    END IF;
+
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
--- trigger to check before inserting
+-- triggers to check after inserting and updating, transition tables allow one event per trigger
 CREATE TRIGGER check_aircraft_maintenance
-BEFORE INSERT OR UPDATE
-ON airport_lab.flight_data 
-FOR EACH ROW
+AFTER INSERT
+ON airport_lab.flight_data
+REFERENCING NEW TABLE AS new_flights
+FOR EACH STATEMENT
+EXECUTE FUNCTION check_maintenance_schedule();
+
+CREATE TRIGGER check_aircraft_maintenance_update
+AFTER UPDATE
+ON airport_lab.flight_data
+REFERENCING OLD TABLE AS old_flights NEW TABLE AS new_flights
+FOR EACH STATEMENT
 EXECUTE FUNCTION check_maintenance_schedule();
 
 
 /*
 T2
 
-To implement this trigger, we can firstly check if any feedbacks which are present in table are old enough to also be deleted and 
-placed in archive Then, we check if feedback which is trying to be inserted is old enough to be placed in archive straight away, if it is 
-moved to archive, warning is raised
+To implement this trigger, we check if feedback which is trying to be inserted is old enough to be placed in archive straight away,
+if it is moved to archive, warning is raised. survey_date is a column of its own, so this is a check of the new row only. Feedback
+that gets old after it was inserted is archived by detaching its monthly partition and attaching it to the (also partitioned)
+archive, see PostgresORM.archive_feedback, instead of scanning the whole table on every insert
 */
 
 -- deleting trigger and function if it exists
@@ -54,28 +95,13 @@ DROP FUNCTION IF EXISTS archive_old_feedback;
 CREATE OR REPLACE FUNCTION archive_old_feedback()
 RETURNS TRIGGER AS $$
 BEGIN
-    -- inserting to arhive
-    INSERT INTO airport_lab.feedback_archive (customer_id, customer_feedback_and_survey_data, archived_at)
-    SELECT 
-        customer_id, 
-        customer_feedback_and_survey_data, 
-        NOW()
-    FROM 
-        airport_lab.customer_feedback_and_survey
-    WHERE 
-        (customer_feedback_and_survey_data->>'survey_date')::DATE < NOW() - INTERVAL '2 years';
-
-    -- deleting existing old feedbacks
-    DELETE FROM airport_lab.customer_feedback_and_survey
-    WHERE 
-        (customer_feedback_and_survey_data->>'survey_date')::DATE < NOW() - INTERVAL '2 years';
-
     -- checking if new feedback is old enough to move it to archive
-    IF (NEW.customer_feedback_and_survey_data->>'survey_date')::DATE < NOW() - INTERVAL '2 years' THEN
-        INSERT INTO airport_lab.feedback_archive (customer_id, customer_feedback_and_survey_data, archived_at)
+    IF NEW.survey_date < NOW() - INTERVAL '2 years' THEN
+        INSERT INTO airport_lab.feedback_archive (customer_id, customer_feedback_and_survey_data, survey_date, archived_at)
         VALUES (
             NEW.customer_id,
             NEW.customer_feedback_and_survey_data,
+            NEW.survey_date,
             NOW()
         );
         
@@ -91,10 +117,9 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
--- creating trigger that will run before inserting
+-- creating trigger that will run before inserting, it is cloned to every partition
 CREATE TRIGGER archive_old_feedback_trigger
 BEFORE INSERT
 ON airport_lab.customer_feedback_and_survey
 FOR EACH ROW
 EXECUTE FUNCTION archive_old_feedback();
-
@@ -71,12 +71,12 @@ For testing purposes, we are creating two types of feedbacks, one of which will
 inserted into main feedback table, and second one will be inserted to archive
 */
 -- adding old feedback that will be moved to archive
-INSERT INTO airport_lab.customer_feedback_and_survey (customer_id, customer_feedback_and_survey_data)
+INSERT INTO airport_lab.customer_feedback_and_survey (customer_id, customer_feedback_and_survey_data, survey_date)
 VALUES 
-(1, '{"survey_date": "2020-01-01", "rating": 3, "comments": "Satisfactory"}');
+(1, '{"survey_date": "2020-01-01", "rating": 3, "comments": "Satisfactory"}', '2020-01-01');
 
 -- adding new and fresh feedback that will be saved to main feedback table
-INSERT INTO airport_lab.customer_feedback_and_survey (customer_id, customer_feedback_and_survey_data)
+INSERT INTO airport_lab.customer_feedback_and_survey (customer_id, customer_feedback_and_survey_data, survey_date)
 VALUES 
-(1, '{"survey_date": "2024-01-01", "rating": 5, "comments": "Excellent"}');
+(1, '{"survey_date": "2024-01-01", "rating": 5, "comments": "Excellent"}', '2024-01-01');
 
@@ -16,30 +16,7 @@ orm = PostgresORM(
     schema_name=SCHEMA_NAME
 )
 
-filling_order = (
-    "customers",
-    "airlines",
-    "airports",
-    "flights",
-    "reporteurs",
-    "aircrafts",
-    "flight_statuses",
-    "problems",
-    "flight_data",
-    "seat_classes",
-    "seats",
-    "bookings",
-    "subsystems",
-    "maintenance_types",
-    "maintenance_events",
-    "aircraft_slots",
-    "work_orders",
-    "customer_preferences",
-    "aircraft_maintenance_logs",
-    "customer_feedback_and_survey",
-)
-
-for table in filling_order:
-    result = orm.fill_table(table=table, fillings=100)
+# tables are filled in the order of their foreign keys, independent tables at the same time
+results = orm.fill_tables_parallel(fillings=100, workers=8)
 
 orm.fill_frequent_flyers()
\ No newline at end of file
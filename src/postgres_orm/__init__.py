@@ -1,13 +1,132 @@
+import json
+import os
+import shutil
+import tempfile
 import psycopg2
-from datetime import datetime, timedelta
+import numpy as np
+from datetime import date, datetime, time, timedelta
 from faker import Faker
 import psycopg2._psycopg
-from psycopg2.extras import Json
-
-from random import random
+from psycopg2.extras import Json, NamedTupleCursor
+from functools import partial
+from itertools import count
+from time import perf_counter
+from queue import Queue
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from .copy_stream import build_copy_buffer
+from .aggregates import AGGREGATE_FILE, AGGREGATE_QUERIES, AGGREGATE_TABLES, REBUILD_AGGREGATES
+from .checkpoints import (
+    ADVANCE_CHECKPOINT,
+    CHECKPOINT_TABLE,
+    COMPLETE_CHECKPOINT,
+    CONFLICT_CHECKPOINT,
+    CREATE_CHECKPOINT_TABLE,
+    START_CHECKPOINT
+)
+from .constraints import (
+    CREATE_SUSPENDED_TABLE,
+    ENABLED_TRIGGERS,
+    FOREIGN_KEYS,
+    SUSPENDED_TABLE,
+    TRIGGER_CATCH_UPS,
+    TRIGGER_CHECKS,
+    violations_query
+)
+from .dataset import DATASET_CACHE_DIR, dataset_key, dump_table, is_dataset, load_table, read_manifest, write_manifest
+from .generator import TABLE_COLUMNS, RowPlan, complete_spec, primary_key
+from .indexes import INDEX_PACK, create_index_statement, drop_index_statement, index_table
+from .instrumentation import CONNECTION_COUNTERS, CountingConnection, metrics_to_prometheus
+from .jsonb import JSONB_COLUMNS, JSONB_QUERY_FILE, jsonb_migration
+from .key_pool import KEY_RUNS, KEY_SAMPLE, KEY_SAMPLE_SIZE, KeyPool, KeyRange, KeyRanges
+from .partitions import (
+    ARCHIVE_TABLE,
+    FEEDBACK_TABLE,
+    PARTITIONS,
+    archive_cutoff,
+    months_between,
+    next_month,
+    partition_month,
+    partition_name
+)
+from .pipeline import ChunkPipeline, chunked
+from .plans import find_regressions, summarize_explain
+from .prepared import batch_size, execute_statement, prepare_insert_statement
+from .queries import REPORT_QUERY_FILES, parse_query_file, read_sql_file
+from .scale import conflict_rows, scaled_rows
+from .seat_allocator import (
+    ADD_FLIGHT_SEATS,
+    BOOK_SEATS,
+    FREE_SEAT_COUNT,
+    FREE_SEATS,
+    SEAT_PAGE_FLIGHTS,
+    AllocatedSeats,
+    PagedSeatAllocator,
+    SeatAllocator
+)
+from .server_side import SERVER_SIDE_FILLS
+from .sharding import SHARDED_TABLES, split_blocks, write_shard
+from .specs import SLOT_TYPES, TABLE_SPECS
+from .value_pools import ValuePools
+from .vectorized import ColumnGenerator, bookings_rows, flight_data_rows
+
+WRITE_MODES = ("insert", "copy", "prepared")
+METRICS_FORMATS = ("json", "prometheus")
+COMMIT_POLICIES = ("row", "batch", "table", "run")
+# "client" generates the rows in python, "server" runs SERVER_SIDE_FILLS inside Postgres where possible
+FILL_STRATEGIES = ("client", "server")
+
+# lookup values, shared by the client side fill methods and SERVER_SIDE_FILLS
+FLIGHT_STATUSES = ("Cancelled", "Delayed", "On-time")
+PROBLEM_TYPES = (
+    "Everything Ok",
+    "Engine Failure",
+    "Avionics Issue",
+    "Fuel System Leak",
+    "Hydraulic Failure",
+    "Tire Damage",
+    "Wing Deformity",
+    "Sensor Malfunction",
+    "Landing Gear Issue",
+    "Cabin Pressure Problem",
+    "Electrical System Issue"
+)
+SUBSYSTEM_TYPES = ("Engine", "Avionics", "Hydraulics", "Landing Gear", "Fuel System", "Electrical System")
+MAINTENANCE_TYPE_NAMES = ("Routine Check", "Engine Repair", "Scheduled Maintenance", "Emergency Repair", "Software Update")
+SEAT_ROWS = 40
+SEAT_LETTERS = ("A", "B", "C", "D", "E", "F")
+
+# tables that are only written by triggers and have no fill method of their own
+TRIGGER_FILLED_TABLES = ("feedback_archive",)
+# bookkeeping tables of the ORM itself, they are neither filled nor dumped
+CONTROL_TABLES = (SUSPENDED_TABLE, CHECKPOINT_TABLE, *AGGREGATE_TABLES)
+# dependencies of fill methods that are not foreign keys, __fill_maintenance_events also inserts conflicting
+# flight_data rows, with their flight numbers, statuses and problems, after the flight_data fill: the conflict
+# trigger can not see the rows of a flight_data fill running in another transaction. seats follows it, so the
+# conflicting flights get their seats as well.
+FILL_DEPENDENCIES = {
+    "maintenance_events": {"flights", "flight_statuses", "problems", "flight_data"},
+    "seats": {"maintenance_events"}
+}
+
+# key pools the vectorized generators of a table draw from, pool name -> (table, key column);
+# tables generated from a spec draw from the pools of its key columns
+POOL_SOURCES = {
+    "seats": {
+        "flight_data": ("flight_data", "flight_id"),
+        "seat_classes": ("seat_classes", "seat_number")
+    },
+    # flights and seats of bookings come from a PagedSeatAllocator, see __get_paged_seats
+    "bookings": {
+        "customers": ("customers", "customer_id")
+    }
+}
 
 class PostgresORM:
-    def __init__(self, host: str, port: str, username: str, password: str, db_name: str, schema_name: str):
+    def __init__(self, host: str, port: str, username: str, password: str, db_name: str, schema_name: str,
+                 write_mode: str = "insert", chunk_size: int = 10000,
+                 commit_policy: str = "row", commit_every: int = 1000, itersize: int = 2000,
+                 batch_rows: int = 500, pipeline_depth: int = 2, seed: int = None, reference_time: datetime = None, scale_factor: float = None):
         self.host = host
         self.port = port
         self.username = username
@@ -23,27 +142,161 @@ class PostgresORM:
         self.cursor = self.get_cursor()
         
         self.faker = Faker()
-
-        self.filling_mapper = {
-            table: getattr(self, f'_PostgresORM__fill_{table}')
+        # used by the vectorized generators of the numeric and temporal columns
+        self.rng = np.random.default_rng()
+        # strings of the generated rows, drawn from pools generated once per seed instead of one Faker call per row;
+        # kept in memory until the generators are seeded
+        self.value_pools = ValuePools()
+        # relative dates ("last year", "next week") are drawn around this time instead of the current one when set
+        self.reference_time = reference_time
+        if seed is not None:
+            self.seed_generators(seed, reference_time)
+
+        if write_mode not in WRITE_MODES:
+            raise ValueError(f'Unknown write mode {write_mode}, expected one of {WRITE_MODES}')
+        self.write_mode = write_mode
+        self.chunk_size = chunk_size
+        # rows per EXECUTE of the "prepared" write mode, for databases that do not allow COPY FROM STDIN
+        self.batch_rows = batch_rows
+        # prepared inserts of this session per (table, columns, returning, rows), see __prepare_insert
+        self.__prepared = {}
+        self.__statement_names = count()
+        # chunks generated ahead while the previous ones are written, 0 generates and writes in turns
+        self.pipeline_depth = pipeline_depth
+
+        if commit_policy not in COMMIT_POLICIES:
+            raise ValueError(f'Unknown commit policy {commit_policy}, expected one of {COMMIT_POLICIES}')
+        # "row" commits every row (every chunk for COPY), "batch" every commit_every rows,
+        # "table" once per fill_table call and "run" once per fill_tables call
+        self.commit_policy = commit_policy
+        self.commit_every = commit_every
+        self.__pending_rows = 0
+        self.__row_savepoint = False
+        self.__in_run = False
+        # (run name, table) of the table a named run is filling, see fill_tables
+        self.__checkpoint = None
+        # rows of that table written since its checkpoint was last advanced, None while it is not being written;
+        # the checkpoint is advanced in the transaction that commits the rows, see __commit
+        self.__checkpoint_rows = None
+        # rows done of that table before the run was resumed
+        self.__resumed_rows = 0
+        # called with the keys of every write of __write_rows before it is committed, see __wrote
+        self.__on_write = None
+
+        # rows fetched per round trip by the server-side cursors of the iter_table_* methods
+        self.itersize = itersize
+        self.__cursor_names = count()
+
+        # rows rejected by the database, with the error message, per table
+        self.failed_rows = {}
+        # rows violating the constraints and triggers restored after the last load with deferred constraints
+        self.constraint_violations = {}
+
+        # metrics of the last fill of every table, hooks are called with (table, metrics) after every fill
+        self.metrics = {}
+        self.metric_hooks = []
+        self.__rows_attempted = 0
+        self.__rows_inserted = 0
+        self.__generation_wait = 0.0
+        # counters of the connections of the shards of a sharded fill, added to the ones of the ORM's connection
+        self.__shard_counters = dict.fromkeys(CONNECTION_COUNTERS, 0)
+
+        # rows of every table derived from one number, see get_cardinalities
+        self.scale_factor = scale_factor
+
+        # keys produced by the fill methods, so dependent tables can reuse them; not kept with a scale factor,
+        # so the memory of a fill does not grow with the number of rows
+        self.generated_keys = {}
+        self.keep_generated_keys = scale_factor is None
+        self.__sequences = {}
+
+        # primary keys of the referenced tables, kept in memory for the dependent fill methods
+        self.key_pool = KeyPool()
+
+        # specs of TABLE_SPECS completed from the catalog, compiled once per table
+        self.__plans = {}
+
+        self.filling_mapper = self.__map_fill_methods()
+
+    def __map_fill_methods(self) -> dict:
+        # tables without a fill method of their own are generated from their spec
+        return {
+            table: getattr(self, f'_PostgresORM__fill_{table}', None) or partial(self.__fill_from_spec, table)
             for table in self.get_tables()
         }
 
+    def reload_schema(self) -> None:
+        """
+        Forgets what the ORM read from the schema: the tables to fill, the generation plans, the sequences, the
+        prepared inserts and the key pool. Call it after the tables were dropped or created outside of the ORM.
+        """
+        self.cursor.execute("DEALLOCATE ALL")
+        self.__prepared.clear()
+        self.__plans.clear()
+        self.__sequences.clear()
+        self.key_pool.invalidate()
+        self.filling_mapper = self.__map_fill_methods()
+
+    def get_connection_kwargs(self) -> dict:
+        return {
+            "dbname": self.db_name,
+            "user": self.username,
+            "password": self.password,
+            "host": self.host,
+            "port": self.port
+        }
+
     def get_connection(self) -> psycopg2._psycopg.connection:
         try:
-            connection = psycopg2.connect(
-                dbname=self.db_name,
-                user=self.username,
-                password=self.password,
-                host=self.host,
-                port=self.port
-            )
+            # counts the round trips of every statement, commit and rollback, see CountingConnection
+            connection = psycopg2.connect(**self.get_connection_kwargs(), connection_factory=CountingConnection)
             print(f'Successfully connected to {self.db_name}')
             return connection
         except Exception as e:
             print(e)
             return None
 
+    def clone(self) -> "PostgresORM":
+        """Returns a new ORM with the same settings and metric hooks and its own connection."""
+        orm = PostgresORM(
+            host=self.host,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            db_name=self.db_name,
+            schema_name=self.schema_name,
+            write_mode=self.write_mode,
+            chunk_size=self.chunk_size,
+            commit_policy=self.commit_policy,
+            commit_every=self.commit_every,
+            itersize=self.itersize,
+            batch_rows=self.batch_rows,
+            pipeline_depth=self.pipeline_depth,
+            reference_time=self.reference_time,
+            scale_factor=self.scale_factor
+        )
+        orm.metric_hooks = list(self.metric_hooks)
+        orm.value_pools = self.value_pools
+
+        return orm
+
+    def seed_generators(self, seed: int, reference_time: datetime = None) -> None:
+        """
+        Seeds Faker and numpy, switches to the value pools of the seed and fixes the reference time, so the same
+        fills generate the same rows.
+        """
+        self.faker.seed_instance(seed)
+        self.rng = np.random.default_rng(seed)
+        self.value_pools = ValuePools(seed, self.value_pools.size, self.value_pools.directory)
+        self.reference_time = reference_time
+
+    def __now(self) -> datetime:
+        return self.reference_time or datetime.now()
+
+    def close(self) -> None:
+        self.cursor.close()
+        self.connection.close()
+
     def get_cursor(self) -> psycopg2._psycopg.cursor:
         if self.connection:
             return self.connection.cursor()
@@ -52,294 +305,956 @@ class PostgresORM:
 
     def get_tables(self) -> list[str]:
         try:
-            self.cursor.execute(f"""SELECT table_name FROM information_schema.tables 
-                               WHERE table_schema = '{self.schema_name}'""")
+            # partitions are written and read through their partitioned table
+            self.cursor.execute(
+                """
+                SELECT rel.relname FROM pg_class rel
+                JOIN pg_namespace ns ON ns.oid = rel.relnamespace
+                WHERE ns.nspname = %s AND rel.relkind IN ('r', 'p', 'v', 'f') AND NOT rel.relispartition
+                """,
+                (self.schema_name,)
+            )
             
-            return [table[0] for table in self.cursor.fetchall()]
+            return [table[0] for table in self.cursor.fetchall() if table[0] not in CONTROL_TABLES]
         except Exception as e:
             print(f'Can not get tables from {self.db_name}')
 
     def get_table_entries(self, table: str, column: str) -> list[int]:
-        query = f"SELECT {column} FROM {self.schema_name}.{table}"
-        
-        self.cursor.execute(query)
-        
-        results = self.cursor.fetchall()
-        
-        return [result[0] for result in results]
+        return list(self.iter_table_entries(table, column))
 
     def get_table_content(self, table: str) -> list[dict]:
         try:
-            self.cursor.execute(f"SELECT * FROM {self.schema_name}.{table}")
-
-            columns = [desc[0] for desc in self.cursor.description]
-
-            return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+            return [row._asdict() for row in self.iter_table_content(table)]
         except Exception as e:
             print(f"Error retrieving data from {table}. Error - {e}")
             return []
+
+    def iter_table_content(self, table: str, columns: tuple[str] = None, where: str = None, params: tuple = None,
+                           itersize: int = None, named: bool = True):
+        """
+        Streams the rows of a table through a named server-side cursor, fetching itersize rows per round trip,
+        so reading a table takes constant memory. columns projects the table, where is an SQL condition with
+        %s placeholders for params. Yields named tuples, or plain tuples with named=False.
+        The cursor lives in the current transaction, so committing on this connection ends the scan.
+        """
+        query = f'SELECT {", ".join(columns) if columns else "*"} FROM {self.schema_name}.{table}'
+        if where:
+            query += f' WHERE {where}'
+
+        cursor = self.connection.cursor(
+            name=f'iter_{table}_{next(self.__cursor_names)}',
+            cursor_factory=NamedTupleCursor if named else None
+        )
+        cursor.itersize = itersize or self.itersize
+        try:
+            cursor.execute(query, params)
+            yield from cursor
+        finally:
+            cursor.close()
+
+    def iter_table_entries(self, table: str, column: str, where: str = None, params: tuple = None, itersize: int = None):
+        """Streams the values of one column, see iter_table_content."""
+        for row in self.iter_table_content(table, (column,), where, params, itersize, named=False):
+            yield row[0]
         
-    def __fill_feedback_archive(self, fillings: int) -> bool:
-        pass
-            
-    def __fill_airlines(self, fillings: int) -> bool:
+    def uses_jsonb(self) -> bool:
+        """Whether the JSON documents of the schema were moved to JSONB by use_jsonb."""
+        self.cursor.execute(
+            """
+            SELECT data_type FROM information_schema.columns
+            WHERE table_schema = %s AND table_name = 'customer_preferences' AND column_name = %s
+            """,
+            (self.schema_name, JSONB_COLUMNS["customer_preferences"])
+        )
+        row = self.cursor.fetchone()
+
+        return row is not None and row[0] == "jsonb"
+
+    def get_report_query_files(self) -> tuple[str]:
+        """The files of the report queries written for the storage of the schema, JSON or JSONB."""
+        if self.uses_jsonb():
+            return tuple(JSONB_QUERY_FILE if file_name == "section_B.sql" else file_name for file_name in REPORT_QUERY_FILES)
+
+        return REPORT_QUERY_FILES
+
+    def explain_report_queries(self, query_files: tuple[str] = None, repeats: int = 3,
+                               baseline: str = None, output: str = None, slowdown: float = 2.0) -> dict:
+        """
+        Runs the named queries of the sql files (by default the report queries of get_report_query_files) with
+        EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) and keeps the plan and the timings of every query, the execution
+        time is the median of repeats runs. When a baseline file is given the plans are compared with it and
+        regressions (a new Seq Scan, slowdown times slower) are reported, a missing baseline is created from
+        this run. output stores the run, e.g. as the next baseline.
+        """
+        queries = {}
+        for file_name in query_files or self.get_report_query_files():
+            queries.update(parse_query_file(file_name, self.schema_name))
+
+        summaries = {}
+        for name, query in queries.items():
+            runs = []
+            try:
+                for _ in range(repeats):
+                    self.cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}")
+                    runs.append(summarize_explain(self.cursor.fetchone()[0]))
+            except psycopg2.Error as e:
+                print(f"Can not explain {name}: {str(e).strip()}")
+                continue
+            finally:
+                # EXPLAIN ANALYZE executes the query, nothing of it is kept
+                self.connection.rollback()
+
+            summary = sorted(runs, key=lambda run: run["execution_time"])[len(runs) // 2]
+            summary["execution_times"] = [run["execution_time"] for run in runs]
+            summaries[name] = summary
+
+        regressions = []
+        if baseline and os.path.isfile(baseline):
+            with open(baseline) as file:
+                regressions = find_regressions(json.load(file), summaries, slowdown)
+            for regression in regressions:
+                print(f"Plan regression in {regression}")
+        elif baseline:
+            with open(baseline, "w") as file:
+                json.dump(summaries, file, indent=4)
+            print(f"Saved plan baseline to {baseline}")
+
+        if output:
+            with open(output, "w") as file:
+                json.dump(summaries, file, indent=4)
+
+        return {"queries": summaries, "regressions": regressions}
+
+    def apply_index_pack(self, indexes: tuple[str] = None, concurrently: bool = False, measure: bool = True,
+                         repeats: int = 3) -> dict:
+        """
+        Builds the indexes of INDEX_PACK (by default all of them) and analyzes their tables. Meant to run once
+        after a bulk load, so the fills do not maintain the indexes row by row. concurrently builds them without
+        blocking writes, for a database that is in use. With measure the report queries are explained before and
+        after, and the median execution time of every query is reported.
+        """
+        indexes = indexes or tuple(INDEX_PACK)
+        before = self.explain_report_queries(repeats=repeats)["queries"] if measure else {}
+
+        created = []
+        self.__commit()
+        if concurrently:
+            # CREATE INDEX CONCURRENTLY can not run inside a transaction block
+            self.connection.autocommit = True
         try:
-            for _ in range(fillings):
-                airline_name = f'{self.faker.company()} Air'
-                self.cursor.execute(
-                    f'INSERT INTO {self.schema_name}.airlines (airline_name) VALUES (%s)',
-                    (airline_name,)
-                )
-                self.connection.commit()
-        except Exception as e: 
-            print(e)
+            for name in indexes:
+                started = perf_counter()
+                try:
+                    self.cursor.execute(create_index_statement(name, self.schema_name, concurrently))
+                except psycopg2.Error as e:
+                    print(f"Can not create index {name}: {str(e).strip()}")
+                    if concurrently:
+                        # a failed concurrent build leaves an invalid index behind, which IF NOT EXISTS would keep
+                        self.cursor.execute(drop_index_statement(name, self.schema_name, concurrently))
+                    else:
+                        self.connection.rollback()
+                    continue
+                if not concurrently:
+                    # committed one by one, so a failing index does not roll back the others
+                    self.__commit()
+                created.append(name)
+                print(f"Created index {name} in {perf_counter() - started:.2f} s")
+
+            for table in sorted({index_table(INDEX_PACK[name]) for name in created}):
+                self.cursor.execute(f"ANALYZE {self.schema_name}.{table}")
+        finally:
+            if concurrently:
+                self.connection.autocommit = False
+            else:
+                self.__commit()
+
+        after = self.explain_report_queries(repeats=repeats)["queries"] if measure else {}
+
+        return {"indexes": created, "queries": self.__compare_query_times(before, after)}
+
+    def __compare_query_times(self, before: dict, after: dict) -> dict:
+        """Pairs the summaries of two explain_report_queries runs by query name."""
+        queries = {}
+        for name in sorted(before.keys() & after.keys()):
+            queries[name] = {
+                "before_ms": before[name]["execution_time"],
+                "after_ms": after[name]["execution_time"],
+                "seq_scans_before": before[name]["seq_scans"],
+                "seq_scans_after": after[name]["seq_scans"]
+            }
+            print(f'{name}: {queries[name]["before_ms"]:.2f} ms -> {queries[name]["after_ms"]:.2f} ms')
+
+        return queries
+
+    def use_jsonb(self, measure: bool = True, repeats: int = 3) -> dict:
+        """
+        Moves the JSON documents of customer_preferences, aircraft_maintenance_logs and the feedback tables to
+        JSONB in one transaction, adds stored generated columns for the values JQ1-JQ4 filter on and GIN indexes
+        on the documents, see jsonb.py. The fill methods write the same documents either way. From then on the
+        report queries are read from section_B_jsonb.sql. With measure JQ1-JQ4 are explained before and after,
+        and the median execution time of every query is reported.
+        """
+        if self.uses_jsonb():
+            print(f"The JSON columns of {self.schema_name} are JSONB already")
+            return {"queries": {}}
+
+        before = self.explain_report_queries(query_files=("section_B.sql",), repeats=repeats)["queries"] if measure else {}
 
-            return False
-    
-        return True
-    
-    def occupy_seats(self, seat_ids: list[int]) -> None:
         try:
-            query = f"UPDATE {self.schema_name}.seats SET seat_status = 'Occupied' WHERE seat_id = ANY(%s)"
-            
-            self.cursor.execute(query, (seat_ids,))
-            
-            self.connection.commit()
+            for statement in jsonb_migration(self.schema_name):
+                self.cursor.execute(statement)
+            for table in JSONB_COLUMNS:
+                self.cursor.execute(f"ANALYZE {self.schema_name}.{table}")
+            self.__commit()
+        except Exception as e:
+            print(f"Can not move {self.schema_name} to JSONB: {e}")
+            self.connection.rollback()
 
-            print(f"Successfully updated {len(seat_ids)} seats to 'Occupied' status.")
+            return {"queries": {}}
+
+        after = self.explain_report_queries(query_files=(JSONB_QUERY_FILE,), repeats=repeats)["queries"] if measure else {}
+
+        return {"queries": self.__compare_query_times(before, after)}
+
+    def drop_index_pack(self, indexes: tuple[str] = None, concurrently: bool = False) -> None:
+        """Drops the indexes of INDEX_PACK, e.g. before another bulk load."""
+        self.__commit()
+        if concurrently:
+            self.connection.autocommit = True
+        try:
+            for name in indexes or tuple(INDEX_PACK):
+                self.cursor.execute(drop_index_statement(name, self.schema_name, concurrently))
+        finally:
+            if concurrently:
+                self.connection.autocommit = False
+            else:
+                self.__commit()
+
+    def has_reporting_aggregates(self) -> bool:
+        self.cursor.execute("SELECT to_regclass(%s)", (f"{self.schema_name}.{AGGREGATE_TABLES[0]}",))
+
+        return self.cursor.fetchone()[0] is not None
+
+    def create_reporting_aggregates(self) -> bool:
+        """
+        Creates the summary tables of Q6, Q10, Q11 and Q12 with the triggers on bookings that keep them up to
+        date (sql/reporting_aggregates.sql) and fills them from the bookings already in the table.
+        """
+        try:
+            self.cursor.execute(read_sql_file(AGGREGATE_FILE, self.schema_name))
+            self.cursor.execute(REBUILD_AGGREGATES.format(schema=self.schema_name))
+            self.__commit()
         except Exception as e:
-            print(f"Failed to update seat status: {e}")
+            print(f"Can not create the reporting aggregates: {e}")
+            self.connection.rollback()
 
             return False
-        
-        return True
-    
-    def __fill_seat_classes(self, fillings: int) -> bool:
-        try:
-            rows = range(1, 2)
-            seat_letters = ["A", "B", "C", "D", "E", "F"]
 
-            for row in rows:
-                for letter in seat_letters:
-                    seat_number = f"{row}{letter}"
-                    seat_class =  "Business" if row <= 3 else "First Class" if row <= 6 else "Economy"
+        return True
 
-                    self.cursor.execute(
-                            f"INSERT INTO {self.schema_name}.seat_classes (seat_number, seat_class) VALUES (%s, %s)",
-                            (seat_number, seat_class)
-                        )
-                    
-                    self.connection.commit()
+    def refresh_reporting_aggregates(self) -> bool:
+        """
+        Recomputes the summary tables from bookings. Only needed when they missed changes: TRUNCATE of bookings,
+        changed flight lengths, or a load with the triggers disabled.
+        """
+        try:
+            self.cursor.execute(REBUILD_AGGREGATES.format(schema=self.schema_name))
+            self.__commit()
         except Exception as e:
-            print(f"An error occurred: {e}")
+            print(f"Can not refresh the reporting aggregates: {e}")
+            self.connection.rollback()
 
             return False
-        
+
         return True
 
-    
-    def __fill_seats(self, fillings: int) -> bool:
+    def __read_aggregate(self, query: str, limit: int = None) -> list[dict]:
+        cursor = self.connection.cursor(cursor_factory=NamedTupleCursor)
         try:
-            flight_ids = self.get_table_entries("flight_data", "flight_id")
-            seat_numbers = self.get_table_entries("seat_classes", "seat_number")
+            cursor.execute(AGGREGATE_QUERIES[query].format(schema=self.schema_name), {"limit": limit})
 
-            for flight_id in flight_ids:
-                for seat_number in seat_numbers:
-                    seat_status = "Available"
+            return [row._asdict() for row in cursor.fetchall()]
+        finally:
+            cursor.close()
 
-                    self.cursor.execute(
-                        f"INSERT INTO {self.schema_name}.seats (seat_number, seat_status, flight_id) VALUES (%s, %s, %s)",
-                        (seat_number, seat_status, flight_id)
-                    )
+    def get_flight_revenue(self) -> list[dict]:
+        """Q6 read from the summaries: revenue and paid and unpaid bookings of every flight."""
+        return self.__read_aggregate("Q6")
 
-                    self.connection.commit()
-        except Exception as e:
-            print(f"An error occurred: {e}")
+    def get_monthly_bookings(self) -> list[dict]:
+        """Q10 read from the summaries: bookings and revenue per month."""
+        return self.__read_aggregate("Q10")
 
-            return False
-        
-        return True
-        
-    def __fill_customers(self, fillings: int) -> bool:
+    def get_top_routes(self, limit: int = 5) -> list[dict]:
+        """Q11 read from the summaries: the flights with the most bookings."""
+        return self.__read_aggregate("Q11", limit)
+
+    def get_frequent_flyer_spend(self, limit: int = 5) -> list[dict]:
+        """Q12 read from the summaries: bookings, flying time and money spent of the customers flying the most."""
+        return self.__read_aggregate("Q12", limit)
+
+    def __count_rows(self, table: str) -> int:
+        self.cursor.execute(f"SELECT count(*) FROM {self.schema_name}.{table}")
+
+        return self.cursor.fetchone()[0]
+
+    def __load_key_pool(self, table: str, column: str) -> None:
+        self.cursor.execute(f"SELECT min({column}), max({column}), count(*) FROM {self.schema_name}.{table}")
+        low, high, row_count = self.cursor.fetchone()
+        if isinstance(low, int) and high - low + 1 == row_count:
+            # serial keys without gaps are pooled as their bounds, without reading them
+            self.key_pool.load(table, column, KeyRange(low, high + 1), row_count=row_count)
+            return
+
+        if isinstance(low, int):
+            # serial keys with gaps are pooled as their runs, one row per gap rather than per key
+            self.cursor.execute(
+                KEY_RUNS.format(schema=self.schema_name, table=table, column=column), (KEY_SAMPLE_SIZE + 1,)
+            )
+            runs = self.cursor.fetchall()
+            if len(runs) <= KEY_SAMPLE_SIZE:
+                starts, stops = zip(*runs)
+                self.key_pool.load(table, column, KeyRanges(starts, stops), row_count=row_count)
+                return
+
+        # ordered, so seeded generators draw the same keys however the table is laid out on disk
+        self.cursor.execute(KEY_SAMPLE.format(schema=self.schema_name, table=table, column=column), (KEY_SAMPLE_SIZE,))
+        keys = sorted(row[0] for row in self.cursor.fetchall())
+
+        self.key_pool.load(table, column, keys, row_count=row_count)
+
+    def __get_keys(self, table: str, column: str):
+        """
+        Returns the pooled keys of a table, scanning it only if the pool is missing, no longer current or
+        the row count shows that the table was written to outside of this ORM.
+        """
+        if (
+            not self.key_pool.is_loaded(table, column)
+            or not self.key_pool.is_current(table)
+            or self.key_pool.row_count(table) != self.__count_rows(table)
+        ):
+            self.__load_key_pool(table, column)
+
+        return self.key_pool.keys(table)
+
+    def invalidate_key_pool(self, table: str = None) -> None:
+        self.key_pool.invalidate(table)
+
+    def __get_key_array(self, table: str, column: str):
+        """The pooled keys as a sorted array, or as the KeyRange(s) they are pooled as, which are indexed the same way."""
+        keys = self.__get_keys(table, column)
+        if isinstance(keys, (KeyRange, KeyRanges)):
+            return keys
+
+        # sorted, so a seed draws the same keys whether a pool was scanned or built from inserts
+        return np.sort(np.asarray(keys))
+
+    def __get_pools(self, table: str) -> dict:
+        sources = POOL_SOURCES[table] if table in POOL_SOURCES else self.get_generation_plan(table).key_sources
+
+        return {
+            pool: self.__get_key_array(source, column)
+            for pool, (source, column) in sources.items()
+        }
+
+    def describe_table(self, table: str) -> list[dict]:
+        """
+        The columns of a table from the catalog: type, NOT NULL, generated (e.g. bookings.bonus_miles), serial,
+        other default, primary key and the (table, column) a single column foreign key references.
+        """
+        self.cursor.execute(FOREIGN_KEYS, (self.schema_name, [table]))
+        foreign_keys = [
+            (columns, referenced, referenced_columns)
+            for _, _, _, columns, referenced, referenced_columns in self.cursor.fetchall()
+        ]
+        # foreign keys dropped by suspend_constraints still point to the pools to draw from
+        foreign_keys += [
+            (columns, referenced, referenced_columns)
+            for kind, suspended_table, _, _, columns, referenced, referenced_columns in self.__get_suspended()
+            if kind == "foreign_key" and suspended_table == table
+        ]
+        references = {
+            columns[0]: (referenced, referenced_columns[0])
+            for columns, referenced, referenced_columns in foreign_keys
+            # seat_classes references itself
+            if len(columns) == 1 and referenced != table
+        }
+
+        self.cursor.execute(TABLE_COLUMNS, (self.schema_name, table))
+
+        return [
+            {
+                "name": name,
+                "type": data_type,
+                "not_null": not_null,
+                "generated": generated,
+                "serial": serial,
+                "default": default,
+                "primary_key": is_primary_key,
+                "references": references.get(name)
+            }
+            for name, data_type, not_null, generated, serial, default, is_primary_key in self.cursor.fetchall()
+        ]
+
+    def get_generation_plan(self, table: str) -> RowPlan:
+        """The spec of the table in TABLE_SPECS (none for other tables) completed from the catalog and compiled."""
+        if table not in self.__plans:
+            catalog = self.describe_table(table)
+            self.__plans[table] = RowPlan(
+                complete_spec(table, TABLE_SPECS.get(table, {}), catalog),
+                returning=primary_key(catalog)
+            )
+
+        return self.__plans[table]
+
+    def __fill_from_spec(self, table: str, fillings: int) -> bool:
         try:
-            for _ in range(fillings):
-                name = self.faker.name()
-                email = self.faker.email(domain="google.com")
-                phone_number = self.faker.phone_number()
-                address = self.faker.address()
-                self.cursor.execute(
-                    f'INSERT INTO {self.schema_name}.customers (name, email, phone_number, address) VALUES (%s, %s, %s, %s)',
-                    (name, email, phone_number, address)
-                )
-                self.connection.commit()
+            plan = self.get_generation_plan(table)
+
+            self.__write_rows(
+                table,
+                plan.columns,
+                self.__generate_batches(plan, fillings, self.__get_pools(table)),
+                returning=plan.returning
+            )
         except Exception as e:
-            print(e)
+            print(f"An error occurred: {e}")
 
             return False
-        
+
         return True
-    
-    def __fill_bookings(self, fillings: int) -> bool:
-        occupied_seats = []
-        try:
-            for _ in range(fillings):
-                customer_id = self.faker.random.choice(self.get_table_entries(table="customers", column="customer_id"))
-                flight_id = self.faker.random.choice(self.get_table_entries(table="flight_data", column="flight_id"))
 
-                seat = self.faker.random.choice(self.get_table_entries(table="seats", column="seat_id"))
-                occupied_seats.append(seat)
+    def __get_seat_allocator(self, rng: np.random.Generator, flight_ids: list[int]) -> SeatAllocator:
+        """The free seats of the given flights, see seat_allocator.py."""
+        self.cursor.execute(
+            FREE_SEATS.format(schema=self.schema_name), {"flights": flight_ids, "after": 0, "limit": None}
+        )
 
-                price = round(self.faker.random.uniform(50, 1000), 2)
-                payment_status = self.faker.boolean()
+        return SeatAllocator.from_rows(self.cursor.fetchall(), rng)
 
-                if self.faker.boolean(chance_of_getting_true=50):
-                    booking_datetime = self.faker.date_time_between(start_date="-2y", end_date="now")
-                else: 
-                    booking_datetime = self.faker.date_time_between(start_date="now", end_date="+5d")
+    def __get_paged_seats(self, rng: np.random.Generator, bookings: int) -> PagedSeatAllocator:
+        """
+        The seats of bookings bookings spread over all flights, read a page of flights at a time through the
+        connection of the ORM, so the bookings are written with pipelined=False. See seat_allocator.py.
+        """
+        self.cursor.execute(FREE_SEAT_COUNT.format(schema=self.schema_name))
+        free_seats = int(self.cursor.fetchone()[0])
 
+        def fetch_page(after: int) -> list:
+            self.cursor.execute(
+                FREE_SEATS.format(schema=self.schema_name),
+                {"flights": None, "after": after, "limit": SEAT_PAGE_FLIGHTS}
+            )
+
+            return self.cursor.fetchall()
+
+        return PagedSeatAllocator(fetch_page, free_seats, bookings, rng)
+
+    def __book_seats(self, first_booking: int, last_booking: int) -> None:
+        """Occupies the seats of the given bookings and takes them from the available_seating of their flights."""
+        self.cursor.execute(BOOK_SEATS.format(schema=self.schema_name), {"first": first_booking, "last": last_booking})
+
+    def __book_written_seats(self, booking_ids: list[int]) -> None:
+        """on_write of the bookings: their seats are occupied in the transaction that commits them."""
+        self.__book_seats(min(booking_ids), max(booking_ids))
+
+    def __generate_batches(self, generate, fillings: int, pools: dict):
+        """Yields the rows of a vectorized generator, producing the columns of one chunk at a time."""
+        columns = ColumnGenerator(self.rng, self.__now(), self.faker, self.value_pools)
+        for start in range(0, fillings, self.chunk_size):
+            yield from generate(columns, min(self.chunk_size, fillings - start), pools)
+
+    def __get_sequence(self, table: str, column: str) -> str:
+        if (table, column) not in self.__sequences:
+            self.cursor.execute(
+                "SELECT pg_get_serial_sequence(%s, %s)",
+                (f'{self.schema_name}.{table}', column)
+            )
+            self.__sequences[(table, column)] = self.cursor.fetchone()[0]
+
+        return self.__sequences[(table, column)]
+
+    def __reserve_key_range(self, table: str, column: str, count: int) -> int:
+        """
+        Reserves count consecutive keys of a serial column and returns the first one. The table stays locked
+        against writes until the transaction ends, so no other session draws a key between nextval and setval.
+        """
+        sequence = self.__get_sequence(table, column)
+        # conflicts with the ROW EXCLUSIVE lock of INSERT, COPY and __reserve_keys
+        self.cursor.execute(f"LOCK TABLE {self.schema_name}.{table} IN SHARE ROW EXCLUSIVE MODE")
+        self.cursor.execute("SELECT nextval(%s)", (sequence,))
+        first_key = self.cursor.fetchone()[0]
+        self.cursor.execute("SELECT setval(%s, %s)", (sequence, first_key + count - 1))
+
+        return first_key
+
+    def __reserve_keys(self, table: str, column: str, count: int) -> list[int]:
+        # the lock the following COPY takes anyway, taken before the keys are drawn to wait for a range reservation
+        self.cursor.execute(f"LOCK TABLE {self.schema_name}.{table} IN ROW EXCLUSIVE MODE")
+        self.cursor.execute(
+            "SELECT nextval(%s) FROM generate_series(1, %s)",
+            (self.__get_sequence(table, column), count)
+        )
+
+        return [row[0] for row in self.cursor.fetchall()]
+
+    def __commit(self) -> None:
+        self.__flush_checkpoint()
+        self.connection.commit()
+        self.__pending_rows = 0
+        self.__row_savepoint = False
+
+    def __after_write(self, written: int) -> None:
+        """Applies the commit policy after rows were written."""
+        if self.commit_policy == "row":
+            self.__commit()
+        elif self.commit_policy == "batch":
+            self.__pending_rows += written
+            if self.__pending_rows >= self.commit_every:
+                self.__commit()
+
+    def __record_failed_row(self, table: str, row: tuple, error: Exception) -> None:
+        self.failed_rows.setdefault(table, []).append((row, str(error).strip()))
+        print(f"Skipped row in {table}: {str(error).strip()}")
+
+    def __insert_chunk(self, table: str, columns: tuple, chunk: list[tuple], returning: str = None,
+                       prepared: bool = False) -> list:
+        if prepared:
+            query = execute_statement(self.__prepare_insert(table, columns, returning, 1), len(columns), 1)
+        else:
+            query = (
+                f'INSERT INTO {self.schema_name}.{table} ({", ".join(columns)}) '
+                f'VALUES ({", ".join(["%s"] * len(columns))})'
+            )
+            if returning:
+                query += f' RETURNING {returning}'
+
+        keys = []
+        for row in chunk:
+            if self.commit_policy == "row":
+                statement = query
+            else:
+                # every row runs in its own savepoint, so a failing row does not abort the transaction;
+                # the previous savepoint is released in the same round trip
+                statement = ('RELEASE SAVEPOINT fill_row; ' if self.__row_savepoint else '') + 'SAVEPOINT fill_row; ' + query
+                self.__row_savepoint = True
+
+            try:
+                self.cursor.execute(statement, row)
+            except psycopg2.Error as e:
+                if self.commit_policy == "row":
+                    self.connection.rollback()
+                else:
+                    self.cursor.execute("ROLLBACK TO SAVEPOINT fill_row")
+                self.__record_failed_row(table, row, e)
+                # rejected rows are done as well, a resumed run does not try them again
+                self.__count_done(1)
+                continue
+
+            result = self.cursor.fetchone() if returning else None
+            # triggers returning NULL (e.g. archived feedback) skip the row without an error
+            if result:
+                keys.append(result[0])
+                self.__wrote([result[0]])
+            if result or not returning:
+                self.__rows_inserted += 1
+
+            self.__count_done(1)
+            self.__after_write(1)
+
+        return keys
+
+    def __copy_chunk(self, table: str, columns: tuple, chunk: list[tuple], returning: str = None) -> list:
+        keys = []
+        if returning and returning in columns:
+            position = columns.index(returning)
+            keys = [row[position] for row in chunk]
+        elif returning:
+            # COPY has no RETURNING, so serial keys are drawn from the sequence up front
+            keys = self.__reserve_keys(table, returning, len(chunk))
+            columns = (returning, *columns)
+            chunk = [(key, *row) for key, row in zip(keys, chunk)]
+
+        if self.commit_policy != "row":
+            self.cursor.execute("SAVEPOINT fill_chunk")
+
+        try:
+            self.cursor.copy_expert(
+                f'COPY {self.schema_name}.{table} ({", ".join(columns)}) FROM STDIN',
+                build_copy_buffer(chunk)
+            )
+        except psycopg2.Error as e:
+            if self.commit_policy == "row":
+                self.connection.rollback()
+            else:
+                self.cursor.execute("ROLLBACK TO SAVEPOINT fill_chunk")
+            print(f"COPY into {table} failed ({str(e).strip()}), isolating the bad rows with single inserts")
+
+            # keys are already part of the rows at this point, so the inserts return them as well
+            return self.__insert_chunk(table, columns, chunk, returning)
+
+        if self.commit_policy != "row":
+            self.cursor.execute("RELEASE SAVEPOINT fill_chunk")
+
+        self.__rows_inserted += len(chunk)
+        self.__wrote(keys)
+        self.__count_done(len(chunk))
+        self.__after_write(len(chunk))
+
+        return keys
+
+    def __prepare_insert(self, table: str, columns: tuple, returning: str, rows: int) -> str:
+        """
+        The name of a prepared INSERT of rows rows, prepared on first use. Prepared statements live as long as the
+        session and survive rollbacks, the server parses and plans every statement once.
+        """
+        key = (table, columns, returning, rows)
+        if key not in self.__prepared:
+            name = f'fill_insert_{next(self.__statement_names)}'
+            self.cursor.execute(prepare_insert_statement(name, self.schema_name, table, columns, rows, returning))
+            self.__prepared[key] = name
+
+        return self.__prepared[key]
+
+    def __prepared_chunk(self, table: str, columns: tuple, chunk: list[tuple], returning: str = None) -> list:
+        """
+        Writes a chunk with prepared multi-row INSERTs of batch_rows rows, one round trip per batch instead of one
+        per row. A failing batch is retried row by row to isolate the bad rows, like a failing COPY chunk.
+        """
+        batch_rows = batch_size(self.batch_rows, len(columns))
+
+        keys = []
+        for start in range(0, len(chunk), batch_rows):
+            batch = chunk[start:start + batch_rows]
+            name = self.__prepare_insert(table, columns, returning, len(batch))
+
+            if self.commit_policy != "row":
+                self.cursor.execute("SAVEPOINT fill_chunk")
+
+            try:
                 self.cursor.execute(
-                    f'INSERT INTO {self.schema_name}.bookings (flight_id, customer_id, seat_id, price, payment_status, booking_date_and_time) VALUES (%s, %s, %s, %s, %s, %s)',
-                    (flight_id, customer_id, seat, price, payment_status, booking_datetime)
+                    execute_statement(name, len(columns), len(batch)), [value for row in batch for value in row]
                 )
+            except psycopg2.Error as e:
+                if self.commit_policy == "row":
+                    self.connection.rollback()
+                else:
+                    self.cursor.execute("ROLLBACK TO SAVEPOINT fill_chunk")
+                print(f"Batch insert into {table} failed ({str(e).strip()}), isolating the bad rows with single inserts")
+
+                keys.extend(self.__insert_chunk(table, columns, batch, returning, prepared=True))
+                continue
+
+            # triggers returning NULL (e.g. archived feedback) skip rows without an error
+            inserted = [row[0] for row in self.cursor.fetchall()] if returning else None
+            keys.extend(inserted or [])
+            self.__rows_inserted += len(inserted) if returning else self.cursor.rowcount
+
+            if self.commit_policy != "row":
+                self.cursor.execute("RELEASE SAVEPOINT fill_chunk")
+
+            self.__wrote(inserted)
+            self.__count_done(len(batch))
+            self.__after_write(len(batch))
+
+        return keys
+
+    def __write_rows(self, table: str, columns: tuple, rows, returning: str = None, collect: bool = None,
+                     pipelined: bool = True, checkpointed: bool = None, on_write=None) -> list:
+        """
+        Writes generated rows to a table chunk by chunk, with one INSERT per row, streamed through COPY FROM STDIN
+        or with prepared multi-row INSERTs depending on write_mode. Generated rows are chunked in a producer
+        thread, at most pipeline_depth chunks ahead of the writer, see ChunkPipeline; rows read from the connection
+        of the ORM are written with pipelined=False. Returns the values of the returning column for the written
+        rows, if collect (by default unless a scale factor is set, see keep_generated_keys). The rows advance the
+        checkpoint if checkpointed, by default if they are written to the table of the checkpoint. on_write is
+        called with the keys of every write (a row, a COPY chunk or a prepared batch) in its transaction, before it
+        is committed.
+        """
+        write_chunk = {
+            "insert": self.__insert_chunk,
+            "copy": self.__copy_chunk,
+            "prepared": self.__prepared_chunk
+        }[self.write_mode]
+        if collect is None:
+            collect = self.keep_generated_keys
+        if checkpointed is None:
+            checkpointed = self.__checkpoint is not None and self.__checkpoint[1] == table
+
+        if pipelined and self.pipeline_depth > 0 and not isinstance(rows, (list, tuple)):
+            chunks = ChunkPipeline(rows, self.chunk_size, self.pipeline_depth)
+        else:
+            chunks = chunked(rows, self.chunk_size)
 
-                self.connection.commit()
+        keys = []
+        self.__checkpoint_rows = 0 if checkpointed else None
+        self.__on_write = on_write
+        try:
+            for chunk in chunks:
+                self.__rows_attempted += len(chunk)
+
+                chunk_keys = write_chunk(table, columns, chunk, returning)
+
+                if checkpointed:
+                    # the rows of the chunk not covered by a commit yet, committed or rolled back with them
+                    self.__flush_checkpoint()
+                    if self.commit_policy == "row":
+                        # rejected rows are not committed by a write of their own
+                        self.__commit()
+
+                if returning:
+                    self.__remember_keys(table, returning, chunk_keys)
+                if collect:
+                    keys.extend(chunk_keys)
+        finally:
+            self.__checkpoint_rows = None
+            self.__on_write = None
+
+        if isinstance(chunks, ChunkPipeline):
+            self.__generation_wait += chunks.wait_seconds
+
+        return keys
+
+    def __wrote(self, keys: list) -> None:
+        if self.__on_write is not None and keys:
+            self.__on_write(keys)
+
+    def __count_done(self, rows: int) -> None:
+        if self.__checkpoint_rows is not None:
+            self.__checkpoint_rows += rows
+
+    def __flush_checkpoint(self) -> None:
+        """Advances the checkpoint by the rows written since, in the current transaction."""
+        if self.__checkpoint_rows:
+            run_name, table = self.__checkpoint
+            self.cursor.execute(
+                ADVANCE_CHECKPOINT.format(schema=self.schema_name),
+                (self.__checkpoint_rows, run_name, table)
+            )
+            self.__checkpoint_rows = 0
+
+    def __complete_checkpoint(self, table: str) -> None:
+        if self.__checkpoint is not None and self.__checkpoint[1] == table:
+            self.cursor.execute(COMPLETE_CHECKPOINT.format(schema=self.schema_name), self.__checkpoint)
+
+    def __fill_lookup(self, table: str, columns: tuple, rows, returning: str) -> bool:
+        """
+        Inserts the rows of a lookup table that are not in it yet, in one statement. Rows conflicting on the first
+        column are skipped, so filling the table again adds nothing.
+        """
+        values = list(zip(*rows))
+        try:
+            self.cursor.execute(
+                f'INSERT INTO {self.schema_name}.{table} ({", ".join(columns)}) '
+                f'SELECT * FROM unnest({", ".join(["%s::text[]"] * len(columns))}) '
+                f'ON CONFLICT ({columns[0]}) DO NOTHING RETURNING {returning}',
+                [list(column) for column in values]
+            )
+            keys = [row[0] for row in self.cursor.fetchall()]
+
+            self.__rows_attempted += len(values[0]) if values else 0
+            self.__rows_inserted += len(keys)
+            self.__remember_keys(table, returning, keys)
+            self.__after_write(len(keys))
         except Exception as e:
-            print(f"Failed to fill bookings table: {e}")
-            return False
+            print(f"An error occurred: {e}")
 
-        self.occupy_seats(occupied_seats)
+            return False
 
         return True
 
-    def __fill_work_orders(self, fillings: int) -> bool:
+    def __remember_keys(self, table: str, column: str, keys: list) -> None:
+        if self.keep_generated_keys:
+            self.generated_keys.setdefault(table, []).extend(keys)
+
+        if not self.key_pool.is_loaded(table, column):
+            # only happens for the first write, the table itself is scanned once
+            self.__load_key_pool(table, column)
+        else:
+            self.key_pool.add(table, column, keys)
+
+    def __fill_feedback_archive(self, fillings: int) -> bool:
+        pass
+            
+    def occupy_seats(self, seat_ids: list[int]) -> None:
         try:
-            aircraft_ids = self.get_table_entries("aircrafts", "aircraft_registration_number")
-            maintenance_ids = self.get_table_entries("maintenance_events", "maintenance_id")
-            airport_ids = self.get_table_entries("airports", "airport_id")
-            reporteur_ids = self.get_table_entries("reporteurs", "reporteur_id")
+            query = f"UPDATE {self.schema_name}.seats SET seat_status = 'Occupied' WHERE seat_id = ANY(%s)"
             
-            for _ in range(fillings):
-                aircraft_id = self.faker.random.choice(aircraft_ids)
-                maintenance_id = self.faker.random.choice(maintenance_ids)
-                airport_id = self.faker.random.choice(airport_ids)
-                reporteur_id = self.faker.random.choice(reporteur_ids)
-                
-                reporting_date = self.faker.date_between(start_date="-2y", end_date="today")
-                forecasted_date = self.faker.date_between(start_date=reporting_date, end_date="+1y")
-                due_date = self.faker.date_between(start_date=forecasted_date, end_date="+1y")
-                execution_date = self.faker.date_between(start_date=reporting_date, end_date="+1y")
-                
-                scheduled = self.faker.boolean()
-                forecasted_manhours = self.faker.random_number(fix_len=True, digits=1)
-                frequency = self.faker.random_number(fix_len=True, digits=1)
-                
-                self.cursor.execute(
-                    f"INSERT INTO {self.schema_name}.work_orders (aircraft_registration_number, maintenance_id, airport_id, execution_date, scheduled, forecasted_date, forecasted_manhours, frequency, reporteur_id, due_date, reporting_date) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
-                    (aircraft_id, maintenance_id, airport_id, execution_date, scheduled, forecasted_date, forecasted_manhours, frequency, reporteur_id, due_date, reporting_date)
-                )
+            self.cursor.execute(query, (seat_ids,))
             
-                self.connection.commit()
+            self.__after_write(len(seat_ids))
+
+            print(f"Successfully updated {len(seat_ids)} seats to 'Occupied' status.")
         except Exception as e:
-            print(f"An error occurred: {e}")
+            print(f"Failed to update seat status: {e}")
 
             return False
         
         return True
     
-    def __fill_aircrafts(self, fillings: int) -> bool:
+    def __fill_seat_classes(self, fillings: int) -> bool:
+        seat_rows = (
+            (f"{row}{letter}", "Business" if row <= 3 else "First Class" if row <= 6 else "Economy")
+            for row in range(1, SEAT_ROWS + 1)
+            for letter in SEAT_LETTERS
+        )
+
+        return self.__fill_lookup("seat_classes", ("seat_number", "seat_class"), seat_rows, "seat_number")
+
+    
+    def __fill_seats(self, fillings: int) -> bool:
         try:
-            for _ in range(fillings):
-                aircraft_type = self.faker.random.choice(['Boeing 737', 'Airbus A320', 'Boeing 777', 'Airbus A350'])
-                aircraft_company = f'{self.faker.company()}'
-                aircraft_capacity = 300 
+            self.__write_missing_seats()
+        except Exception as e:
+            print(f"An error occurred: {e}")
 
-                self.cursor.execute(
-                    f'INSERT INTO {self.schema_name}.aircrafts (aircraft_type, aircraft_company, aircraft_capacity) VALUES (%s, %s, %s)',
-                    (aircraft_type, aircraft_company, aircraft_capacity)
+            return False
+        
+        return True
+
+    def __write_missing_seats(self, seated_flights: bool = False) -> None:
+        """
+        Writes the seats missing from the cross join of flight_data and seat_classes, so filling again or resuming
+        a run adds nothing; with seated_flights only those of the flights that have some of their seats already.
+        """
+        # the cursor is kept open over the commits of the fill
+        cursor = self.connection.cursor(name=f'missing_seats_{next(self.__cursor_names)}', withhold=True)
+        cursor.itersize = self.itersize
+        try:
+            cursor.execute(
+                f"""
+                SELECT sc.seat_number, 'Available', fd.flight_id
+                FROM {self.schema_name}.flight_data fd
+                CROSS JOIN {self.schema_name}.seat_classes sc
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM {self.schema_name}.seats s WHERE s.flight_id = fd.flight_id AND s.seat_number = sc.seat_number
                 )
+                AND (NOT %(seated_flights)s OR EXISTS (SELECT 1 FROM {self.schema_name}.seats s WHERE s.flight_id = fd.flight_id))
+                ORDER BY fd.flight_id, sc.seat_number
+                """,
+                {"seated_flights": seated_flights}
+            )
 
-                self.connection.commit() 
+            self.__write_rows(
+                "seats", ("seat_number", "seat_status", "flight_id"), cursor, returning="seat_id", pipelined=False
+            )
+        finally:
+            cursor.close()
+
+    def __get_unseated_flights(self) -> KeyRanges:
+        """The flights without any seat, as their runs of consecutive flight ids."""
+        self.cursor.execute(
+            f"""
+            SELECT min(flight_id), max(flight_id) + 1
+            FROM (
+                SELECT fd.flight_id, fd.flight_id - row_number() OVER (ORDER BY fd.flight_id) AS run
+                FROM {self.schema_name}.flight_data fd
+                WHERE NOT EXISTS (SELECT 1 FROM {self.schema_name}.seats s WHERE s.flight_id = fd.flight_id)
+            ) AS unseated
+            GROUP BY run
+            ORDER BY 1
+            """
+        )
+        runs = self.cursor.fetchall()
+
+        return KeyRanges(*zip(*runs)) if runs else KeyRanges([], [])
+        
+    def __fill_bookings(self, fillings: int) -> bool:
+        try:
+            pools = self.__get_pools("bookings")
+            pools["seats"] = self.__get_paged_seats(self.rng, fillings)
+            if pools["seats"].bookings < fillings:
+                print(f'Only {pools["seats"].bookings} seats are free, bookings are filled up to them')
+
+            self.__write_rows(
+                "bookings",
+                ("flight_id", "customer_id", "seat_id", "price", "payment_status", "booking_date_and_time"),
+                self.__generate_batches(bookings_rows, fillings, pools),
+                returning="booking_id",
+                pipelined=False,
+                # the seats of every write are occupied with one join before it is committed, so committed
+                # bookings never leave their seats available to a later or resumed fill
+                on_write=self.__book_written_seats
+            )
         except Exception as e:
-            print(e)
-            
+            print(f"Failed to fill bookings table: {e}")
             return False
-    
+
         return True
-    
+
     def __fill_airports(self, fillings: int = 100) -> bool:
         try:
-            for _ in range(fillings): 
-                airport_id = self.faker.bothify(text='???').upper()
-                if airport_id in self.get_table_entries(table="airports", column="airport_id"):
-                    continue
-                airport_name = f'{self.faker.company()} Airport'
-                airport_city = self.faker.city()
-                airport_country = self.faker.country()
-
-                self.cursor.execute(
-                    f'INSERT INTO {self.schema_name}.airports (airport_id, airport_name, airport_city, airport_country) VALUES (%s, %s, %s, %s)',
-                    (airport_id, airport_name, airport_city, airport_country)
+            # a chunk at a time, its ids are checked against the rows the chunks before it wrote
+            for start in range(0, fillings, self.chunk_size):
+                drawn = dict.fromkeys(
+                    self.faker.bothify(text='???').upper() for _ in range(min(self.chunk_size, fillings - start))
+                )
+                taken = self.__taken_keys("airports", "airport_id", list(drawn))
+                airport_ids = [airport_id for airport_id in drawn if airport_id not in taken]
+
+                self.__write_rows(
+                    "airports",
+                    ("airport_id", "airport_name", "airport_city", "airport_country"),
+                    list(zip(
+                        airport_ids,
+                        self.value_pools.compose(self.rng, "{} Airport", ("company",), len(airport_ids)).tolist(),
+                        self.value_pools.draw(self.rng, "city", len(airport_ids)).tolist(),
+                        self.value_pools.draw(self.rng, "country", len(airport_ids)).tolist()
+                    )),
+                    returning="airport_id"
                 )
-
-                self.connection.commit()  
         except Exception as e:
             print(f"Failed to fill airports table: {e}")
             
             return False
 
         return True
-    
-    def __fill_aircraft_slots(self, fillings: int) -> bool:
-        try:
-            aircraft_ids = self.get_table_entries("aircrafts", "aircraft_registration_number")
-            maintenance_ids = self.get_table_entries("maintenance_events", "maintenance_id")
-            slot_types = ["Maintenance", "Cleaning", "Inspection", "Repair"]
-            scheduled_statuses = [True, False] 
-
-            for _ in range(fillings):
-                aircraft_registration_number = self.faker.random.choice(aircraft_ids)
-                maintenance_id = self.faker.random.choice(maintenance_ids)
-                slot_type = self.faker.random.choice(slot_types)
-                slot_scheduled = self.faker.random.choice(scheduled_statuses)
 
-                start_time = self.faker.date_time_between(start_date="-1y", end_date="now")
-                end_time = start_time + self.faker.random_element(elements=[timedelta(hours=h) for h in range(1, 13)])
+    def __taken_keys(self, table: str, column: str, keys: list) -> set:
+        """The given keys that are in the table already, looked up with one query."""
+        self.cursor.execute(f"SELECT {column} FROM {self.schema_name}.{table} WHERE {column} = ANY(%s)", (keys,))
 
-                self.cursor.execute(
-                    f"INSERT INTO {self.schema_name}.aircraft_slots (aircraft_registration_number, slot_start, slot_end, slot_type, slot_scheduled, maintenance_id) VALUES (%s, %s, %s, %s, %s, %s)",
-                    (aircraft_registration_number, start_time, end_time, slot_type, slot_scheduled, maintenance_id)
-                )
+        return {row[0] for row in self.cursor.fetchall()}
+    
+    def __draw_flight_numbers(self, count: int) -> list[str]:
+        """count distinct flight numbers that are not in flights, the table is looked up once per round of draws."""
+        flight_numbers = {}
+        while len(flight_numbers) < count:
+            drawn = dict.fromkeys(
+                f'{self.faker.bothify(text="??").upper()}{self.faker.random_number(fix_len=True, digits=4)}'
+                for _ in range(count - len(flight_numbers))
+            )
+            taken = self.__taken_keys("flights", "flight_number", list(drawn))
+            flight_numbers.update((flight_number, None) for flight_number in drawn if flight_number not in taken)
 
-                self.connection.commit()
-        except Exception as e:
-            print(f"An error occurred: {e}")
+        return list(flight_numbers)
 
-            return False
-        
-        return True
-    
     def __fill_flights(self, fillings: int) -> bool:
         try: 
-            airports = self.get_table_entries(table="airports", column="airport_id")
-            airlines = self.get_table_entries(table="airlines", column="airline_id")
-            for _ in range(int(fillings / 5)):
-                flight_number = f'{self.faker.bothify(text="??").upper()}{self.faker.random_number(fix_len=True, digits=4)}'
-
-                origin = self.faker.random.choice(airports)
-                destination = self.faker.random.choice(airports)
+            airports = self.__get_keys("airports", "airport_id")
+            airlines = self.__get_keys("airlines", "airline_id")
 
-                airline_id = self.faker.random.choice(airlines)
-                
-                hours = self.faker.random.randint(1, 10)
-                minutes = self.faker.random.randint(0, 59)
-                flight_length = f'{hours} hours {minutes} minutes'
+            def flight_rows(flight_numbers: list[str]):
+                for flight_number in flight_numbers:
+                    origin = self.faker.random.choice(airports)
+                    destination = self.faker.random.choice(airports)
 
-                self.cursor.execute(
-                    f'INSERT INTO {self.schema_name}.flights (flight_number, origin, destination, airline_id, flight_length) VALUES (%s, %s, %s, %s, %s)',
-                    (flight_number, origin, destination, airline_id, flight_length)
-                    )
-            
-                self.connection.commit()
+                    airline_id = self.faker.random.choice(airlines)
+                    
+                    hours = self.faker.random.randint(1, 10)
+                    minutes = self.faker.random.randint(0, 59)
+                    flight_length = f'{hours} hours {minutes} minutes'
+
+                    yield (flight_number, origin, destination, airline_id, flight_length)
+
+            # a chunk at a time, its flight numbers are checked against the rows the chunks before it wrote
+            for start in range(0, fillings, self.chunk_size):
+                self.__write_rows(
+                    "flights",
+                    ("flight_number", "origin", "destination", "airline_id", "flight_length"),
+                    list(flight_rows(self.__draw_flight_numbers(min(self.chunk_size, fillings - start)))),
+                    returning="flight_number"
+                )
         except Exception as e:
             print(f'An error occurred: {e}')
 
@@ -347,142 +1262,156 @@ class PostgresORM:
         
         return True
     
-    def fill_frequent_flyers(self, fillings: int = 3) -> bool:
+    def fill_frequent_flyers(self, fillings: int = 3, mode: str = None) -> bool:
+        if mode is not None and mode not in WRITE_MODES:
+            raise ValueError(f'Unknown write mode {mode}, expected one of {WRITE_MODES}')
+
+        previous_mode = self.write_mode
+        self.write_mode = mode or self.write_mode
+        self.__begin_fill()
+        fill = False
         try:
-            aircraft_ids = self.get_table_entries("aircrafts", "aircraft_registration_number")
-            airline_ids = self.get_table_entries("airlines", "airline_id")
-            airports = self.get_table_entries("airports", "airport_id")
+            aircraft_ids = self.__get_keys("aircrafts", "aircraft_registration_number")
+            airline_ids = self.__get_keys("airlines", "airline_id")
+            airports = self.__get_keys("airports", "airport_id")
+            now = self.__now()
+            today = now.date()
 
             if not aircraft_ids or not airline_ids:
                 print("Some required data is missing in the database. Populate aircrafts and airlines tables first.")
                 return False
 
-            customer_ids = []
-            for _ in range(15):
-                customer_id = self.faker.random_number(digits=4)
-                name = self.faker.name()
-                email = self.faker.email()
-                phone_number = self.faker.phone_number()
-                address = self.faker.address()
-
-                self.cursor.execute(
-                    f"""
-                    INSERT INTO {self.schema_name}.customers (customer_id, name, email, phone_number, address)
-                    VALUES (%s, %s, %s, %s, %s)
-                    """,
-                    (customer_id, name, email, phone_number, address)
+            # serial keys come from the sequences and flight numbers are drawn unused, so adding frequent flyers
+            # again does not collide with the rows already there
+            customers = [
+                (
+                    self.faker.name(),
+                    self.faker.email(),
+                    self.faker.phone_number(),
+                    self.faker.address()
                 )
-                self.connection.commit()
-                customer_ids.append(customer_id)
-
-            flight_numbers = []
-            for i in range(fillings):
-                flight_number = f'100{i}'
-                origin = self.faker.random.choice(airports)
-                destination = self.faker.random.choice(airports)
-                airline_id = self.faker.random.choice(airline_ids)
-                flight_length = f"{self.faker.random.choice([9, 10, 15])}:00:00"  
+                for _ in range(15)
+            ]
+            customer_ids = self.__write_rows(
+                "customers",
+                ("name", "email", "phone_number", "address"),
+                customers,
+                returning="customer_id",
+                collect=True
+            )
 
-                self.cursor.execute(
-                    f"""
-                    INSERT INTO {self.schema_name}.flights (flight_number, origin, destination, airline_id, flight_length)
-                    VALUES (%s, %s, %s, %s, %s::INTERVAL)
-                    """,
-                    (flight_number, origin, destination, airline_id, flight_length)
+            flights = [
+                (
+                    flight_number,
+                    self.faker.random.choice(airports),
+                    self.faker.random.choice(airports),
+                    self.faker.random.choice(airline_ids),
+                    f"{self.faker.random.choice([9, 10, 15])}:00:00"
                 )
-                self.connection.commit()
-                flight_numbers.append(flight_number)
-
-            flight_ids = []
-            for flight_number in flight_numbers:
-                flight_id = self.faker.random_number(digits=4)
-                aircraft_reg = self.faker.random.choice(aircraft_ids)
-                scheduled_date = self.faker.date_between(start_date="-3y", end_date="-1y")  
-                scheduled_time = self.faker.time_object()
-                number_of_passengers = self.faker.random.randint(50, 200)
-                number_of_cabin_crew = self.faker.random.randint(2, 6)
-                number_of_flight_crew = self.faker.random.randint(1, 2)
-                available_seating = self.faker.random.randint(10, 50)
+                for flight_number in self.__draw_flight_numbers(fillings)
+            ]
+            flight_numbers = self.__write_rows(
+                "flights",
+                ("flight_number", "origin", "destination", "airline_id", "flight_length"),
+                flights,
+                returning="flight_number",
+                collect=True
+            )
 
-                self.cursor.execute(
-                    f"""
-                    INSERT INTO {self.schema_name}.flight_data (
-                        flight_id, flight_number, aircraft_registration_number, flight_status_id, 
-                        problem_id, number_of_passengers, number_of_cabin_crew, number_of_flight_crew, 
-                        available_seating, scheduled_departure_date, scheduled_departure_time
-                    )
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """,
-                    (
-                        flight_id, flight_number, aircraft_reg, 1, 1, number_of_passengers,
-                        number_of_cabin_crew, number_of_flight_crew, available_seating,
-                        scheduled_date, scheduled_time
-                    )
+            flight_data = [
+                (
+                    flight_number,
+                    self.faker.random.choice(aircraft_ids),
+                    1,
+                    1,
+                    self.faker.random.randint(50, 200),
+                    self.faker.random.randint(2, 6),
+                    self.faker.random.randint(1, 2),
+                    self.faker.random.randint(10, 50),
+                    self.faker.date_between(start_date=today - timedelta(days=3 * 365), end_date=today - timedelta(days=365)),
+                    self.faker.time_object(end_datetime=now)
                 )
-                self.connection.commit()
-                flight_ids.append(flight_id)
-
-            for customer_id, flight_id in zip(customer_ids, flight_ids):
-                booking_id = self.faker.random_number(digits=4)
-                seat_id = self.faker.random.randint(1, 100) 
-                price = round(self.faker.random.uniform(150, 500), 2)
-                payment_status = True
-                booking_date = self.faker.date_time_between(start_date="-3y", end_date="-1y") 
+                for flight_number in flight_numbers
+            ]
+            flight_ids = self.__write_rows(
+                "flight_data",
+                (
+                    "flight_number", "aircraft_registration_number", "flight_status_id",
+                    "problem_id", "number_of_passengers", "number_of_cabin_crew", "number_of_flight_crew",
+                    "available_seating", "scheduled_departure_date", "scheduled_departure_time"
+                ),
+                flight_data,
+                returning="flight_id",
+                collect=True
+            )
 
-                self.cursor.execute(
-                    f"""
-                    INSERT INTO {self.schema_name}.bookings (
-                        booking_id, flight_id, customer_id, seat_id, price, payment_status, booking_date_and_time
-                    )
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    """,
-                    (booking_id, flight_id, customer_id, seat_id, price, payment_status, booking_date)
+            # the new flights get their seats, every booking a free seat of its own flight like __fill_bookings
+            self.cursor.execute(ADD_FLIGHT_SEATS.format(schema=self.schema_name), (flight_ids,))
+            self.__after_write(self.cursor.rowcount)
+            seat_ids = self.__get_seat_allocator(self.rng, flight_ids).allocate_flights(flight_ids)
+
+            bookings = [
+                (
+                    flight_id,
+                    customer_id,
+                    seat_id,
+                    round(self.faker.random.uniform(150, 500), 2),
+                    True,
+                    self.faker.date_time_between(start_date=now - timedelta(days=3 * 365), end_date=now - timedelta(days=365))
                 )
-                self.connection.commit()
+                for customer_id, flight_id, seat_id in zip(customer_ids, flight_ids, seat_ids)
+                if seat_id is not None
+            ]
+            self.__write_rows(
+                "bookings",
+                ("flight_id", "customer_id", "seat_id", "price", "payment_status", "booking_date_and_time"),
+                bookings,
+                returning="booking_id",
+                on_write=self.__book_written_seats
+            )
 
             print(f"Successfully added {fillings} frequent flyers with associated flights and bookings.")
-            return True
+            fill = True
         except Exception as e:
             print(f"An error occurred while adding frequent flyers: {e}")
-            return False
+        finally:
+            self.write_mode = previous_mode
+            self.__end_fill(fill)
+
+        return fill
     
-    def __fill_conflict(self):
+    def __fill_conflict(self, conflicts: int = 20):
+        """Inserts conflicts flights together with a maintenance event of their aircraft overlapping the departure."""
         try:
-            aircraft_ids = self.get_table_entries("aircrafts", "aircraft_registration_number")
-            airport_ids = self.get_table_entries("airports", "airport_id")
-            flight_numbers = self.get_table_entries("flights", "flight_number")
-            maintenance_type_ids = self.get_table_entries("maintenance_types", "maintenance_type_id")
-            subsystem_ids = self.get_table_entries("subsystems", "subsystem_id")
-
-            for _ in range(20):
-                flight_id = self.faker.random_number(digits=4) 
+            aircraft_ids = self.__get_keys("aircrafts", "aircraft_registration_number")
+            airport_ids = self.__get_keys("airports", "airport_id")
+            flight_numbers = self.__get_keys("flights", "flight_number")
+            maintenance_type_ids = self.__get_keys("maintenance_types", "maintenance_type_id")
+            subsystem_ids = self.__get_keys("subsystems", "subsystem_id")
+            # the first status and problem, like the ids 1 of an empty schema
+            flight_status_id = self.__get_keys("flight_statuses", "flight_status_id")[0]
+            problem_id = self.__get_keys("problems", "problem_id")[0]
+            now = self.__now()
+
+            # the keys come from the sequences, so conflicts grow with the scale factor without hitting taken ids
+            flights = []
+            maintenance_events = []
+            for _ in range(conflicts):
                 flight_number = self.faker.random.choice(flight_numbers)
                 aircraft_reg = self.faker.random.choice(aircraft_ids)
-                scheduled_date = self.faker.date_between(start_date="today", end_date="+7d") 
-                scheduled_time = self.faker.time_object() 
+                scheduled_date = self.faker.date_between(start_date=now.date(), end_date=now.date() + timedelta(days=7))
+                scheduled_time = self.faker.time_object(end_datetime=now)
                 number_of_passengers = self.faker.random.randint(50, 200)
                 number_of_cabin_crew = self.faker.random.randint(2, 6)
                 number_of_flight_crew = self.faker.random.randint(1, 2)
                 available_seating = self.faker.random.randint(10, 50)
 
-                self.cursor.execute(
-                    f"""
-                    INSERT INTO {self.schema_name}.flight_data (
-                        flight_id, flight_number, aircraft_registration_number, flight_status_id, 
-                        problem_id, number_of_passengers, number_of_cabin_crew, number_of_flight_crew, 
-                        available_seating, scheduled_departure_date, scheduled_departure_time
-                    ) 
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """,
-                    (
-                        flight_id, flight_number, aircraft_reg, 1, 1, number_of_passengers, 
-                        number_of_cabin_crew, number_of_flight_crew, available_seating, 
-                        scheduled_date, scheduled_time
-                    )
-                )
-                self.connection.commit()
+                flights.append((
+                    flight_number, aircraft_reg, flight_status_id, problem_id, number_of_passengers,
+                    number_of_cabin_crew, number_of_flight_crew, available_seating, 
+                    scheduled_date, scheduled_time
+                ))
 
-                maintenance_id = self.faker.random_number(fix_len=True, digits=4) 
                 maintenance_starttime = (
                     datetime.combine(scheduled_date, scheduled_time) - timedelta(hours=2)
                 ).strftime('%Y-%m-%d %H:%M:%S') 
@@ -492,137 +1421,79 @@ class PostgresORM:
                 maintenance_type_id = self.faker.random.choice(maintenance_type_ids)
                 subsystem_id = self.faker.random.choice(subsystem_ids)
 
-                self.cursor.execute(
-                    f"""
-                    INSERT INTO {self.schema_name}.maintenance_events (
-                        maintenance_id, aircraft_registration_number, maintenance_starttime, 
-                        duration, airport_id, maintenance_type_id, subsystem_id
-                    ) 
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    """,
-                    (
-                        maintenance_id, aircraft_reg, maintenance_starttime, duration, 
-                        airport_id, maintenance_type_id, subsystem_id
-                    )
-                )
-                self.connection.commit()
+                maintenance_events.append((
+                    aircraft_reg, maintenance_starttime, duration, 
+                    airport_id, maintenance_type_id, subsystem_id
+                ))
+
+            # flights go in first, so the maintenance trigger does not see their conflicting events yet
+            self.__write_rows(
+                "flight_data",
+                (
+                    "flight_number", "aircraft_registration_number", "flight_status_id",
+                    "problem_id", "number_of_passengers", "number_of_cabin_crew", "number_of_flight_crew", 
+                    "available_seating", "scheduled_departure_date", "scheduled_departure_time"
+                ),
+                flights,
+                returning="flight_id"
+            )
+            # a conflict is done with its maintenance event, which advances the checkpoint of the conflicts
+            self.__write_rows(
+                "maintenance_events",
+                (
+                    "aircraft_registration_number", "maintenance_starttime",
+                    "duration", "airport_id", "maintenance_type_id", "subsystem_id"
+                ),
+                maintenance_events,
+                returning="maintenance_id",
+                checkpointed=self.__checkpoint is not None
+            )
 
             return True
         except Exception as e:
             print(f"An error occurred: {e}")
             return False
+
+    def __fill_conflicts(self, fillings: int) -> bool:
+        """
+        The conflicts of fillings maintenance events. In a named run they have a checkpoint of their own, a resumed
+        run adds the conflicts of all rows of the table that its checkpoint is missing.
+        """
+        conflicts = conflict_rows(fillings + self.__resumed_rows)
+        if self.__checkpoint is None:
+            return self.__fill_conflict(conflicts)
+
+        run_name, table = self.__checkpoint
+        checkpoint = (run_name, CONFLICT_CHECKPOINT.format(table=table))
+        self.cursor.execute(START_CHECKPOINT.format(schema=self.schema_name), checkpoint)
+        rows_done, _ = self.cursor.fetchone()
+
+        self.__checkpoint = checkpoint
+        try:
+            return self.__fill_conflict(max(conflicts - rows_done, 0))
+        finally:
+            self.__checkpoint = (run_name, table)
     
     def __fill_maintenance_events(self, fillings: int) -> bool:
-        try:
-            aircraft_ids = self.get_table_entries("aircrafts", "aircraft_registration_number")
-            airport_ids = self.get_table_entries("airports", "airport_id")
-            subsystem_ids = self.get_table_entries("subsystems", "subsystem_id")
-            maintenance_type_ids = self.get_table_entries("maintenance_types", "maintenance_type_id")
-
-            for _ in range(fillings):
-                aircraft_reg = self.faker.random.choice(aircraft_ids)
-                airport_id = self.faker.random.choice(airport_ids)
-                subsystem_id = self.faker.random.choice(subsystem_ids)
-                maintenance_type_id = self.faker.random.choice(maintenance_type_ids)
-
-                maintenance_starttime = self.faker.date_time_between(start_date="-1y", end_date="now").strftime('%Y-%m-%d %H:%M:%S')
-
-                duration_hours = self.faker.random.randint(1, 12)  
-                duration = f"{duration_hours} hours" 
-
-                self.cursor.execute(
-                    f"INSERT INTO {self.schema_name}.maintenance_events (aircraft_registration_number, maintenance_starttime, duration, airport_id, subsystem_id, maintenance_type_id) VALUES (%s, %s, %s, %s, %s, %s)",
-                    (aircraft_reg, maintenance_starttime, duration, airport_id, subsystem_id, maintenance_type_id)
-                )
-
-                self.connection.commit()
-
-            self.__fill_conflict()
-        except Exception as e:
-            print(f"An error occurred: {e}")
-
+        if not self.__fill_from_spec("maintenance_events", fillings):
             return False
-        
-        return True
+
+        return self.__fill_conflicts(fillings)
     
     def __fill_subsystems(self, fillings: int) -> bool:
-        try:
-            subsystem_types = ["Engine", "Avionics", "Hydraulics", "Landing Gear", "Fuel System", "Electrical System"]
-            for subsystem_type in subsystem_types:
-                self.cursor.execute(
-                    f"INSERT INTO {self.schema_name}.subsystems (subsystem_type) VALUES (%s)",
-                    (subsystem_type,)
-                )
-                self.connection.commit()
-        except Exception as e:
-            print(f"An error occurred: {e}")
-
-            return False
-
-        return True
+        return self.__fill_lookup(
+            "subsystems", ("subsystem_type",), ((value,) for value in SUBSYSTEM_TYPES), "subsystem_id"
+        )
     
     def __fill_maintenance_types(self, fillings: int) -> bool:
-        try:
-            maintenance_type_names = ["Routine Check", "Engine Repair", "Scheduled Maintenance", "Emergency Repair", "Software Update"]
-            for mainenance_type in maintenance_type_names:
-                self.cursor.execute(
-                    f"INSERT INTO {self.schema_name}.maintenance_types (maintenance_type_name) VALUES (%s)",
-                    (mainenance_type,)
-                )
-                self.connection.commit()
-        except Exception as e:
-            print(f"An error occurred: {e}")
-
-            return False
-        
-        return True
+        return self.__fill_lookup(
+            "maintenance_types", ("maintenance_type_name",), ((value,) for value in MAINTENANCE_TYPE_NAMES), "maintenance_type_id"
+        )
     
-    def __fill_reporteurs(self, fillings: int):
-        try:
-            for _ in range(fillings):
-                reporteur_class = self.faker.random.choice(["Steward", "Pilot", "Mechanic"])
-                reporteur_name = self.faker.name()
-
-                self.cursor.execute(
-                        f'INSERT INTO {self.schema_name}.reporteurs (reporteur_class, reporteur_name) VALUES (%s, %s)',
-                        (reporteur_class, reporteur_name)
-                    )
-                
-                self.connection.commit()
-        except Exception as e:
-            print(f"An error occurred: {e}")
+    def __get_capacities_of_aircrafts(self) -> dict[int, int]:
+        self.cursor.execute(f"SELECT aircraft_registration_number, aircraft_capacity FROM {self.schema_name}.aircrafts")
 
-            return False
-        
-        return True
-    
-    def __fill_reportuers(self, fillings: int):
-        try:
-            for _ in range(fillings):
-                reporteur_class = self.faker.random.choice(["class1", "class2", "class3"])
-                reporteur_name = self.faker.random.choice(["name1", "name2", "name3"])
-
-                self.cursor.execute(
-                        f'INSERT INTO {self.schema_name}.reporteurs (reporteur_class, reporteur_name) VALUES (%s, %s)',
-                        (reporteur_class, reporteur_name)
-                    )
-                
-                self.connection.commit()
-        except Exception as e:
-            print(f"An error occurred: {e}")
-
-            return False
-        
-        return True
-    
-    def __get_capacity_of_aircraft(self, aircraft: int) -> int:
-        query = f"SELECT aircraft_capacity FROM {self.schema_name}.aircrafts WHERE aircraft_registration_number = %s"
-        
-        self.cursor.execute(query, (aircraft,))
-        
-        result = self.cursor.fetchone() 
-        
-        return result[0] if result else None
+        return dict(self.cursor.fetchall())
     
     def __fill_flight_data(self, fillings: int = 100) -> bool:
         pks = {
@@ -636,54 +1507,18 @@ class PostgresORM:
         pks_content = {}
 
         for table, column in pks.items():
-            ids = self.get_table_entries(table, column)
-            pks_content[column] = ids
-
-        try:
-            for _ in range(100):
-                aircraft_reg = self.faker.random.choice(pks_content["aircraft_registration_number"])
-                capacity_of_aircraft = self.__get_capacity_of_aircraft(aircraft=aircraft_reg)
-
-                capacity_multiplier = 1 if self.faker.boolean(chance_of_getting_true=50) else 0.9
-                number_of_passangers = int(capacity_multiplier * capacity_of_aircraft)
-                number_of_cabin_crew = self.faker.random_number(fix_len=True, digits=1)
-                number_of_flight_crew = self.faker.random_number(fix_len=True, digits=1)
-                available_seating = capacity_of_aircraft - number_of_passangers
-
-                scheduled_departure_date = self.faker.date_between(start_date="today", end_date="+1y")
-                scheduled_departure_time = self.faker.time_object()
-                
-                fake_status_id_number = random()
-                if fake_status_id_number >= 0.8: 
-                    if fake_status_id_number <= 0.95:
-                        fligt_status = pks_content["flight_status_id"][1]
-                    else:
-                        fligt_status = pks_content["flight_status_id"][2]
-                else:
-                    fligt_status = pks_content["flight_status_id"][0]
+            pks_content[table] = self.__get_key_array(table, column)
 
-                if random() <= 0.8:
-                    problem_id = pks_content["problem_id"][0]
-                else:
-                    problem_id = self.faker.random.choice(pks_content["problem_id"])
+        capacities = self.__get_capacities_of_aircrafts()
+        pks_content["capacities"] = np.array([capacities[aircraft] for aircraft in pks_content["aircrafts"].tolist()])
 
-                self.cursor.execute(
-                    f'INSERT INTO {self.schema_name}.flight_data (flight_number, aircraft_registration_number, flight_status_id, problem_id, number_of_passengers, number_of_cabin_crew, number_of_flight_crew, available_seating, scheduled_departure_date, scheduled_departure_time) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)',
-                    (
-                        self.faker.random.choice(pks_content["flight_number"]),
-                        aircraft_reg,
-                        fligt_status,
-                        problem_id,
-                        number_of_passangers,
-                        number_of_cabin_crew,
-                        number_of_flight_crew,
-                        available_seating,
-                        scheduled_departure_date,
-                        scheduled_departure_time
-                    )
-                )
-
-                self.connection.commit()
+        try:
+            self.__write_rows(
+                "flight_data",
+                ("flight_number", "aircraft_registration_number", "flight_status_id", "problem_id", "number_of_passengers", "number_of_cabin_crew", "number_of_flight_crew", "available_seating", "scheduled_departure_date", "scheduled_departure_time"),
+                self.__generate_batches(flight_data_rows, fillings, pks_content),
+                returning="flight_id"
+            )
         except Exception as e:
             print(f"An error occurred: {e}")
 
@@ -693,173 +1528,1027 @@ class PostgresORM:
     
     def __fill_customer_preferences(self, fillings: int) -> bool:
         try:
-            customer_ids = self.get_table_entries("customers", "customer_id")
+            customer_ids = self.__get_keys("customers", "customer_id")
             
-            for i in range(fillings):
-                customer_id = self.faker.random.choice(customer_ids)
-                preferences = {
-                    "meal": self.faker.random.choice(["vegetarian", "vegan", "gluten-free", "standard"]),
-                    "seating": {
-                        "aisle": self.faker.boolean(),
-                        "extra_legroom": self.faker.boolean(),
-                        "seat_near_exit": self.faker.boolean()
-                    },
-                    "notifications": {
-                        "email": self.faker.boolean(),
-                        "sms": self.faker.boolean()
-                    }
-                }
-                self.cursor.execute(
-                    f"INSERT INTO {self.schema_name}.customer_preferences (customer_id, customer_preferences_data) VALUES (%s, %s)",
-                    (customer_id, Json(preferences))
-                )
-                self.connection.commit()
-                print(f'{i+1} out of {fillings} for preferences table inserted')
+            def generate_rows():
+                for _ in range(fillings):
+                    yield (self.faker.random.choice(customer_ids), Json(self.__generate_preferences()))
+
+            self.__write_rows("customer_preferences", ("customer_id", "customer_preferences_data"), generate_rows())
+            print(f'{fillings} out of {fillings} for preferences table inserted')
         except Exception as e:
             print(f"Failed to fill customer_preferences table: {e}")
             return False
         
         return True
+
+    def __generate_preferences(self) -> dict:
+        return {
+            "meal": self.faker.random.choice(["vegetarian", "vegan", "gluten-free", "standard"]),
+            "seating": {
+                "aisle": self.faker.boolean(),
+                "extra_legroom": self.faker.boolean(),
+                "seat_near_exit": self.faker.boolean()
+            },
+            "notifications": {
+                "email": self.faker.boolean(),
+                "sms": self.faker.boolean()
+            }
+        }
+    
+    def __get_maintenance_event_dates(self, maintenance_ids: list[int]) -> dict[int, str]:
+        self.cursor.execute(
+            f"SELECT maintenance_id, maintenance_starttime FROM {self.schema_name}.maintenance_events WHERE maintenance_id = ANY(%s)",
+            (maintenance_ids,)
+        )
+
+        return {maintenance_id: starttime.strftime("%Y-%m-%d") for maintenance_id, starttime in self.cursor.fetchall()}
     
-    def __get_maintenance_event_date(self, maintenance_id: int) -> str:
+    def __fill_aircraft_maintenance_logs(self, fillings: int) -> bool:
         try:
+            maintenance_ids = self.__get_keys("maintenance_events", "maintenance_id")
+
+            def generate_rows():
+                # the dates of the drawn events are read a chunk at a time, not for the whole table
+                for start in range(0, fillings, self.chunk_size):
+                    drawn = [self.faker.random.choice(maintenance_ids) for _ in range(min(self.chunk_size, fillings - start))]
+                    maintenance_dates = self.__get_maintenance_event_dates(drawn)
+                    for maintenance_id in drawn:
+                        yield (maintenance_id, Json(self.__generate_maintenance_log(maintenance_dates[maintenance_id])))
+
+            # the dates are read from the writing connection between the chunks, so generating is not pipelined
+            self.__write_rows(
+                "aircraft_maintenance_logs",
+                ("maintenance_id", "aircraft_maintenance_logs_data"),
+                generate_rows(),
+                pipelined=False
+            )
+            print(f'{fillings} out of {fillings} for maintenance logs table inserted')
+        except Exception as e:
+            print(f"Failed to fill aircraft_maintenance_logs table: {e}")
+            return False
+        
+        return True
+
+    def __generate_maintenance_log(self, maintenace_log_id: str) -> dict:
+        today = self.__now().date()
+
+        return {
+            "date": maintenace_log_id,
+            "check_type": self.faker.random.choice(["Full Inspection", "Routine Check", "Repair", "Emergency Check"]),
+            "components_checked": [
+                {
+                    "name": self.faker.random.choice(["Engine", "Avionics", "Hydraulics", "Fuel System", "Electrical System"]),
+                    "status": self.faker.random.choice(["Operational", "Requires Service", "Replaced"]),
+                    "last_replaced": self.faker.date_between(start_date=today - timedelta(days=365), end_date=today).strftime("%Y-%m-%d")
+                } for _ in range(self.faker.random.randint(1, 3))
+            ]
+        }
+
+    def __fill_customer_feedback_and_survey(self, fillings: int) -> bool:
+        try:
+            customer_ids = self.__get_keys("customers", "customer_id")
+            today = self.__now().date()
+
+            # the months __generate_feedback_survey draws survey dates from
+            self.__create_partitions(FEEDBACK_TABLE, months_between(today - timedelta(days=365), today))
+            if self.commit_policy == "row":
+                # a rejected row rolls back the transaction, the partitions must not go with it
+                self.__commit()
+            
+            def generate_rows():
+                for start in range(0, fillings, self.chunk_size):
+                    comments = self.value_pools.draw(self.rng, "sentence", min(self.chunk_size, fillings - start))
+                    for comment in comments.tolist():
+                        feedback = self.__generate_feedback_survey(comment)
+                        yield (self.faker.random.choice(customer_ids), Json(feedback), feedback["survey_date"])
+
+            self.__write_rows(
+                "customer_feedback_and_survey",
+                ("customer_id", "customer_feedback_and_survey_data", "survey_date"),
+                generate_rows()
+            )
+            print(f'{fillings} out of {fillings} for feedback table inserted')
+        except Exception as e:
+            print(f"Failed to fill customer_feedback_and_survey table: {e}")
+            return False
+        
+        return True
+
+    def __generate_feedback_survey(self, comment: str) -> dict:
+        comment_chance = self.faker.boolean(chance_of_getting_true=50)
+        today = self.__now().date()
+
+        return {
+            "survey_date": self.faker.date_between(start_date=today - timedelta(days=365), end_date=today).strftime("%Y-%m-%d"),
+            "rating": self.faker.random.randint(1, 5),
+            "comments": comment if comment_chance else "No comments",
+            "topics": {
+                "comfort": self.faker.random.randint(1, 5),
+                "service": self.faker.random.randint(1, 5),
+                "cleanliness": self.faker.random.randint(1, 5),
+                "entertainment": self.faker.random.randint(1, 5)
+            }
+        }
+    
+    def __get_partitions(self, table: str) -> dict[date, str]:
+        self.cursor.execute(PARTITIONS, (self.schema_name, table))
+
+        return {partition_month(name): name for name, in self.cursor.fetchall() if partition_month(name)}
+
+    def __attach_partition(self, table: str, partition: str, month: date) -> None:
+        """
+        Attaches a table holding the rows of one month as a partition. Rows of the month in the default
+        partition are moved into it first, Postgres refuses to attach a range the default partition has rows of.
+        """
+        columns = ", ".join(self.__get_stored_columns(table))
+        self.cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM {self.schema_name}.{table}_default
+                WHERE survey_date >= %(start)s AND survey_date < %(end)s
+                RETURNING {columns}
+            )
+            INSERT INTO {self.schema_name}.{partition} ({columns}) SELECT {columns} FROM moved
+            """,
+            {"start": month, "end": next_month(month)}
+        )
+        self.cursor.execute(
+            f"ALTER TABLE {self.schema_name}.{table} ATTACH PARTITION {self.schema_name}.{partition} "
+            f"FOR VALUES FROM (%s) TO (%s)",
+            (month, next_month(month))
+        )
+
+    def __create_partitions(self, table: str, months: list[date]) -> list[str]:
+        existing = self.__get_partitions(table)
+
+        created = []
+        for month in months:
+            if month in existing:
+                continue
+
+            partition = partition_name(table, month)
+            # generated columns must match the parent's, e.g. the rating columns of use_jsonb, or attaching fails
+            self.cursor.execute(
+                f"CREATE TABLE {self.schema_name}.{partition} "
+                f"(LIKE {self.schema_name}.{table} INCLUDING DEFAULTS INCLUDING GENERATED)"
+            )
+            self.__attach_partition(table, partition, month)
+            created.append(partition)
+
+        return created
+
+    def create_feedback_partitions(self, start: date, end: date) -> list[str]:
+        """Creates the monthly partitions of customer_feedback_and_survey from start to end that do not exist yet."""
+        try:
+            created = self.__create_partitions(FEEDBACK_TABLE, months_between(start, end))
+            self.__commit()
+        except Exception as e:
+            print(f"Can not create the partitions of {FEEDBACK_TABLE}: {e}")
+            self.connection.rollback()
+
+            return []
+
+        return created
+
+    def archive_feedback(self, cutoff: date = None) -> dict:
+        """
+        Moves feedback with a survey before cutoff (by default two years before today, like the archive trigger)
+        to feedback_archive. Monthly partitions entirely before cutoff are detached and attached to the archive
+        as they are, without copying their rows, only the rows of the month of the cutoff and of the default
+        partition are moved with one DELETE ... INSERT. Meant to run on a schedule, e.g. daily.
+        """
+        cutoff = cutoff or archive_cutoff(self.__now().date())
+        archived = []
+        try:
+            for month, partition in sorted(self.__get_partitions(FEEDBACK_TABLE).items()):
+                if next_month(month) > cutoff:
+                    continue
+
+                archive_partition = partition_name(ARCHIVE_TABLE, month)
+                if month in self.__get_partitions(ARCHIVE_TABLE):
+                    print(f"Can not archive {partition}, {archive_partition} exists already")
+                    continue
+
+                self.cursor.execute(f"ALTER TABLE {self.schema_name}.{FEEDBACK_TABLE} DETACH PARTITION {self.schema_name}.{partition}")
+                # a constant default, so no row is rewritten
+                self.cursor.execute(f"ALTER TABLE {self.schema_name}.{partition} ADD COLUMN archived_at TIMESTAMP DEFAULT NOW()")
+                self.cursor.execute(f"ALTER TABLE {self.schema_name}.{partition} RENAME TO {archive_partition}")
+                self.__attach_partition(ARCHIVE_TABLE, archive_partition, month)
+                archived.append(archive_partition)
+
             self.cursor.execute(
                 f"""
-                SELECT maintenance_starttime 
-                FROM {self.schema_name}.maintenance_events
-                WHERE maintenance_id = %s
+                WITH moved AS (
+                    DELETE FROM {self.schema_name}.{FEEDBACK_TABLE} WHERE survey_date < %s
+                    RETURNING customer_id, customer_feedback_and_survey_data, survey_date
+                )
+                INSERT INTO {self.schema_name}.{ARCHIVE_TABLE} (customer_id, customer_feedback_and_survey_data, survey_date, archived_at)
+                SELECT customer_id, customer_feedback_and_survey_data, survey_date, NOW() FROM moved
                 """,
-                (maintenance_id,)
+                (cutoff,)
             )
-            
-            result = self.cursor.fetchone()
-            if result:
-                return result[0].strftime("%Y-%m-%d") 
-            else:
-                raise ValueError(f"No maintenance event found with ID {maintenance_id}")
+            moved = self.cursor.rowcount
+            self.__commit()
         except Exception as e:
-            print(f"Failed to get maintenance event date: {e}")
-            return None
+            print(f"Can not archive feedback before {cutoff}: {e}")
+            self.connection.rollback()
+
+            return {"partitions": [], "rows": 0}
+
+        print(f"Archived {len(archived)} partitions and moved {moved} rows of feedback before {cutoff}")
+
+        return {"partitions": archived, "rows": moved}
+
+    def __fill_flight_statuses(self, fillings: int) -> bool:
+        return self.__fill_lookup(
+            "flight_statuses", ("flight_status_type",), ((value,) for value in FLIGHT_STATUSES), "flight_status_id"
+        )
     
-    def __fill_aircraft_maintenance_logs(self, fillings: int) -> bool:
+    def __fill_problems(self, fillings: int) -> bool:
+        return self.__fill_lookup("problems", ("problem_type",), ((value,) for value in PROBLEM_TYPES), "problem_id")
+    
+    def __fill_server_side(self, table: str, fillings: int) -> bool:
+        """Generates the rows of a table with a single INSERT ... SELECT, nothing but the statement is sent."""
         try:
-            maintenance_ids = self.get_table_entries("maintenance_events", "maintenance_id")
-
-            for i in range(50):
-                maintenance_id = self.faker.random.choice(maintenance_ids)
-                maintenace_log_id = self.__get_maintenance_event_date(maintenance_id=maintenance_id)
-                maintenance_log = {
-                    "date": maintenace_log_id,
-                    "check_type": self.faker.random.choice(["Full Inspection", "Routine Check", "Repair", "Emergency Check"]),
-                    "components_checked": [
-                        {
-                            "name": self.faker.random.choice(["Engine", "Avionics", "Hydraulics", "Fuel System", "Electrical System"]),
-                            "status": self.faker.random.choice(["Operational", "Requires Service", "Replaced"]),
-                            "last_replaced": self.faker.date_between(start_date="-1y", end_date="today").strftime("%Y-%m-%d")
-                        } for _ in range(self.faker.random.randint(1, 3))
-                    ]
+            self.cursor.execute(
+                SERVER_SIDE_FILLS[table].format(schema=self.schema_name),
+                {
+                    "fillings": fillings,
+                    "seat_rows": SEAT_ROWS,
+                    "seat_letters": list(SEAT_LETTERS),
+                    "flight_statuses": list(FLIGHT_STATUSES),
+                    "problem_types": list(PROBLEM_TYPES),
+                    "subsystem_types": list(SUBSYSTEM_TYPES),
+                    "maintenance_type_names": list(MAINTENANCE_TYPE_NAMES),
+                    "slot_types": list(SLOT_TYPES)
                 }
+            )
+            self.__rows_attempted += self.cursor.rowcount
+            self.__rows_inserted += self.cursor.rowcount
+            self.__after_write(self.cursor.rowcount)
 
-                self.cursor.execute(
-                    f"""
-                    INSERT INTO {self.schema_name}.aircraft_maintenance_logs (
-                        maintenance_id, aircraft_maintenance_logs_data
-                    ) VALUES (%s, %s)
-                    """,
-                    (maintenance_id, psycopg2.extras.Json(maintenance_log))
-                )
-                self.connection.commit()
-                print(f'{i+1} out of {fillings} for maintenance logs table inserted')
+            # the keys never reached the client, the pool is loaded from the table when it is needed
+            self.key_pool.invalidate(table)
+
+            if table == "maintenance_events":
+                return self.__fill_conflicts(fillings)
         except Exception as e:
-            print(f"Failed to fill aircraft_maintenance_logs table: {e}")
+            print(f"An error occurred: {e}")
+
             return False
-        
+
         return True
 
-    def __fill_customer_feedback_and_survey(self, fillings: int) -> bool:
+    def get_cardinalities(self, scale_factor: float = None) -> dict[str, int]:
+        """Rows of every table at the scale factor (by default the one of the instance), see scale.py."""
+        return scaled_rows(scale_factor or self.scale_factor or 1, {
+            "flight_statuses": len(FLIGHT_STATUSES),
+            "problems": len(PROBLEM_TYPES),
+            "subsystems": len(SUBSYSTEM_TYPES),
+            "maintenance_types": len(MAINTENANCE_TYPE_NAMES),
+            "seat_classes": SEAT_ROWS * len(SEAT_LETTERS),
+            "feedback_archive": 0
+        })
+
+    def __resolve_fillings(self, table: str, fillings: int = None) -> int:
+        if fillings is not None:
+            return fillings
+
+        return self.get_cardinalities()[table] if self.scale_factor else 100
+
+    def fill_table(self, table: str, fillings: int = None, mode: str = None, workers: int = 1, seed: int = None,
+                   strategy: str = "client") -> bool:
+        """
+        Fills a table with generated rows, fillings of them or, by default, as many as the scale factor
+        gives the table (100 without a scale factor). mode overrides the write mode of the instance for this call:
+        "insert" issues one INSERT per row, "copy" streams the rows through COPY FROM STDIN in chunks and
+        "prepared" writes them with prepared multi-row INSERTs of batch_rows rows.
+        With more than one worker or a seed, tables in SHARDED_TABLES are generated by range shards in
+        separate processes, each writing its rows on its own connection and committing on its own, whatever
+        the commit policy. Shards write with prepared INSERTs in the "prepared" mode and with COPY otherwise. The rows only depend on the seed and the reference time (reference_time, or the
+        start of the current day).
+        With the "server" strategy tables in SERVER_SIDE_FILLS are generated by Postgres in one statement,
+        the other tables fall back to the client side fill methods.
+        """
+        if mode is not None and mode not in WRITE_MODES:
+            raise ValueError(f'Unknown write mode {mode}, expected one of {WRITE_MODES}')
+        if strategy not in FILL_STRATEGIES:
+            raise ValueError(f'Unknown fill strategy {strategy}, expected one of {FILL_STRATEGIES}')
+
+        fillings = self.__resolve_fillings(table, fillings)
+
+        server_side = strategy == "server" and table in SERVER_SIDE_FILLS
+        sharded = (workers > 1 or seed is not None) and table in SHARDED_TABLES and not server_side
+
+        self.__rows_attempted = 0
+        self.__rows_inserted = 0
+        self.__generation_wait = 0.0
+        self.__shard_counters = dict.fromkeys(CONNECTION_COUNTERS, 0)
+        failed_rows = self.__count_failed_rows()
+        counters = dict(self.connection.counters)
+        started = perf_counter()
+
+        if sharded:
+            previous_mode = self.write_mode
+            self.write_mode = mode or self.write_mode
+            try:
+                fill = self.__fill_sharded(table, fillings, workers, seed)
+            finally:
+                self.write_mode = previous_mode
+            if fill and self.__checkpoint is not None:
+                # the shards committed on their own connections
+                self.__complete_checkpoint(table)
+                self.__commit()
+        else:
+            fill = self.__fill(table, fillings, mode, server_side)
+
+        self.__record_metrics(table, fill, perf_counter() - started, counters, failed_rows)
+
+        return fill
+
+    def __fill(self, table: str, fillings: int, mode: str, server_side: bool) -> bool:
+        previous_mode = self.write_mode
+        self.write_mode = mode or self.write_mode
+        self.__begin_fill()
         try:
-            customer_ids = self.get_table_entries("customers", "customer_id")
-            
-            for i in range(fillings):
-                customer_id = self.faker.random.choice(customer_ids)
-                comment_chance = self.faker.boolean(chance_of_getting_true=50)
-                feedback_survey = {
-                    "survey_date": self.faker.date_between(start_date="-1y", end_date="today").strftime("%Y-%m-%d"),
-                    "rating": self.faker.random.randint(1, 5),
-                    "comments": self.faker.sentence(nb_words=10) if comment_chance else "No comments",
-                    "topics": {
-                        "comfort": self.faker.random.randint(1, 5),
-                        "service": self.faker.random.randint(1, 5),
-                        "cleanliness": self.faker.random.randint(1, 5),
-                        "entertainment": self.faker.random.randint(1, 5)
-                    }
-                }
+            if server_side:
+                fill = self.__fill_server_side(table, fillings)
+            else:
+                fill = self.filling_mapper[table](fillings)
+        except Exception as e:
+            # e.g. a key lookup outside the try of a fill method, the savepoint or transaction is still ended below
+            print(f"An error occurred while filling {table}: {e}")
+            fill = False
+        finally:
+            self.write_mode = previous_mode
+        if fill:
+            # committed or rolled back together with the last rows of the table
+            self.__complete_checkpoint(table)
+        self.__end_fill(fill)
+
+        if fill:
+            failed = len(self.failed_rows.get(table, []))
+            print(f'Successfully filled {table} with {fillings}' + (f' ({failed} rows rejected)' if failed else ''))
+        else:
+            print(f'Can not fill {table}')
+
+        return fill
+
+    def __count_failed_rows(self) -> int:
+        return sum(len(rows) for rows in self.failed_rows.values())
+
+    def __record_metrics(self, table: str, fill: bool, wall_seconds: float, counters: dict, failed_rows: int) -> None:
+        counters = {
+            name: self.connection.counters[name] - value + self.__shard_counters[name]
+            for name, value in counters.items()
+        }
+
+        metrics = {
+            "filled": fill,
+            "rows_attempted": self.__rows_attempted,
+            "rows_inserted": self.__rows_inserted,
+            "rows_failed": self.__count_failed_rows() - failed_rows,
+            "wall_seconds": wall_seconds,
+            # everything that is not spent waiting on this connection, i.e. generating and serializing rows
+            "generation_seconds": max(wall_seconds - counters["db_seconds"], 0),
+            # the part of it the writer spent waiting for the next chunk, generation not overlapped with writing
+            "generation_wait_seconds": self.__generation_wait,
+            "db_seconds": counters["db_seconds"],
+            "statements": counters["statements"],
+            "commits": counters["commits"],
+            "round_trips": counters["round_trips"],
+            "bytes_sent": counters["bytes_sent"]
+        }
+        self.metrics[table] = metrics
+
+        for hook in self.metric_hooks:
+            hook(table, metrics)
+
+    def add_metrics_hook(self, hook) -> None:
+        """Registers a callable that is called with (table, metrics) after every fill_table."""
+        self.metric_hooks.append(hook)
+
+    def dump_metrics(self, path: str, tables: list[str] = None, metrics_format: str = "json") -> None:
+        """Writes the metrics of the given (by default all filled) tables as JSON or in the Prometheus text format."""
+        if metrics_format not in METRICS_FORMATS:
+            raise ValueError(f'Unknown metrics format {metrics_format}, expected one of {METRICS_FORMATS}')
+
+        metrics = {table: self.metrics[table] for table in (tables or self.metrics) if table in self.metrics}
+        with open(path, "w") as file:
+            if metrics_format == "json":
+                json.dump(metrics, file, indent=4)
+            else:
+                file.write(metrics_to_prometheus(metrics))
+
+    def fill_tables(self, filling_order: tuple[str], fillings: int = None, mode: str = None,
+                    strategy: str = "client", metrics_output: str = None, metrics_format: str = "json",
+                    defer_constraints: bool = False, run_name: str = None) -> dict[str, bool]:
+        """
+        Fills the tables in the given order. With the "run" commit policy the whole run is one transaction,
+        a table that can not be filled is rolled back to its savepoint without affecting the others.
+        With defer_constraints the foreign keys and triggers of the tables are suspended during the run and
+        validated afterwards, see suspend_constraints. The metrics of the run are written to metrics_output
+        at the end, if given.
+        With a run_name the progress of the run is checkpointed in the fill_checkpoints table: starting a run
+        of the same name again skips the tables it completed and continues a table after its last committed chunk.
+        """
+        if defer_constraints and not self.suspend_constraints(filling_order):
+            return {table: False for table in filling_order}
+        if run_name is not None:
+            self.__create_checkpoint_table()
+
+        self.__in_run = True
+        try:
+            results = {
+                table: self.__fill_checkpointed(run_name, table, fillings, mode, strategy) if run_name is not None
+                else self.fill_table(table=table, fillings=fillings, mode=mode, strategy=strategy)
+                for table in filling_order
+            }
+        finally:
+            self.__in_run = False
+
+            if self.commit_policy == "run":
+                self.__commit()
+            if defer_constraints:
+                self.restore_constraints()
+
+        if metrics_output:
+            self.dump_metrics(metrics_output, list(filling_order), metrics_format)
+
+        return results
+
+    def __create_checkpoint_table(self) -> None:
+        self.cursor.execute(CREATE_CHECKPOINT_TABLE.format(schema=self.schema_name))
+        self.__commit()
+
+    def __fill_checkpointed(self, run_name: str, table: str, fillings: int, mode: str, strategy: str) -> bool:
+        """fill_table for a table of a named run, skipped if the run completed it and continued if it started it."""
+        fillings = self.__resolve_fillings(table, fillings)
+
+        # committed with the first rows of the table
+        self.cursor.execute(START_CHECKPOINT.format(schema=self.schema_name), (run_name, table))
+        rows_done, completed = self.cursor.fetchone()
+        if completed:
+            print(f'Skipped {table}, run {run_name} completed it already')
+            return True
+        if rows_done:
+            print(f'Resuming {table} of run {run_name} after {rows_done} of {fillings} rows')
+
+        self.__checkpoint = (run_name, table)
+        self.__resumed_rows = min(rows_done, fillings)
+        try:
+            return self.fill_table(table=table, fillings=max(fillings - rows_done, 0), mode=mode, strategy=strategy)
+        finally:
+            self.__checkpoint = None
+            self.__resumed_rows = 0
+
+    def get_checkpoints(self, run_name: str) -> dict[str, dict]:
+        """The checkpoints of a named run per table: rows written and whether the table is completed."""
+        self.cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (f'{self.schema_name}.{CHECKPOINT_TABLE}',))
+        if not self.cursor.fetchone()[0]:
+            return {}
+
+        self.cursor.execute(
+            f"SELECT table_name, rows_done, completed, updated_at FROM {self.schema_name}.{CHECKPOINT_TABLE} "
+            f"WHERE run_name = %s ORDER BY updated_at",
+            (run_name,)
+        )
+
+        return {
+            table: {"rows_done": rows_done, "completed": completed, "updated_at": updated_at}
+            for table, rows_done, completed, updated_at in self.cursor.fetchall()
+        }
+
+    def clear_checkpoints(self, run_name: str) -> None:
+        """Forgets the progress of a named run, so a run of that name starts over."""
+        self.__create_checkpoint_table()
+        self.cursor.execute(f"DELETE FROM {self.schema_name}.{CHECKPOINT_TABLE} WHERE run_name = %s", (run_name,))
+        self.__commit()
+
+    def __begin_fill(self) -> None:
+        # outside of fill_tables the "run" policy commits once per fill like "table"
+        if self.commit_policy == "run" and self.__in_run:
+            self.cursor.execute("SAVEPOINT fill_table")
+
+    def __end_fill(self, fill: bool) -> None:
+        if self.commit_policy == "run" and self.__in_run:
+            self.cursor.execute("RELEASE SAVEPOINT fill_table" if fill else "ROLLBACK TO SAVEPOINT fill_table")
+            self.__row_savepoint = False
+        elif fill:
+            self.__commit()
+        else:
+            # never leave the connection in an aborted transaction after a failed fill
+            self.connection.rollback()
+            self.__pending_rows = 0
+            self.__row_savepoint = False
+
+        if not fill:
+            # pooled keys of rolled back rows would point to nothing
+            self.key_pool.invalidate()
+
+    def suspend_constraints(self, tables: tuple[str] = None) -> bool:
+        """
+        Drops the foreign keys and disables the user triggers of the tables (by default every table), so a bulk
+        load does not check every row against the referenced tables and the triggers of section_C.sql. They are
+        recorded in the suspended_constraints table of the schema in the same transaction, restore_constraints
+        brings them back, also after a load that failed or was killed halfway.
+        """
+        tables = list(tables or self.get_tables())
+        try:
+            self.cursor.execute(CREATE_SUSPENDED_TABLE.format(schema=self.schema_name))
+
+            self.cursor.execute(FOREIGN_KEYS, (self.schema_name, tables))
+            foreign_keys = self.cursor.fetchall()
+            self.cursor.execute(ENABLED_TRIGGERS, (self.schema_name, tables))
+            triggers = self.cursor.fetchall()
+
+            for table, name, definition, columns, referenced_table, referenced_columns in foreign_keys:
+                self.cursor.execute(
+                    f"""
+                    INSERT INTO {self.schema_name}.{SUSPENDED_TABLE}
+                        (kind, table_name, name, definition, columns, referenced_table, referenced_columns)
+                    VALUES ('foreign_key', %s, %s, %s, %s, %s, %s)
+                    """,
+                    (table, name, definition, columns, referenced_table, referenced_columns)
+                )
+                self.cursor.execute(f"ALTER TABLE {self.schema_name}.{table} DROP CONSTRAINT {name}")
+
+            for table, name in triggers:
                 self.cursor.execute(
-                    f"INSERT INTO {self.schema_name}.customer_feedback_and_survey (customer_id, customer_feedback_and_survey_data) VALUES (%s, %s)",
-                    (customer_id, Json(feedback_survey))
+                    f"INSERT INTO {self.schema_name}.{SUSPENDED_TABLE} (kind, table_name, name) VALUES ('trigger', %s, %s)",
+                    (table, name)
                 )
-                self.connection.commit()
-                print(f'{i+1} out of {fillings} for feedback table inserted')
+                self.cursor.execute(f"ALTER TABLE {self.schema_name}.{table} DISABLE TRIGGER {name}")
+
+            self.__commit()
         except Exception as e:
-            print(f"Failed to fill customer_feedback_and_survey table: {e}")
+            print(f"Can not suspend the constraints of {tables}: {e}")
+            self.connection.rollback()
+
             return False
-        
+
+        print(f"Suspended {len(foreign_keys)} foreign keys and {len(triggers)} triggers")
+
         return True
-    
-    def __fill_flight_statuses(self, fillings: int) -> bool:
+
+    def __get_suspended(self) -> list[tuple]:
+        self.cursor.execute("SELECT to_regclass(%s)", (f"{self.schema_name}.{SUSPENDED_TABLE}",))
+        if self.cursor.fetchone()[0] is None:
+            return []
+
+        self.cursor.execute(
+            f"""
+            SELECT kind, table_name, name, definition, columns, referenced_table, referenced_columns
+            FROM {self.schema_name}.{SUSPENDED_TABLE}
+            ORDER BY kind, table_name, name
+            """
+        )
+
+        return self.cursor.fetchall()
+
+    def __forget_suspended(self, kind: str, table: str, name: str) -> None:
+        self.cursor.execute(
+            f"DELETE FROM {self.schema_name}.{SUSPENDED_TABLE} WHERE kind = %s AND table_name = %s AND name = %s",
+            (kind, table, name)
+        )
+
+    def __find_violations(self, query: str, sample: int) -> dict:
+        self.cursor.execute(f"SELECT count(*) FROM ({query}) AS violations")
+        rows = self.cursor.fetchone()[0]
+        self.cursor.execute(f"{query} LIMIT %s", (sample,))
+
+        return {"rows": rows, "sample": self.cursor.fetchall()}
+
+    def restore_constraints(self, sample: int = 10) -> dict:
+        """
+        Restores what suspend_constraints suspended. Every foreign key is added back NOT VALID, which checks new
+        rows right away, and then validated with one VALIDATE CONSTRAINT scan. A key the loaded rows violate
+        stays NOT VALID and its violating rows are counted with one anti join. The triggers are enabled again
+        and their checks are run once over the loaded rows: flights overlapping maintenance are reported,
+        stale feedback is moved to the archive. Every item is committed on its own, so a failing restore can be
+        run again. Returns {"table.name": {"rows": count, "sample": first sample rows}}, also kept in
+        orm.constraint_violations.
+        """
+        violations = {}
+        try:
+            suspended = self.__get_suspended()
+            for kind, table, name, definition, columns, referenced_table, referenced_columns in suspended:
+                if kind != "foreign_key":
+                    continue
+
+                self.cursor.execute(f"ALTER TABLE {self.schema_name}.{table} ADD CONSTRAINT {name} {definition} NOT VALID")
+                self.__forget_suspended(kind, table, name)
+                self.__commit()
+
+                try:
+                    self.cursor.execute(f"ALTER TABLE {self.schema_name}.{table} VALIDATE CONSTRAINT {name}")
+                    self.__commit()
+                except psycopg2.Error as e:
+                    self.connection.rollback()
+                    violations[f"{table}.{name}"] = self.__find_violations(
+                        violations_query(self.schema_name, table, columns, referenced_table, referenced_columns),
+                        sample
+                    )
+                    self.connection.rollback()
+                    print(f"{table}.{name} stays NOT VALID: {str(e).strip()}")
+
+            for kind, table, name, *_ in suspended:
+                if kind != "trigger":
+                    continue
+
+                self.cursor.execute(f"ALTER TABLE {self.schema_name}.{table} ENABLE TRIGGER {name}")
+                self.__forget_suspended(kind, table, name)
+                if name in TRIGGER_CATCH_UPS:
+                    self.cursor.execute(TRIGGER_CATCH_UPS[name].format(schema=self.schema_name))
+                self.__commit()
+
+                if name in TRIGGER_CHECKS:
+                    found = self.__find_violations(TRIGGER_CHECKS[name].format(schema=self.schema_name), sample)
+                    self.connection.rollback()
+                    if found["rows"]:
+                        violations[f"{table}.{name}"] = found
+                        print(f"{found['rows']} rows of {table} violate {name}")
+
+            if suspended:
+                self.cursor.execute(f"DROP TABLE IF EXISTS {self.schema_name}.{SUSPENDED_TABLE}")
+                self.__commit()
+        except Exception as e:
+            print(f"Can not restore the suspended constraints, run restore_constraints again: {e}")
+            self.connection.rollback()
+        finally:
+            # rows loaded without checks may reference keys that are not pooled
+            self.key_pool.invalidate()
+
+        self.constraint_violations = violations
+
+        return violations
+
+    def get_table_dependencies(self, tables: tuple[str] = None) -> dict[str, set[str]]:
+        """
+        Reads the foreign keys of the schema from pg_constraint and returns the tables every table depends on.
+        Only dependencies among the given tables are kept, the others are expected to be filled already.
+        """
+        if tables is None:
+            tables = [table for table in self.filling_mapper if table not in TRIGGER_FILLED_TABLES]
+
+        self.cursor.execute(
+            """
+            SELECT child.relname, parent.relname
+            FROM pg_constraint con
+            JOIN pg_class child ON child.oid = con.conrelid
+            JOIN pg_class parent ON parent.oid = con.confrelid
+            JOIN pg_namespace ns ON ns.oid = child.relnamespace
+            WHERE con.contype = 'f' AND ns.nspname = %s
+            """,
+            (self.schema_name,)
+        )
+        references = self.cursor.fetchall()
+        # foreign keys dropped by suspend_constraints still order the fills
+        references += [(table, referenced) for kind, table, _, _, _, referenced, _ in self.__get_suspended() if kind == "foreign_key"]
+
+        dependencies = {table: set(FILL_DEPENDENCIES.get(table, set())) & set(tables) for table in tables}
+        for child, parent in references:
+            # seat_classes references itself, which does not order anything
+            if child in dependencies and parent in dependencies and child != parent:
+                dependencies[child].add(parent)
+
+        return dependencies
+
+    def get_filling_order(self, tables: tuple[str] = None) -> list[str]:
+        """Topological order of the tables, every table comes after the tables it references."""
+        remaining = self.get_table_dependencies(tables)
+
+        order = []
+        while remaining:
+            ready = sorted(table for table, dependencies in remaining.items() if not dependencies)
+            if not ready:
+                raise ValueError(f'Foreign keys between {sorted(remaining)} form a cycle')
+
+            for table in ready:
+                order.append(table)
+                del remaining[table]
+            for dependencies in remaining.values():
+                dependencies.difference_update(ready)
+
+        return order
+
+    def fill_tables_parallel(self, tables: tuple[str] = None, fillings: int = None, workers: int = 8, mode: str = None,
+                             strategy: str = "client", metrics_output: str = None,
+                             metrics_format: str = "json", defer_constraints: bool = False,
+                             run_name: str = None) -> dict[str, bool]:
+        """
+        Fills the tables concurrently on a pool of connections. A table is started as soon as every table
+        it depends on is filled, so independent tables (e.g. customers, airlines, airports) load at the same time.
+        Tables depending on a table that could not be filled are skipped. With defer_constraints the foreign
+        keys and triggers are suspended during the load, and with a run_name the load is checkpointed, see fill_tables.
+        Metric hooks are called from the worker threads.
+        """
+        dependencies = self.get_table_dependencies(tables)
+        # raises on cycles before any connection is opened
+        self.get_filling_order(tuple(dependencies))
+
+        if defer_constraints:
+            if not self.suspend_constraints(tuple(dependencies)):
+                return {table: False for table in dependencies}
+            try:
+                return self.fill_tables_parallel(tuple(dependencies), fillings, workers, mode, strategy,
+                                                 metrics_output, metrics_format, run_name=run_name)
+            finally:
+                self.restore_constraints()
+
+        if run_name is not None:
+            self.__create_checkpoint_table()
+
+        orms = Queue()
+        for _ in range(min(workers, len(dependencies))):
+            orms.put(self.clone())
+
+        def fill(table: str) -> bool:
+            orm = orms.get()
+            try:
+                if run_name is not None:
+                    fill = orm.__fill_checkpointed(run_name, table, fillings, mode, strategy)
+                else:
+                    fill = orm.fill_table(table=table, fillings=fillings, mode=mode, strategy=strategy)
+                # tables a named run completed before are not filled and have no metrics
+                if table in orm.metrics:
+                    self.metrics[table] = orm.metrics[table]
+
+                return fill
+            finally:
+                orms.put(orm)
+
+        def skip_dependents(failed: str) -> None:
+            for table in [table for table, required in dependencies.items() if failed in required]:
+                # may already be skipped through another failed dependency
+                if table not in dependencies:
+                    continue
+                del dependencies[table]
+                results[table] = False
+                print(f'Skipped {table}, {failed} could not be filled')
+                skip_dependents(table)
+
+        results = {}
+        running = {}
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                while dependencies or running:
+                    for table in [table for table, required in dependencies.items() if not required]:
+                        del dependencies[table]
+                        running[executor.submit(fill, table)] = table
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        table = running.pop(future)
+                        try:
+                            results[table] = future.result()
+                        except Exception as e:
+                            print(f'Can not fill {table}: {e}')
+                            results[table] = False
+
+                        if results[table]:
+                            for required in dependencies.values():
+                                required.discard(table)
+                        else:
+                            skip_dependents(table)
+        finally:
+            while not orms.empty():
+                orms.get().close()
+
+        # the tables were written on other connections
+        self.key_pool.invalidate()
+
+        if metrics_output:
+            self.dump_metrics(metrics_output, list(results), metrics_format)
+
+        return results
+
+    def __fill_sharded(self, table: str, fillings: int, workers: int, seed: int = None) -> bool:
+        if seed is None:
+            seed = int(self.rng.integers(2 ** 63))
+
+        returning = None
+        first_key = None
+        spool_dir = None
         try:
-            flight_statuses = [
-                "Cancelled",
-                "Delayed",
-                "On-time"
+            spec = SHARDED_TABLES[table]
+            if spec is None:
+                # the same completed plan as the unsharded fill, so both write the same columns and distributions
+                plan = self.get_generation_plan(table)
+                spec = {"rows": plan, "columns": plan.columns, "returning": plan.returning}
+            returning = spec["returning"]
+
+            pools = self.__get_pools(table)
+            if table == "seats":
+                # only the missing seats like __fill_seats: the flights partly seated by an interrupted fill are
+                # completed here, the shards write all seats of the flights that have none
+                self.__write_missing_seats(seated_flights=True)
+                self.__commit()
+                pools["flight_data"] = self.__get_unseated_flights()
+                fillings = len(pools["flight_data"]) * len(pools["seat_classes"])
+            if table == "bookings" and fillings > 0:
+                # the blocks can not share an allocator, the seats of all bookings are drawn up front from the seed
+                # into a file the shards map, so they are not held in memory
+                spool_dir = tempfile.mkdtemp(prefix="seats_")
+                pools["seats"] = AllocatedSeats.spool(
+                    self.__get_paged_seats(np.random.default_rng([seed, 0]), fillings),
+                    np.random.default_rng([seed, 1]),
+                    fillings,
+                    os.path.join(spool_dir, "seats.npy"),
+                    self.chunk_size
+                )
+                fillings = len(pools["seats"])
+            if fillings <= 0:
+                print(f'Nothing to fill in {table}')
+                return True
+
+            # keys follow the position of the row, so they do not depend on the shards either
+            first_key = self.__reserve_key_range(table, returning, fillings)
+            self.__commit()
+
+            # pinned, so the rows do not depend on the time the fill runs at
+            now = self.reference_time or datetime.combine(date.today(), time())
+            shards = [
+                (
+                    self.get_connection_kwargs(), self.schema_name, table, spec, blocks, fillings, seed, pools, now,
+                    first_key, self.value_pools, self.write_mode, self.batch_rows
+                )
+                for blocks in split_blocks(fillings, workers)
             ]
-            for status in flight_statuses:
+
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(write_shard, *zip(*shards)))
+            else:
+                results = [write_shard(*shard) for shard in shards]
+
+            written = sum(rows for rows, _ in results)
+            for _, counters in results:
+                for name, value in counters.items():
+                    self.__shard_counters[name] += value
+
+            self.__rows_attempted += fillings
+            self.__rows_inserted += written
+            self.__remember_keys(table, returning, KeyRange(first_key, first_key + written))
+
+            if table == "bookings":
+                self.__book_seats(first_key, first_key + written - 1)
+                self.__commit()
+            elif table == "maintenance_events":
+                self.__fill_conflicts(fillings)
+                self.__commit()
+        except Exception as e:
+            print(f'Can not fill {table} in shards: {e}')
+            self.connection.rollback()
+
+            if first_key is not None:
+                # the shards that succeeded are committed already, their rows are the only ones in the reserved range
                 self.cursor.execute(
-                    f'INSERT INTO {self.schema_name}.flight_statuses (flight_status_type) VALUES (%s)',
-                    (status,)
+                    f"DELETE FROM {self.schema_name}.{table} WHERE {returning} BETWEEN %s AND %s",
+                    (first_key, first_key + fillings - 1)
                 )
+                self.__commit()
+                self.key_pool.invalidate(table)
+
+            return False
+        finally:
+            if spool_dir is not None:
+                shutil.rmtree(spool_dir, ignore_errors=True)
 
-            self.connection.commit()
+        print(f'Successfully filled {table} with {written} rows in {len(shards)} shards')
+
+        return True
+
+    def build_dataset(self, seed: int, fillings: int = 100, frequent_flyers: int = 3, reference_time: datetime = None,
+                      cache_dir: str = DATASET_CACHE_DIR) -> bool:
+        """
+        Generates a reproducible dataset into the (empty) schema and stores every table as a binary COPY file
+        in cache_dir. The dataset is keyed by the seed, the fill sizes, the reference time, the settings the rows
+        depend on (write mode, chunk size, value pool size and scale factor) and a hash of create_statements.sql;
+        when it was built before it is reloaded instead of generated. reference_time defaults to the start of
+        the current day.
+        """
+        if reference_time is None:
+            reference_time = datetime.combine(date.today(), time())
+
+        # columns are drawn a chunk at a time and strings from pools of the pool size, the rows change with both
+        inputs = {
+            "seed": seed,
+            "fillings": fillings,
+            "frequent_flyers": frequent_flyers,
+            "reference_time": reference_time.isoformat(),
+            "write_mode": self.write_mode,
+            "chunk_size": self.chunk_size,
+            "value_pool_size": self.value_pools.size,
+            "scale_factor": self.scale_factor
+        }
+        path = os.path.join(cache_dir, dataset_key(inputs))
+        if is_dataset(path):
+            print(f'Reloading dataset {path}')
+            return self.restore_dataset(path)
+
+        self.seed_generators(seed, reference_time)
+
+        tables = self.get_filling_order()
+        results = self.fill_tables(tables, fillings=fillings)
+        if not all(results.values()):
+            print(f'Can not build dataset, failed to fill {[table for table, fill in results.items() if not fill]}')
+            return False
+        if frequent_flyers and not self.fill_frequent_flyers(frequent_flyers):
+            return False
+
+        return self.dump_dataset(path, [*tables, *TRIGGER_FILLED_TABLES], inputs=inputs)
+
+    def __get_stored_columns(self, table: str) -> list[str]:
+        # generated columns can not be written by COPY, they are computed again when the rows are loaded
+        self.cursor.execute(
+            """
+            SELECT column_name FROM information_schema.columns
+            WHERE table_schema = %s AND table_name = %s AND is_generated = 'NEVER'
+            ORDER BY ordinal_position
+            """,
+            (self.schema_name, table)
+        )
+
+        return [row[0] for row in self.cursor.fetchall()]
+
+    def dump_dataset(self, path: str, tables: list[str] = None, inputs: dict = None) -> bool:
+        """Writes the tables, in load order, and the state of the sequences of the schema to path."""
+        if tables is None:
+            tables = [*self.get_filling_order(), *TRIGGER_FILLED_TABLES]
+
+        # written next to the target first, so an interrupted dump never looks like a dataset
+        partial_path = f'{path}.partial'
+        try:
+            shutil.rmtree(partial_path, ignore_errors=True)
+            os.makedirs(partial_path)
+
+            columns = {table: self.__get_stored_columns(table) for table in tables}
+            for table in tables:
+                dump_table(self.cursor, self.schema_name, table, columns[table], os.path.join(partial_path, f'{table}.copy'))
+
+            self.cursor.execute(
+                "SELECT sequencename, last_value FROM pg_sequences WHERE schemaname = %s ORDER BY sequencename",
+                (self.schema_name,)
+            )
+            write_manifest(partial_path, {
+                "inputs": inputs or {},
+                "tables": {table: self.__count_rows(table) for table in tables},
+                "load_order": tables,
+                "columns": columns,
+                "sequences": dict(self.cursor.fetchall())
+            })
+            self.connection.rollback()
+
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(partial_path, path)
         except Exception as e:
-            print(f"An error occurred: {e}")
+            print(f'Can not dump dataset to {path}: {e}')
+            self.connection.rollback()
+            shutil.rmtree(partial_path, ignore_errors=True)
 
             return False
-        
+
+        print(f'Dataset written to {path}')
+
         return True
-    
-    def __fill_problems(self, fillings: int) -> bool:
+
+    def restore_dataset(self, path: str) -> bool:
+        """
+        Replaces the content of the dataset tables with a dataset written by dump_dataset in one transaction.
+        Triggers are disabled while loading, the rows already went through them when the dataset was built.
+        """
         try:
-            problem_types = [
-                "Everything Ok",
-                "Engine Failure",
-                "Avionics Issue",
-                "Fuel System Leak",
-                "Hydraulic Failure",
-                "Tire Damage",
-                "Wing Deformity",
-                "Sensor Malfunction",
-                "Landing Gear Issue",
-                "Cabin Pressure Problem",
-                "Electrical System Issue"
-            ]
-            
-            for problem_type in problem_types:
+            manifest = read_manifest(path)
+            tables = manifest["load_order"]
+
+            self.cursor.execute(f'TRUNCATE {", ".join(f"{self.schema_name}.{table}" for table in tables)}')
+            for table in tables:
+                self.cursor.execute(f"ALTER TABLE {self.schema_name}.{table} DISABLE TRIGGER USER")
+                load_table(self.cursor, self.schema_name, table, manifest["columns"][table], os.path.join(path, f'{table}.copy'))
+                self.cursor.execute(f"ALTER TABLE {self.schema_name}.{table} ENABLE TRIGGER USER")
+
+            for sequence, last_value in manifest["sequences"].items():
+                # sequences that were never used restart at 1
                 self.cursor.execute(
-                    f'INSERT INTO {self.schema_name}.problems (problem_type) VALUES (%s)',
-                    (problem_type,)
+                    "SELECT setval(%s, %s, %s)",
+                    (f'{self.schema_name}.{sequence}', last_value or 1, last_value is not None)
                 )
 
-            self.connection.commit()
+            if self.has_reporting_aggregates():
+                # TRUNCATE and the disabled triggers bypassed the summaries
+                self.cursor.execute(REBUILD_AGGREGATES.format(schema=self.schema_name))
+
+            self.__commit()
         except Exception as e:
-            print(f"An error occurred: {e}")
+            print(f'Can not restore dataset from {path}: {e}')
+            self.connection.rollback()
 
             return False
-        
+        finally:
+            self.key_pool.invalidate()
+
+        print(f'Restored {sum(manifest["tables"].values())} rows from {path}')
+
         return True
-    
-    def fill_table(self, table: str, fillings: int = 100) -> bool:
-        fill = self.filling_mapper[table](fillings)
-        if fill:
-            print(f'Successfully filled {table} with {fillings}')
-        else:
-            print(f'Can not fill {table}')
\ No newline at end of file
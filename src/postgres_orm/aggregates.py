@@ -0,0 +1,82 @@
+# Summary tables of sql/reporting_aggregates.sql, kept up to date by statement triggers on bookings.
+# {schema} is replaced with the schema of the ORM.
+AGGREGATE_FILE = "reporting_aggregates.sql"
+AGGREGATE_TABLES = ("flight_revenue", "monthly_bookings", "customer_spend")
+
+# recomputes the summaries from bookings, e.g. after the triggers were disabled or flights changed
+REBUILD_AGGREGATES = """
+    TRUNCATE {schema}.flight_revenue, {schema}.monthly_bookings, {schema}.customer_spend;
+
+    INSERT INTO {schema}.flight_revenue (flight_id, total_revenue, total_bookings, paid_bookings, unpaid_bookings)
+    SELECT
+        flight_id,
+        SUM(CASE WHEN payment_status THEN price ELSE 0 END),
+        COUNT(*),
+        SUM(CASE WHEN payment_status THEN 1 ELSE 0 END),
+        SUM(CASE WHEN NOT payment_status THEN 1 ELSE 0 END)
+    FROM {schema}.bookings
+    GROUP BY flight_id;
+
+    INSERT INTO {schema}.monthly_bookings (booking_month, total_bookings, total_revenue)
+    SELECT date_trunc('month', booking_date_and_time)::DATE, COUNT(*), SUM(price)
+    FROM {schema}.bookings
+    GROUP BY 1;
+
+    INSERT INTO {schema}.customer_spend (customer_id, total_bookings, total_flying_time, total_money_spent)
+    SELECT b.customer_id, COUNT(*), SUM(f.flight_length), SUM(b.price)
+    FROM {schema}.bookings b
+    JOIN {schema}.flight_data fd ON b.flight_id = fd.flight_id
+    JOIN {schema}.flights f ON fd.flight_number = f.flight_number
+    GROUP BY b.customer_id;
+"""
+
+# the report queries read from the summaries, same columns and order as in section_A.sql
+AGGREGATE_QUERIES = {
+    "Q6": """
+        SELECT
+            fd.flight_id,
+            fd.flight_number,
+            COALESCE(fr.total_revenue, 0) AS total_revenue,
+            COALESCE(fr.total_bookings, 0) AS total_bookings,
+            COALESCE(fr.paid_bookings, 0) AS paid_bookings,
+            COALESCE(fr.unpaid_bookings, 0) AS unpaid_bookings
+        FROM {schema}.flight_data fd
+        LEFT JOIN {schema}.flight_revenue fr ON fd.flight_id = fr.flight_id
+        ORDER BY total_revenue DESC
+    """,
+    # months are disjoint, so the first month of a month name orders like its first booking
+    "Q10": """
+        SELECT
+            TO_CHAR(booking_month, 'Month') AS booking_month_name,
+            SUM(total_bookings) AS total_bookings,
+            SUM(total_revenue) AS total_revenue
+        FROM {schema}.monthly_bookings
+        WHERE total_bookings > 0
+        GROUP BY booking_month_name
+        ORDER BY MIN(booking_month)
+    """,
+    "Q11": """
+        SELECT
+            f.flight_number,
+            f.origin AS origin_airport,
+            f.destination AS destination_airport,
+            COALESCE(fr.total_bookings, 0) AS total_bookings
+        FROM {schema}.flights f
+        LEFT JOIN {schema}.flight_revenue fr ON CAST(fr.flight_id AS VARCHAR) = f.flight_number
+        ORDER BY total_bookings DESC
+        LIMIT %(limit)s
+    """,
+    "Q12": """
+        SELECT
+            c.customer_id,
+            c.name AS customer_name,
+            cs.total_bookings,
+            cs.total_flying_time,
+            cs.total_money_spent
+        FROM {schema}.customer_spend cs
+        JOIN {schema}.customers c ON c.customer_id = cs.customer_id
+        WHERE cs.total_bookings > 0
+        ORDER BY cs.total_flying_time DESC, cs.total_money_spent DESC
+        LIMIT %(limit)s
+    """
+}
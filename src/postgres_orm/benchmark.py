@@ -0,0 +1,192 @@
+import argparse
+import json
+import time
+from datetime import datetime
+
+import numpy as np
+import psycopg2
+
+from . import PostgresORM
+from .queries import parse_query_file, read_sql_file
+
+BENCHMARK_SCALES = (1000, 10000, 100000)
+# section_C.sql only defines triggers, they are timed through inserts that fire them
+TRIGGER_STATEMENTS = {
+    "T1": """
+        INSERT INTO {schema}.flight_data (flight_number, aircraft_registration_number, flight_status_id, problem_id, number_of_passengers, number_of_cabin_crew, number_of_flight_crew, available_seating, scheduled_departure_date, scheduled_departure_time)
+        SELECT flight_number, aircraft_registration_number, flight_status_id, problem_id, number_of_passengers, number_of_cabin_crew, number_of_flight_crew, available_seating, scheduled_departure_date, scheduled_departure_time
+        FROM {schema}.flight_data
+        LIMIT 1
+    """,
+    "T2": """
+        INSERT INTO {schema}.customer_feedback_and_survey (customer_id, customer_feedback_and_survey_data, survey_date)
+        SELECT customer_id, customer_feedback_and_survey_data, survey_date
+        FROM {schema}.customer_feedback_and_survey
+        LIMIT 1
+    """
+}
+
+
+def reset_schema(orm) -> None:
+    """Drops and recreates the schema of the ORM with its tables and triggers. Only meant for a throwaway database."""
+    orm.cursor.execute(f"DROP SCHEMA IF EXISTS {orm.schema_name} CASCADE")
+    orm.cursor.execute(f"CREATE SCHEMA {orm.schema_name}")
+    orm.cursor.execute(read_sql_file("create_statements.sql", orm.schema_name))
+    orm.cursor.execute(read_sql_file("section_C.sql", orm.schema_name))
+    orm.connection.commit()
+
+    # the ORM may have been created on the empty database, its tables are the new ones now
+    orm.reload_schema()
+
+
+def count_rows(orm, table: str) -> int:
+    orm.cursor.execute(f"SELECT count(*) FROM {orm.schema_name}.{table}")
+
+    return orm.cursor.fetchone()[0]
+
+
+def benchmark_fills(orm, fillings: int) -> dict[str, dict]:
+    """Fills every table in the order of its foreign keys and measures the rows and round trips of each fill."""
+    results = {}
+    for table in orm.get_filling_order():
+        rows_before = count_rows(orm, table)
+        round_trips = orm.connection.round_trips
+
+        started = time.perf_counter()
+        fill = orm.fill_table(table=table, fillings=fillings)
+        seconds = time.perf_counter() - started
+
+        round_trips = orm.connection.round_trips - round_trips
+        rows = count_rows(orm, table) - rows_before
+
+        results[table] = {
+            "fill": fill,
+            "rows": rows,
+            "seconds": seconds,
+            "rows_per_second": rows / seconds if seconds else None,
+            "round_trips": round_trips,
+            "round_trips_per_row": round_trips / rows if rows else None
+        }
+
+    return results
+
+
+def time_statement(orm, statement: str, repeats: int) -> dict:
+    """Runs a statement repeats times, every run is rolled back so the dataset stays the same."""
+    samples = []
+    rows = None
+    error = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        try:
+            orm.cursor.execute(statement)
+            rows = orm.cursor.rowcount
+            if orm.cursor.description:
+                orm.cursor.fetchall()
+        except psycopg2.Error as e:
+            # e.g. T1 rejecting a flight that overlaps a maintenance event, which is still a measured run
+            error = str(e).strip()
+        samples.append(time.perf_counter() - started)
+
+        orm.connection.rollback()
+
+    return {
+        "p50": float(np.percentile(samples, 50)),
+        "p95": float(np.percentile(samples, 95)),
+        "runs": repeats,
+        "rows": rows,
+        "error": error
+    }
+
+
+def benchmark_queries(orm, repeats: int = 5) -> dict[str, dict]:
+    queries = {}
+    # section_B.sql or its JSONB version, depending on the storage of the schema
+    for file_name in orm.get_report_query_files():
+        queries.update(parse_query_file(file_name, orm.schema_name))
+    for name, statement in TRIGGER_STATEMENTS.items():
+        queries[name] = statement.format(schema=orm.schema_name)
+
+    return {name: time_statement(orm, query, repeats) for name, query in queries.items()}
+
+
+def run_benchmark(orm, scales: tuple[int] = BENCHMARK_SCALES, repeats: int = 5, output: str = None,
+                  index_pack: bool = False, jsonb: bool = False) -> dict:
+    """
+    Recreates the schema for every scale, fills it with that many rows per table and times the
+    report queries of section A and B and the triggers of section C on the result.
+    With index_pack the indexes of INDEX_PACK are built after the fills, before the queries are timed.
+    With jsonb the JSON documents are moved to JSONB after the fills, see PostgresORM.use_jsonb.
+    The results are written to output as JSON, so runs can be compared.
+    """
+    results = {
+        "started_at": datetime.now().isoformat(),
+        "settings": {
+            "write_mode": orm.write_mode,
+            "commit_policy": orm.commit_policy,
+            "chunk_size": orm.chunk_size,
+            "repeats": repeats,
+            "index_pack": index_pack,
+            "jsonb": jsonb
+        },
+        "scales": {}
+    }
+
+    for fillings in scales:
+        reset_schema(orm)
+        fills = benchmark_fills(orm, fillings)
+        if index_pack:
+            orm.apply_index_pack(measure=False)
+        if jsonb:
+            orm.use_jsonb(measure=False)
+        results["scales"][str(fillings)] = {
+            "fills": fills,
+            "queries": benchmark_queries(orm, repeats)
+        }
+
+    if output:
+        with open(output, "w") as file:
+            json.dump(results, file, indent=4)
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the fills and report queries. Drops and recreates the schema, "
+                    "never point it at a database with data you need."
+    )
+    parser.add_argument("--host", required=True)
+    parser.add_argument("--port", default="5432")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--db-name", required=True)
+    parser.add_argument("--schema-name", required=True)
+    parser.add_argument("--write-mode", default="copy")
+    parser.add_argument("--commit-policy", default="table")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(BENCHMARK_SCALES))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--index-pack", action="store_true")
+    parser.add_argument("--jsonb", action="store_true")
+    parser.add_argument("--output", default=f'benchmark_{datetime.now():%Y%m%d_%H%M%S}.json')
+    args = parser.parse_args()
+
+    orm = PostgresORM(
+        host=args.host,
+        port=args.port,
+        username=args.username,
+        password=args.password,
+        db_name=args.db_name,
+        schema_name=args.schema_name,
+        write_mode=args.write_mode,
+        commit_policy=args.commit_policy
+    )
+    try:
+        run_benchmark(orm, scales=tuple(args.scales), repeats=args.repeats, output=args.output,
+                      index_pack=args.index_pack, jsonb=args.jsonb)
+    finally:
+        orm.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# Progress of named fill runs, kept in a table of the schema so a run that died can be started again and
+# continue where it stopped. Every commit of a client side fill advances rows_done of its table by the rows it
+# commits, in the same transaction; a table is completed in the transaction of its last write. {schema} is replaced
+# with the schema of the ORM.
+CHECKPOINT_TABLE = "fill_checkpoints"
+
+# the conflicting flights and maintenance events a maintenance_events fill adds to its rows are checkpointed under
+# a name of their own, so rows_done of the table never counts them
+CONFLICT_CHECKPOINT = "{table}_conflicts"
+
+CREATE_CHECKPOINT_TABLE = """
+    CREATE TABLE IF NOT EXISTS {schema}.fill_checkpoints (
+        run_name varchar(255) NOT NULL,
+        table_name varchar(255) NOT NULL,
+        rows_done bigint NOT NULL DEFAULT 0,
+        completed boolean NOT NULL DEFAULT false,
+        updated_at timestamp NOT NULL DEFAULT clock_timestamp(),
+        PRIMARY KEY (run_name, table_name)
+    )
+"""
+
+# the checkpoint of a table, created on the first start of the table in the run
+START_CHECKPOINT = """
+    INSERT INTO {schema}.fill_checkpoints (run_name, table_name) VALUES (%s, %s)
+    ON CONFLICT (run_name, table_name) DO UPDATE SET updated_at = clock_timestamp()
+    RETURNING rows_done, completed
+"""
+
+ADVANCE_CHECKPOINT = """
+    UPDATE {schema}.fill_checkpoints SET rows_done = rows_done + %s, updated_at = clock_timestamp()
+    WHERE run_name = %s AND table_name = %s
+"""
+
+COMPLETE_CHECKPOINT = """
+    UPDATE {schema}.fill_checkpoints SET completed = true, updated_at = clock_timestamp()
+    WHERE run_name = %s AND table_name = %s
+"""
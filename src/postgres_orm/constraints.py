@@ -0,0 +1,84 @@
+from .aggregates import REBUILD_AGGREGATES
+
+# Foreign keys and triggers suspended for a fast load are recorded in a table of the schema before they are
+# dropped or disabled, in the same transaction, so they can be restored even after the loading process died.
+SUSPENDED_TABLE = "suspended_constraints"
+
+CREATE_SUSPENDED_TABLE = """
+    CREATE TABLE IF NOT EXISTS {schema}.suspended_constraints (
+        kind varchar(11) NOT NULL, -- foreign_key or trigger
+        table_name varchar(255) NOT NULL,
+        name varchar(255) NOT NULL,
+        definition text,
+        columns text[],
+        referenced_table varchar(255),
+        referenced_columns text[],
+        PRIMARY KEY (kind, table_name, name)
+    )
+"""
+
+FOREIGN_KEYS = """
+    SELECT
+        child.relname,
+        con.conname,
+        pg_get_constraintdef(con.oid),
+        ARRAY(SELECT attname FROM unnest(con.conkey) WITH ORDINALITY AS k (attnum, position)
+              JOIN pg_attribute ON attrelid = con.conrelid AND pg_attribute.attnum = k.attnum ORDER BY position)::text[],
+        parent.relname,
+        ARRAY(SELECT attname FROM unnest(con.confkey) WITH ORDINALITY AS k (attnum, position)
+              JOIN pg_attribute ON attrelid = con.confrelid AND pg_attribute.attnum = k.attnum ORDER BY position)::text[]
+    FROM pg_constraint con
+    JOIN pg_class child ON child.oid = con.conrelid
+    JOIN pg_class parent ON parent.oid = con.confrelid
+    JOIN pg_namespace ns ON ns.oid = child.relnamespace
+    -- the keys of partitions are clones of the key of their partitioned table and go with it
+    WHERE con.contype = 'f' AND con.conparentid = 0 AND ns.nspname = %s AND child.relname = ANY(%s)
+    ORDER BY child.relname, con.conname
+"""
+
+# enabled user triggers, the internal triggers of the foreign keys go with the constraints
+ENABLED_TRIGGERS = """
+    SELECT rel.relname, tg.tgname
+    FROM pg_trigger tg
+    JOIN pg_class rel ON rel.oid = tg.tgrelid
+    JOIN pg_namespace ns ON ns.oid = rel.relnamespace
+    WHERE NOT tg.tgisinternal AND tg.tgenabled <> 'D' AND ns.nspname = %s AND rel.relname = ANY(%s)
+    ORDER BY rel.relname, tg.tgname
+"""
+
+# set-based versions of what the triggers of section_C.sql check, run once the triggers are enabled again:
+# rows they would have rejected are reported, rows they would have moved are moved
+TRIGGER_CHECKS = {
+    "check_aircraft_maintenance": """
+        SELECT fd.flight_id, fd.aircraft_registration_number, me.maintenance_id
+        FROM {schema}.flight_data fd
+        JOIN {schema}.maintenance_events me ON me.aircraft_registration_number = fd.aircraft_registration_number
+        WHERE me.maintenance_window @> (fd.scheduled_departure_date + fd.scheduled_departure_time)
+    """
+}
+TRIGGER_CATCH_UPS = {
+    # the summaries of reporting_aggregates.sql missed the loaded bookings
+    "maintain_booking_summaries_insert": REBUILD_AGGREGATES,
+    "archive_old_feedback_trigger": """
+        WITH archived AS (
+            DELETE FROM {schema}.customer_feedback_and_survey
+            WHERE survey_date < NOW() - INTERVAL '2 years'
+            RETURNING customer_id, customer_feedback_and_survey_data, survey_date
+        )
+        INSERT INTO {schema}.feedback_archive (customer_id, customer_feedback_and_survey_data, survey_date, archived_at)
+        SELECT customer_id, customer_feedback_and_survey_data, survey_date, NOW() FROM archived
+    """
+}
+
+
+def violations_query(schema_name: str, table: str, columns: list[str], referenced_table: str,
+                     referenced_columns: list[str]) -> str:
+    """Rows of table whose foreign key columns reference nothing, as one anti join."""
+    matches = " AND ".join(f"p.{parent} = c.{child}" for child, parent in zip(columns, referenced_columns))
+    # MATCH SIMPLE, a key with a NULL column is not checked
+    complete = " AND ".join(f"c.{child} IS NOT NULL" for child in columns)
+
+    return (
+        f'SELECT {", ".join(f"c.{column}" for column in columns)} FROM {schema_name}.{table} c '
+        f'WHERE {complete} AND NOT EXISTS (SELECT 1 FROM {schema_name}.{referenced_table} p WHERE {matches})'
+    )
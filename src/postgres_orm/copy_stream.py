@@ -0,0 +1,41 @@
+import io
+import json
+from datetime import date, datetime, time, timedelta
+
+from psycopg2.extras import Json
+
+
+def format_copy_value(value) -> str:
+    """Render one python value in the text format expected by COPY ... FROM STDIN."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, Json):
+        value = json.dumps(value.adapted)
+    elif isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    elif isinstance(value, timedelta):
+        value = f'{value.days} days {value.seconds} seconds {value.microseconds} microseconds'
+    elif isinstance(value, (datetime, date, time)):
+        value = str(value)
+    else:
+        value = str(value)
+
+    return (
+        value.replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def build_copy_buffer(rows: list[tuple]) -> io.StringIO:
+    """Serialize a chunk of rows into a buffer that can be handed to cursor.copy_expert."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(format_copy_value(value) for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    return buffer
@@ -0,0 +1,49 @@
+import hashlib
+import json
+import os
+from .queries import SQL_DIR
+
+SCHEMA_FILE = os.path.join(SQL_DIR, "create_statements.sql")
+DATASET_CACHE_DIR = "datasets"
+MANIFEST_FILE = "manifest.json"
+
+
+def dataset_key(inputs: dict, schema_file: str = SCHEMA_FILE) -> str:
+    """
+    Identifies a dataset by everything its rows depend on, the inputs of the fill (seed, sizes, reference time and
+    every setting of the ORM the generated rows change with) and the schema it was generated for.
+    """
+    with open(schema_file, "rb") as file:
+        schema_hash = hashlib.sha256(file.read()).hexdigest()
+
+    return hashlib.sha256(json.dumps({**inputs, "schema": schema_hash}, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def dump_table(cursor, schema_name: str, table: str, columns: list[str], path: str) -> None:
+    # rows are ordered by their text form, so the artifact does not depend on the physical layout of the table
+    column_list = ", ".join(columns)
+    with open(path, "wb") as file:
+        cursor.copy_expert(
+            f"COPY (SELECT {column_list} FROM {schema_name}.{table} ORDER BY ROW({column_list})::text) "
+            f"TO STDOUT (FORMAT binary)",
+            file
+        )
+
+
+def load_table(cursor, schema_name: str, table: str, columns: list[str], path: str) -> None:
+    with open(path, "rb") as file:
+        cursor.copy_expert(f'COPY {schema_name}.{table} ({", ".join(columns)}) FROM STDIN (FORMAT binary)', file)
+
+
+def write_manifest(path: str, manifest: dict) -> None:
+    with open(os.path.join(path, MANIFEST_FILE), "w") as file:
+        json.dump(manifest, file, indent=4, sort_keys=True)
+
+
+def read_manifest(path: str) -> dict:
+    with open(os.path.join(path, MANIFEST_FILE)) as file:
+        return json.load(file)
+
+
+def is_dataset(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, MANIFEST_FILE))
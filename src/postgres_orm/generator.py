@@ -0,0 +1,271 @@
+import re
+
+import numpy as np
+
+from .vectorized import ColumnGenerator
+
+# Schema-driven generation. A table spec maps columns to column specs, tuples of a kind and its arguments:
+#   ("key", table, column)              keys drawn from the key pool of a referenced table
+#   ("choice", values[, weights])       one of the values
+#   ("integers", low, high)             both inclusive
+#   ("uniform", low, high[, decimals])
+#   ("booleans"[, chance])
+#   ("dates", start, end)               dates from start to end, a bound is days from today or a column of the row
+#   ("datetimes", start, end)           the same for timestamps with second precision
+#   ("times",)
+#   ("hours", low, high)                intervals of whole hours
+#   ("offset", column, spec)            the column plus what spec draws, e.g. the end of a slot after its start
+#   ("text", length)                    upper case letters
+#   ("pool", kind)                      strings of a value pool, see value_pools.py
+#   ("pool", template, kind, ...)       template mixed from value pools, e.g. ("pool", "{} Air", "company")
+#   ("faker", method[, kwargs[, template]])  one Faker call per row, formatted into template, for strings without a pool
+#   ("constant", value)
+# A spec is compiled into a RowPlan, which draws whole columns per chunk like the row functions of vectorized.py.
+
+# columns of a table as the catalog knows them: name, type, NOT NULL, generated, serial or identity,
+# other default and primary key
+TABLE_COLUMNS = """
+    SELECT
+        a.attname,
+        format_type(a.atttypid, a.atttypmod),
+        a.attnotnull,
+        a.attgenerated <> '',
+        a.attidentity <> '' OR COALESCE(pg_get_expr(d.adbin, d.adrelid) LIKE 'nextval(%%', false),
+        d.adbin IS NOT NULL AND a.attgenerated = '',
+        COALESCE(a.attnum = ANY(pk.conkey), false)
+    FROM pg_attribute a
+    JOIN pg_class rel ON rel.oid = a.attrelid
+    JOIN pg_namespace ns ON ns.oid = rel.relnamespace
+    LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+    LEFT JOIN pg_constraint pk ON pk.conrelid = rel.oid AND pk.contype = 'p'
+    WHERE ns.nspname = %s AND rel.relname = %s AND a.attnum > 0 AND NOT a.attisdropped
+    ORDER BY a.attnum
+"""
+
+INTEGER_TYPES = ("smallint", "integer", "bigint")
+FLOAT_TYPES = ("real", "double precision", "numeric")
+NUMERIC_TYPE = re.compile(r'numeric\((\d+),(\d+)\)')
+CHARACTER_TYPE = re.compile(r'character(?: varying)?\((\d+)\)')
+DEFAULT_TEXT_LENGTH = 10
+
+
+def draw_key(columns: ColumnGenerator, size: int, pools: dict, values: dict, table: str, column: str):
+    return columns.choice(pools[table], size)
+
+
+def draw_choice(columns: ColumnGenerator, size: int, pools: dict, values: dict, choices, weights=None):
+    return columns.choice(np.asarray(choices), size, weights)
+
+
+def draw_integers(columns: ColumnGenerator, size: int, pools: dict, values: dict, low: int, high: int):
+    return columns.integers(low, high, size)
+
+
+def draw_uniform(columns: ColumnGenerator, size: int, pools: dict, values: dict, low: float, high: float,
+                 decimals: int = None):
+    return columns.uniform(low, high, size, decimals)
+
+
+def draw_booleans(columns: ColumnGenerator, size: int, pools: dict, values: dict, chance: float = 0.5):
+    return columns.booleans(size, chance)
+
+
+def draw_dates(columns: ColumnGenerator, size: int, pools: dict, values: dict, start, end):
+    def bound(value):
+        return values[value] if isinstance(value, str) else columns.today + np.timedelta64(value, 'D')
+
+    return columns.dates_between(bound(start), bound(end), size)
+
+
+def draw_datetimes(columns: ColumnGenerator, size: int, pools: dict, values: dict, start, end):
+    def bound(value):
+        return values[value] if isinstance(value, str) else columns.now + np.timedelta64(value * 24 * 60 * 60, 's')
+
+    return columns.datetimes_between(bound(start), bound(end), size)
+
+
+def draw_times(columns: ColumnGenerator, size: int, pools: dict, values: dict):
+    return columns.times(size)
+
+
+def draw_hours(columns: ColumnGenerator, size: int, pools: dict, values: dict, low: int, high: int):
+    return columns.hours(low, high, size)
+
+
+def draw_offset(columns: ColumnGenerator, size: int, pools: dict, values: dict, column: str, spec: tuple):
+    return values[column] + draw(spec, columns, size, pools, values)
+
+
+def draw_text(columns: ColumnGenerator, size: int, pools: dict, values: dict, length: int):
+    letters = columns.rng.integers(ord("A"), ord("Z"), size=(size, length), endpoint=True, dtype=np.uint8)
+
+    return letters.view(f'S{length}').ravel().astype(str)
+
+
+def draw_pool(columns: ColumnGenerator, size: int, pools: dict, values: dict, kind: str, *kinds: str):
+    if kinds:
+        return columns.mixed_strings(kind, kinds, size)
+
+    return columns.strings(kind, size)
+
+
+def draw_faker(columns: ColumnGenerator, size: int, pools: dict, values: dict, method: str, kwargs: dict = None,
+               template: str = None):
+    provider = getattr(columns.faker, method)
+    drawn = [provider(**(kwargs or {})) for _ in range(size)]
+
+    return [template.format(value) for value in drawn] if template else drawn
+
+
+def draw_constant(columns: ColumnGenerator, size: int, pools: dict, values: dict, value):
+    return [value] * size
+
+
+DRAWS = {
+    "key": draw_key,
+    "choice": draw_choice,
+    "integers": draw_integers,
+    "uniform": draw_uniform,
+    "booleans": draw_booleans,
+    "dates": draw_dates,
+    "datetimes": draw_datetimes,
+    "times": draw_times,
+    "hours": draw_hours,
+    "offset": draw_offset,
+    "text": draw_text,
+    "pool": draw_pool,
+    "faker": draw_faker,
+    "constant": draw_constant
+}
+
+
+def draw(spec: tuple, columns: ColumnGenerator, size: int, pools: dict, values: dict):
+    kind, *arguments = spec
+
+    return DRAWS[kind](columns, size, pools, values, *arguments)
+
+
+def spec_dependencies(spec: tuple) -> set[str]:
+    """Columns of the row a column spec is drawn from."""
+    kind, *arguments = spec
+    if kind in ("dates", "datetimes"):
+        return {bound for bound in arguments if isinstance(bound, str)}
+    if kind == "offset":
+        return {arguments[0]} | spec_dependencies(arguments[1])
+
+    return set()
+
+
+def spec_keys(spec: tuple) -> dict[str, tuple[str, str]]:
+    """Key pools a column spec draws from, pool name -> (table, key column) like POOL_SOURCES."""
+    kind, *arguments = spec
+    if kind == "key":
+        return {arguments[0]: tuple(arguments)}
+    if kind == "offset":
+        return spec_keys(arguments[1])
+
+    return {}
+
+
+class RowPlan:
+    """
+    A table spec compiled into the order its columns are drawn in: a column bounded by other columns of the row
+    is drawn after them. Called like the row functions of vectorized.py, every column of a chunk is one draw.
+    """
+    def __init__(self, spec: dict, returning: str = None):
+        for column, column_spec in spec.items():
+            if column_spec[0] not in DRAWS:
+                raise ValueError(f'Unknown kind {column_spec[0]} for column {column}, expected one of {tuple(DRAWS)}')
+
+        self.spec = spec
+        self.columns = tuple(spec)
+        self.returning = returning
+        self.key_sources = {pool: source for column_spec in spec.values() for pool, source in spec_keys(column_spec).items()}
+
+        dependencies = {column: spec_dependencies(column_spec) for column, column_spec in spec.items()}
+        for column, required in dependencies.items():
+            if required - set(spec):
+                raise ValueError(f'Column {column} is drawn from {sorted(required - set(spec))}, which are not generated')
+
+        self.order = []
+        while len(self.order) < len(spec):
+            ready = [column for column in spec if column not in self.order and dependencies[column] <= set(self.order)]
+            if not ready:
+                raise ValueError(f'Columns {sorted(set(spec) - set(self.order))} are drawn from each other')
+            self.order += ready
+
+    def __call__(self, columns: ColumnGenerator, size: int, pools: dict) -> list[tuple]:
+        values = {}
+        for column in self.order:
+            values[column] = draw(self.spec[column], columns, size, pools, values)
+
+        return list(zip(*(
+            values[column].tolist() if isinstance(values[column], np.ndarray) else values[column]
+            for column in self.columns
+        )))
+
+
+def default_spec(table: str, column: dict) -> tuple:
+    """The spec of a column left out of the spec of its table, from its foreign key or its type."""
+    if column["references"]:
+        return ("key", *column["references"])
+
+    data_type = column["type"]
+    if data_type in INTEGER_TYPES:
+        return ("integers", 1, 1000)
+    if match := NUMERIC_TYPE.fullmatch(data_type):
+        precision, scale = int(match.group(1)), int(match.group(2))
+        return ("uniform", 0, min(1000, 10 ** (precision - scale) - 1), scale)
+    if data_type in FLOAT_TYPES:
+        return ("uniform", 0, 1000, 2)
+    if data_type == "boolean":
+        return ("booleans",)
+    if data_type == "date":
+        return ("dates", -365, 365)
+    if data_type.startswith("timestamp"):
+        return ("datetimes", -365, 365)
+    if data_type.startswith("time"):
+        return ("times",)
+    if data_type == "interval":
+        return ("hours", 1, 12)
+    if match := CHARACTER_TYPE.fullmatch(data_type):
+        return ("text", min(int(match.group(1)), DEFAULT_TEXT_LENGTH))
+    if data_type in ("text", "character varying"):
+        return ("text", DEFAULT_TEXT_LENGTH)
+    if data_type in ("json", "jsonb"):
+        return ("constant", "{}")
+
+    raise ValueError(f'No default for {table}.{column["name"]} of type {data_type}, give the column a spec')
+
+
+def complete_spec(table: str, spec: dict, catalog: list[dict]) -> dict:
+    """
+    The spec in the column order of the table. Generated, serial and identity columns are left to the database,
+    so are nullable columns and columns with a default the spec leaves out; the other columns it leaves out get
+    default_spec.
+    """
+    unknown = set(spec) - {column["name"] for column in catalog}
+    if unknown:
+        raise ValueError(f'{table} has no columns {sorted(unknown)}')
+
+    completed = {}
+    for column in catalog:
+        name = column["name"]
+        if column["generated"] or column["serial"]:
+            if name in spec:
+                raise ValueError(f'{table}.{name} is generated by the database and can not have a spec')
+            continue
+
+        if name in spec:
+            completed[name] = spec[name]
+        elif column["not_null"] and not column["default"]:
+            completed[name] = default_spec(table, column)
+
+    return completed
+
+
+def primary_key(catalog: list[dict]) -> str:
+    """The primary key column, None for tables without one or with a composite key."""
+    keys = [column["name"] for column in catalog if column["primary_key"]]
+
+    return keys[0] if len(keys) == 1 else None
@@ -0,0 +1,42 @@
+# Secondary indexes matching the joins and filters of the report queries in section A and B.
+# create_statements.sql only defines primary keys, the pack is built once the tables are loaded,
+# so bulk fills do not maintain them row by row. {schema} is replaced with the schema of the ORM.
+INDEX_PACK = {
+    # Q1, Q3, Q7, Q9, Q12, JQ2: bookings joined to customers and flight_data
+    "bookings_customer_id_idx": "ON {schema}.bookings (customer_id)",
+    "bookings_flight_id_idx": "ON {schema}.bookings (flight_id)",
+    # Q1, Q3: bookings of the last month and upcoming bookings
+    "bookings_booking_date_and_time_idx": "ON {schema}.bookings (booking_date_and_time)",
+    # Q2, Q4, Q5, JQ2: flights joined to their aircraft, Q4 and Q9 filter on the departure date
+    "flight_data_aircraft_departure_idx": "ON {schema}.flight_data (aircraft_registration_number, scheduled_departure_date)",
+    "flight_data_scheduled_departure_date_idx": "ON {schema}.flight_data (scheduled_departure_date)",
+    # Q9, Q12: flight_data joined to flights
+    "flight_data_flight_number_idx": "ON {schema}.flight_data (flight_number)",
+    "flight_data_flight_status_id_idx": "ON {schema}.flight_data (flight_status_id)",
+    # Q8: fully booked flights are a small part of the table
+    "flight_data_fully_booked_idx": "ON {schema}.flight_data (scheduled_departure_date, scheduled_departure_time) WHERE available_seating = 0",
+    # Q4: aircraft model filter
+    "aircrafts_aircraft_type_idx": "ON {schema}.aircrafts (aircraft_type)",
+    # Q5, JQ2: maintenance of an aircraft in a time range
+    "maintenance_events_aircraft_starttime_idx": "ON {schema}.maintenance_events (aircraft_registration_number, maintenance_starttime)",
+    "maintenance_events_starttime_idx": "ON {schema}.maintenance_events (maintenance_starttime)",
+    # JQ1, JQ3, JQ4: the JSON tables joined to customers
+    "customer_preferences_customer_id_idx": "ON {schema}.customer_preferences (customer_id)",
+    "customer_feedback_and_survey_customer_id_idx": "ON {schema}.customer_feedback_and_survey (customer_id)"
+}
+
+
+def index_table(definition: str) -> str:
+    """The table an index definition of INDEX_PACK is built on, without the schema."""
+    return definition.split()[1].split('.')[-1]
+
+
+def create_index_statement(name: str, schema_name: str, concurrently: bool = False) -> str:
+    return (
+        f'CREATE INDEX {"CONCURRENTLY " if concurrently else ""}IF NOT EXISTS {name} '
+        f'{INDEX_PACK[name].format(schema=schema_name)}'
+    )
+
+
+def drop_index_statement(name: str, schema_name: str, concurrently: bool = False) -> str:
+    return f'DROP INDEX {"CONCURRENTLY " if concurrently else ""}IF EXISTS {schema_name}.{name}'
@@ -0,0 +1,124 @@
+import time
+
+from psycopg2.extensions import connection, cursor
+
+from .pipeline import check_not_producer
+
+CONNECTION_COUNTERS = ("round_trips", "statements", "commits", "bytes_sent", "db_seconds")
+METRIC_PREFIX = "postgres_orm_fill"
+
+
+def count_statements(query) -> int:
+    # counted on the query before the parameters are bound, so values containing ";" do not count
+    if not isinstance(query, str):
+        return 1
+
+    return max(1, len([statement for statement in query.split(';') if statement.strip()]))
+
+
+class CountingReader:
+    """Wraps the file handed to COPY FROM STDIN and counts the bytes read from it."""
+    def __init__(self, file):
+        self.file = file
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self.file.read(size)
+        self.bytes_read += len(data.encode() if isinstance(data, str) else data)
+        return data
+
+    def readline(self, size=-1):
+        line = self.file.readline(size)
+        self.bytes_read += len(line.encode() if isinstance(line, str) else line)
+        return line
+
+
+class CountingCursor(cursor):
+    """
+    Cursor that counts its round trips, statements, bytes sent and time spent waiting on the server. Statements
+    run by the producer of a ChunkPipeline raise, they would interleave with the writes of the chunks.
+    """
+    def execute(self, query, vars=None):
+        check_not_producer("Query")
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            self.connection.count(
+                statements=count_statements(query),
+                bytes_sent=len(self.query or b''),
+                db_seconds=time.perf_counter() - started
+            )
+
+    def executemany(self, query, vars_list):
+        check_not_producer("Query")
+        vars_list = list(vars_list)
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            self.connection.count(
+                round_trips=len(vars_list),
+                statements=count_statements(query) * len(vars_list),
+                db_seconds=time.perf_counter() - started
+            )
+
+    def copy_expert(self, sql, file, size=8192):
+        check_not_producer("COPY")
+        reader = CountingReader(file) if hasattr(file, "read") else None
+        started = time.perf_counter()
+        try:
+            return super().copy_expert(sql, reader or file, size)
+        finally:
+            self.connection.count(
+                statements=1,
+                bytes_sent=len(sql) + (reader.bytes_read if reader else 0),
+                db_seconds=time.perf_counter() - started
+            )
+
+
+class CountingConnection(connection):
+    """Connection whose cursors, commits and rollbacks count their round trips to the server."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.counters = dict.fromkeys(CONNECTION_COUNTERS, 0)
+        self.cursor_factory = CountingCursor
+
+    @property
+    def round_trips(self) -> int:
+        return self.counters["round_trips"]
+
+    def count(self, round_trips: int = 1, statements: int = 0, commits: int = 0, bytes_sent: int = 0,
+              db_seconds: float = 0) -> None:
+        self.counters["round_trips"] += round_trips
+        self.counters["statements"] += statements
+        self.counters["commits"] += commits
+        self.counters["bytes_sent"] += bytes_sent
+        self.counters["db_seconds"] += db_seconds
+
+    def commit(self):
+        started = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            self.count(statements=1, commits=1, db_seconds=time.perf_counter() - started)
+
+    def rollback(self):
+        started = time.perf_counter()
+        try:
+            super().rollback()
+        finally:
+            self.count(statements=1, db_seconds=time.perf_counter() - started)
+
+
+def metrics_to_prometheus(metrics: dict[str, dict]) -> str:
+    """Renders the metrics of fill_table, {table: {name: value}}, in the Prometheus text format."""
+    names = [name for name, value in next(iter(metrics.values()), {}).items() if isinstance(value, (int, float))]
+
+    lines = []
+    for name in names:
+        lines.append(f'# TYPE {METRIC_PREFIX}_{name} gauge')
+        for table, table_metrics in metrics.items():
+            lines.append(f'{METRIC_PREFIX}_{name}{{table="{table}"}} {float(table_metrics[name])}')
+
+    return '\n'.join(lines) + '\n'
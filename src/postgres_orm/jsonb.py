@@ -0,0 +1,57 @@
+# Moves the JSON documents of the schema to JSONB. The hot paths of JQ1-JQ4 get stored generated columns and
+# the documents GIN indexes for containment (@>) queries. feedback_archive gets the same columns as
+# customer_feedback_and_survey, archive_feedback attaches partitions of one to the other.
+# survey_date is a column of its own already, it is the partition key of both feedback tables.
+JSONB_COLUMNS = {
+    "customer_preferences": "customer_preferences_data",
+    "aircraft_maintenance_logs": "aircraft_maintenance_logs_data",
+    "customer_feedback_and_survey": "customer_feedback_and_survey_data",
+    "feedback_archive": "customer_feedback_and_survey_data"
+}
+
+GENERATED_COLUMNS = {
+    "customer_preferences": {
+        "prefers_extra_legroom": "BOOLEAN GENERATED ALWAYS AS ((customer_preferences_data->'seating'->>'extra_legroom')::BOOLEAN) STORED"
+    },
+    "customer_feedback_and_survey": {
+        "rating": "INT GENERATED ALWAYS AS ((customer_feedback_and_survey_data->>'rating')::INT) STORED",
+        "service_rating": "INT GENERATED ALWAYS AS ((customer_feedback_and_survey_data->'topics'->>'service')::INT) STORED"
+    },
+    "feedback_archive": {
+        "rating": "INT GENERATED ALWAYS AS ((customer_feedback_and_survey_data->>'rating')::INT) STORED",
+        "service_rating": "INT GENERATED ALWAYS AS ((customer_feedback_and_survey_data->'topics'->>'service')::INT) STORED"
+    }
+}
+
+JSONB_INDEXES = {
+    "customer_preferences_data_gin_idx": "ON {schema}.customer_preferences USING GIN (customer_preferences_data jsonb_path_ops)",
+    "aircraft_maintenance_logs_data_gin_idx": "ON {schema}.aircraft_maintenance_logs USING GIN (aircraft_maintenance_logs_data jsonb_path_ops)",
+    "customer_feedback_and_survey_data_gin_idx": "ON {schema}.customer_feedback_and_survey USING GIN (customer_feedback_and_survey_data jsonb_path_ops)",
+    # JQ1: customers preferring extra legroom, joined on customer_id
+    "customer_preferences_extra_legroom_idx": "ON {schema}.customer_preferences (customer_id) WHERE prefers_extra_legroom",
+    # JQ1, JQ4: service and overall ratings
+    "customer_feedback_and_survey_service_rating_idx": "ON {schema}.customer_feedback_and_survey (service_rating, customer_id)",
+    "customer_feedback_and_survey_rating_idx": "ON {schema}.customer_feedback_and_survey (rating, customer_id)"
+}
+
+# JQ1-JQ4 reading the generated columns and using containment, for a schema migrated by use_jsonb
+JSONB_QUERY_FILE = "section_B_jsonb.sql"
+
+
+def jsonb_migration(schema_name: str) -> list[str]:
+    """The statements of the migration, in order. A partitioned table passes every statement on to its partitions."""
+    statements = [
+        f"ALTER TABLE {schema_name}.{table} ALTER COLUMN {column} TYPE JSONB USING {column}::JSONB"
+        for table, column in JSONB_COLUMNS.items()
+    ]
+    statements += [
+        f"ALTER TABLE {schema_name}.{table} ADD COLUMN IF NOT EXISTS {column} {definition}"
+        for table, columns in GENERATED_COLUMNS.items()
+        for column, definition in columns.items()
+    ]
+    statements += [
+        f"CREATE INDEX IF NOT EXISTS {name} {definition.format(schema=schema_name)}"
+        for name, definition in JSONB_INDEXES.items()
+    ]
+
+    return statements
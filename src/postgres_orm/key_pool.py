@@ -0,0 +1,196 @@
+import numpy as np
+
+# pools of keys that are not serial, or serial with more gaps than this, hold a sample of at most this many keys
+KEY_SAMPLE_SIZE = 100000
+
+# the runs of consecutive keys of a serial column, as the first key and the key after the last of every run
+KEY_RUNS = """
+    SELECT min({column}), max({column}) + 1
+    FROM (SELECT {column}, {column} - row_number() OVER (ORDER BY {column}) AS run FROM {schema}.{table}) AS keys
+    GROUP BY run
+    ORDER BY 1
+    LIMIT %s
+"""
+
+# a sample picked by a hash of the keys, so seeded generators draw the same keys however the table is laid out on
+# disk; a table of fewer rows is read as a whole
+KEY_SAMPLE = """
+    SELECT {column} FROM {schema}.{table} ORDER BY md5({column}::text), {column} LIMIT %s
+"""
+
+
+class KeyRange:
+    """
+    Consecutive integer keys from start to stop - 1, kept as their bounds, so a pool of serial keys takes the
+    same memory whatever the size of its table. Indexed like the sorted array of the keys: an int gives one key,
+    an array of positions the array of keys at them.
+    """
+    def __init__(self, start: int, stop: int):
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError('KeyRange index out of range')
+            return self.start + int(index)
+
+        return self.start + np.asarray(index)
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, (int, np.integer)) and self.start <= key < self.stop
+
+    def __iter__(self):
+        return iter(range(self.start, self.stop))
+
+    def tolist(self) -> list[int]:
+        return list(range(self.start, self.stop))
+
+    def follows(self, keys: list) -> bool:
+        """Whether keys continue the range without a gap, as serial keys of the next rows do."""
+        return len(keys) > 0 and keys[0] == self.stop and keys[-1] == self.stop + len(keys) - 1
+
+
+class KeyRanges:
+    """
+    Integer keys kept as their runs of consecutive keys, so serial keys with gaps take memory per gap rather than
+    per key. Indexed like the sorted array of the keys, as KeyRange is.
+    """
+    def __init__(self, starts, stops):
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.stops = np.asarray(stops, dtype=np.int64)
+        # the position of the first key of every run among all keys
+        self.offsets = np.cumsum(self.stops - self.starts) - (self.stops - self.starts)
+
+    @classmethod
+    def of(cls, keys) -> "KeyRanges":
+        """The runs of the given sorted keys."""
+        keys = np.asarray(keys, dtype=np.int64)
+        if not len(keys):
+            return cls([], [])
+        breaks = np.flatnonzero(np.diff(keys) != 1) + 1
+
+        return cls(keys[np.r_[0, breaks]], keys[np.r_[breaks - 1, len(keys) - 1]] + 1)
+
+    def __len__(self) -> int:
+        return int(self.stops[-1] - self.starts[-1] + self.offsets[-1]) if len(self.starts) else 0
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError('KeyRanges index out of range')
+            run = np.searchsorted(self.offsets, index, side="right") - 1
+            return int(self.starts[run] + index - self.offsets[run])
+
+        index = np.asarray(index)
+        run = np.searchsorted(self.offsets, index, side="right") - 1
+
+        return self.starts[run] + index - self.offsets[run]
+
+    def __contains__(self, key) -> bool:
+        if not isinstance(key, (int, np.integer)):
+            return False
+        run = np.searchsorted(self.stops, key, side="right")
+
+        return bool(run < len(self.starts) and self.starts[run] <= key)
+
+    def __iter__(self):
+        for start, stop in zip(self.starts.tolist(), self.stops.tolist()):
+            yield from range(start, stop)
+
+    def tolist(self) -> list[int]:
+        return list(self)
+
+    def extend(self, keys) -> bool:
+        """Adds sorted keys that lie after every key of the runs, returns whether they did."""
+        if not len(keys):
+            return True
+        if isinstance(keys, KeyRange):
+            added = KeyRanges([keys.start], [keys.stop])
+        else:
+            keys = np.asarray(keys, dtype=np.int64)
+            if np.any(np.diff(keys) <= 0):
+                return False
+            added = KeyRanges.of(keys)
+        if len(self.starts) and added.starts[0] < self.stops[-1]:
+            return False
+
+        if len(self.starts) and added.starts[0] == self.stops[-1]:
+            # the first run continues the last one
+            self.stops[-1] = added.stops[0]
+            added = KeyRanges(added.starts[1:], added.stops[1:])
+        runs = KeyRanges(np.r_[self.starts, added.starts], np.r_[self.stops, added.stops])
+        self.starts, self.stops, self.offsets = runs.starts, runs.stops, runs.offsets
+
+        return True
+
+
+class KeyPool:
+    """
+    In-memory pools of key values per table, so dependent fill methods can draw foreign keys
+    without scanning the referenced tables again. Every pool remembers how many rows the table
+    had when it was loaded plus the rows added since, which is used to detect external writes.
+    Serial keys without gaps are pooled as a KeyRange, with gaps as KeyRanges; other keys as a
+    list of at most KEY_SAMPLE_SIZE keys, a sample of the table once it has more rows. A pool the
+    added keys do not fit in any more is no longer current, and is loaded again before it is used.
+    """
+    def __init__(self):
+        self.__pools = {}
+
+    def is_loaded(self, table: str, column: str) -> bool:
+        return table in self.__pools and self.__pools[table]["column"] == column
+
+    def is_current(self, table: str) -> bool:
+        return self.__pools[table]["current"]
+
+    def load(self, table: str, column: str, keys, row_count: int) -> None:
+        self.__pools[table] = {
+            "column": column,
+            "keys": keys if isinstance(keys, (KeyRange, KeyRanges)) else list(keys),
+            "row_count": row_count,
+            "current": True
+        }
+
+    def add(self, table: str, column: str, keys: list) -> None:
+        if not self.is_loaded(table, column):
+            # a pool of another column of the same table would silently go stale
+            self.invalidate(table)
+            return
+
+        pool = self.__pools[table]
+        pool["row_count"] += len(keys)
+        if not pool["current"] or not len(keys):
+            return
+
+        if isinstance(pool["keys"], KeyRange):
+            if pool["keys"].follows(keys):
+                pool["keys"].stop += len(keys)
+                return
+            # a gap, the pool is kept as runs from now on
+            pool["keys"] = KeyRanges([pool["keys"].start], [pool["keys"].stop])
+
+        if isinstance(pool["keys"], KeyRanges):
+            pool["current"] = pool["keys"].extend(keys) and len(pool["keys"].starts) <= KEY_SAMPLE_SIZE
+        elif len(pool["keys"]) + len(keys) <= KEY_SAMPLE_SIZE:
+            pool["keys"].extend(keys)
+        else:
+            pool["current"] = False
+
+    def keys(self, table: str):
+        return self.__pools[table]["keys"]
+
+    def row_count(self, table: str) -> int:
+        return self.__pools[table]["row_count"]
+
+    def invalidate(self, table: str = None) -> None:
+        if table is None:
+            self.__pools.clear()
+        else:
+            self.__pools.pop(table, None)
@@ -0,0 +1,59 @@
+import re
+from datetime import date
+
+# customer_feedback_and_survey and feedback_archive are partitioned by survey_date, one partition per month
+# named <table>_<year>_<month>, rows of months without a partition go to <table>_default
+FEEDBACK_TABLE = "customer_feedback_and_survey"
+ARCHIVE_TABLE = "feedback_archive"
+# feedback is archived once its survey is older than this, like the archive_old_feedback trigger does on insert
+ARCHIVE_AFTER_YEARS = 2
+PARTITION_MONTH = re.compile(r'_(\d{4})_(\d{2})$')
+
+PARTITIONS = """
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_namespace ns ON ns.oid = parent.relnamespace
+    WHERE ns.nspname = %s AND parent.relname = %s
+    ORDER BY child.relname
+"""
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def months_between(start: date, end: date) -> list[date]:
+    """First days of the months from the month of start to the month of end, both inclusive."""
+    months = []
+    month = month_start(start)
+    while month <= end:
+        months.append(month)
+        month = next_month(month)
+
+    return months
+
+
+def partition_name(table: str, month: date) -> str:
+    return f'{table}_{month:%Y_%m}'
+
+
+def partition_month(name: str) -> date:
+    """The month of a partition named by partition_name, None for the default partition."""
+    match = PARTITION_MONTH.search(name)
+
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def archive_cutoff(today: date) -> date:
+    """Surveys before this date are archived."""
+    try:
+        return today.replace(year=today.year - ARCHIVE_AFTER_YEARS)
+    except ValueError:
+        # February 29th
+        return today.replace(year=today.year - ARCHIVE_AFTER_YEARS, day=28)
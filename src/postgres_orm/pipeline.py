@@ -0,0 +1,88 @@
+from itertools import islice
+from queue import Empty, Full, Queue
+from threading import Event, Thread, local
+from time import perf_counter
+
+# how long a blocked producer or writer waits before checking whether the other side stopped
+POLL_SECONDS = 0.1
+
+# marks the producer threads of ChunkPipeline, see check_not_producer
+_thread = local()
+
+
+def check_not_producer(action: str) -> None:
+    """Raises when called on a producer thread, which must not use the connection the chunks are written to."""
+    if getattr(_thread, "producing", False):
+        raise RuntimeError(
+            f'{action} on the writing connection from a chunk producer, write these rows with pipelined=False'
+        )
+
+
+def chunked(rows, size: int):
+    """Yields lists of size rows, the last one shorter."""
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+class ChunkPipeline:
+    """
+    Generates the chunks of rows in a producer thread while the caller writes the previous ones, so generating and
+    writing overlap and a fill takes about as long as the slower of the two instead of their sum. The queue holds
+    at most depth chunks, a producer ahead of the writer blocks, so at most depth + 2 chunks are in memory.
+    psycopg2 releases the GIL while it waits on the database, so the producer runs during every round trip.
+    The rows must not be read from the connection the chunks are written to.
+    """
+    def __init__(self, rows, size: int, depth: int):
+        self.rows = rows
+        self.size = size
+        self.chunks = Queue(maxsize=depth)
+        self.stopped = Event()
+        # seconds the writer waited on the producer, i.e. the generation the pipeline did not hide
+        self.wait_seconds = 0.0
+
+    def __put(self, item) -> bool:
+        while not self.stopped.is_set():
+            try:
+                self.chunks.put(item, timeout=POLL_SECONDS)
+                return True
+            except Full:
+                continue
+
+        return False
+
+    def __produce(self) -> None:
+        _thread.producing = True
+        try:
+            for chunk in chunked(self.rows, self.size):
+                if not self.__put(chunk):
+                    return
+            self.__put(None)
+        except Exception as e:
+            # raised again in the writer
+            self.__put(e)
+
+    def __iter__(self):
+        producer = Thread(target=self.__produce, name="chunk-producer", daemon=True)
+        producer.start()
+        try:
+            while True:
+                started = perf_counter()
+                while True:
+                    try:
+                        item = self.chunks.get(timeout=POLL_SECONDS)
+                        break
+                    except Empty:
+                        if not producer.is_alive() and self.chunks.empty():
+                            raise RuntimeError("The chunk producer stopped without finishing")
+                self.wait_seconds += perf_counter() - started
+
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # a writer that stops early, e.g. on an error, stops the producer before its next chunk
+            self.stopped.set()
+            producer.join()
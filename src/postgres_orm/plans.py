@@ -0,0 +1,45 @@
+def plan_nodes(plan: dict):
+    """Yields a plan node of EXPLAIN (FORMAT JSON) and all nodes below it."""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def seq_scanned_relations(plan: dict) -> list[str]:
+    return sorted({node["Relation Name"] for node in plan_nodes(plan) if node["Node Type"] == "Seq Scan"})
+
+
+def summarize_explain(explain: list) -> dict:
+    """Keeps the plan of EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) together with what regressions are checked on."""
+    result = explain[0]
+
+    return {
+        "execution_time": result["Execution Time"],
+        "planning_time": result["Planning Time"],
+        "seq_scans": seq_scanned_relations(result["Plan"]),
+        "plan": result["Plan"]
+    }
+
+
+def find_regressions(baseline: dict, current: dict, slowdown: float = 2.0, min_milliseconds: float = 1.0) -> list[str]:
+    """
+    Compares the summaries of two runs, {query: summary}. A query regressed when it scans a relation sequentially
+    that it did not scan before, or when it got slowdown times slower. Queries faster than min_milliseconds
+    are too noisy to be compared on time.
+    """
+    regressions = []
+    for name, summary in current.items():
+        if name not in baseline:
+            continue
+        previous = baseline[name]
+
+        for relation in sorted(set(summary["seq_scans"]) - set(previous["seq_scans"])):
+            regressions.append(f'{name}: new Seq Scan on {relation}')
+
+        if summary["execution_time"] >= min_milliseconds and summary["execution_time"] > slowdown * previous["execution_time"]:
+            regressions.append(
+                f'{name}: {summary["execution_time"]:.2f} ms, {summary["execution_time"] / previous["execution_time"]:.1f}x '
+                f'slower than the baseline ({previous["execution_time"]:.2f} ms)'
+            )
+
+    return regressions
@@ -0,0 +1,26 @@
+# parameters of one statement are limited to 65535 by the protocol
+MAX_STATEMENT_PARAMETERS = 65535
+
+
+def batch_size(batch_rows: int, width: int) -> int:
+    """Rows per prepared INSERT of width columns: batch_rows, fewer if their parameters exceed the limit."""
+    return max(1, min(batch_rows, MAX_STATEMENT_PARAMETERS // width))
+
+
+def prepare_insert_statement(name: str, schema_name: str, table: str, columns: tuple, rows: int,
+                             returning: str = None) -> str:
+    """PREPAREs an INSERT of rows rows as name, the values of every row are parameters in column order."""
+    width = len(columns)
+    values = ", ".join(
+        f'({", ".join(f"${row * width + column + 1}" for column in range(width))})' for row in range(rows)
+    )
+    statement = f'PREPARE {name} AS INSERT INTO {schema_name}.{table} ({", ".join(columns)}) VALUES {values}'
+    if returning:
+        statement += f' RETURNING {returning}'
+
+    return statement
+
+
+def execute_statement(name: str, width: int, rows: int) -> str:
+    """EXECUTEs the prepared INSERT name of rows rows of width columns, the values are passed flattened."""
+    return f'EXECUTE {name} ({", ".join(["%s"] * (width * rows))})'
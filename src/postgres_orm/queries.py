@@ -0,0 +1,26 @@
+import os
+import re
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "sql")
+REPORT_QUERY_FILES = ("section_A.sql", "section_B.sql")
+# report queries are introduced by a comment naming them, e.g. "-- Q5: ..." or "-- JQ2"
+QUERY_HEADER = re.compile(r'^--\s*(J?Q\d+)\b', re.MULTILINE)
+
+
+def read_sql_file(file_name: str, schema_name: str = "airport_lab") -> str:
+    """Reads a file of the sql directory, the statements are written against the airport_lab schema."""
+    with open(os.path.join(SQL_DIR, file_name)) as file:
+        return file.read().replace("airport_lab.", f"{schema_name}.")
+
+
+def parse_query_file(file_name: str, schema_name: str = "airport_lab") -> dict[str, str]:
+    """Splits a file of report queries into {name: query}, the trailing semicolon of every query is removed."""
+    content = read_sql_file(file_name, schema_name)
+    headers = list(QUERY_HEADER.finditer(content))
+
+    queries = {}
+    for header, next_header in zip(headers, [*headers[1:], None]):
+        end = next_header.start() if next_header else len(content)
+        queries[header.group(1)] = content[header.start():end].strip().rstrip(';')
+
+    return queries
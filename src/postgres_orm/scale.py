@@ -0,0 +1,45 @@
+# Rows of every table at scale factor 1. Like the scale factor of TPC benchmarks, every table grows linearly
+# with it, so the ratios between the tables (bookings per flight, flights per aircraft, ...) stay the same.
+# Lookup tables keep their size, seats is the cross join of flight_data and seat_classes.
+SCALE_ROWS = {
+    "customers": 1000,
+    "airlines": 20,
+    "aircrafts": 100,
+    "airports": 50,
+    "reporteurs": 100,
+    "flights": 200,
+    "flight_data": 1000,
+    "bookings": 10000,
+    "maintenance_events": 500,
+    "aircraft_slots": 500,
+    "work_orders": 1000,
+    "customer_preferences": 1000,
+    "aircraft_maintenance_logs": 500,
+    "customer_feedback_and_survey": 2000
+}
+
+# keys drawn at random from a fixed space, three letters for airports and two letters and four digits for flights;
+# the tables stay at half of the space, so drawing a key that is not taken yet stays cheap
+KEY_SPACE_LIMITS = {
+    "airports": 26 ** 3 // 2,
+    "flights": 26 ** 2 * 9000 // 2
+}
+
+# share of the maintenance events that get a flight departing during them, 20 of the default 100
+CONFLICT_SHARE = 0.2
+
+
+def scaled_rows(scale_factor: float, fixed_rows: dict[str, int]) -> dict[str, int]:
+    """Rows of every table at the scale factor, fixed_rows are the sizes of the lookup tables."""
+    rows = {
+        table: min(max(1, round(base * scale_factor)), KEY_SPACE_LIMITS.get(table, float("inf")))
+        for table, base in SCALE_ROWS.items()
+    }
+    rows.update(fixed_rows)
+    rows["seats"] = rows["flight_data"] * fixed_rows["seat_classes"]
+
+    return rows
+
+
+def conflict_rows(maintenance_events: int) -> int:
+    return max(1, round(maintenance_events * CONFLICT_SHARE))
@@ -0,0 +1,251 @@
+import numpy as np
+
+# flights a PagedSeatAllocator reads the free seats of at a time
+SEAT_PAGE_FLIGHTS = 1000
+
+# available seats of the flights after the flight id after that still have available_seating (or of the flights
+# given), one row per flight, at most limit flights, in a fixed order so a seeded allocator books the same seats
+# however the seats are laid out on disk. Only as many seats as the flight has available_seating are sent, picked
+# by a hash of their ids rather than the lowest ids, so the client holds the seats that can be booked and not every
+# free seat of the schema. The flights are walked in the order of their key, so a page stops at its limit.
+FREE_SEATS = """
+    SELECT fd.flight_id, fd.available_seating, free.seat_ids
+    FROM {schema}.flight_data fd
+    CROSS JOIN LATERAL (
+        SELECT (array_agg(s.seat_id ORDER BY md5(s.seat_id::text), s.seat_id))[1:fd.available_seating] AS seat_ids
+        FROM {schema}.seats s
+        WHERE s.flight_id = fd.flight_id AND s.seat_status = 'Available'
+    ) AS free
+    WHERE fd.available_seating > 0 AND free.seat_ids IS NOT NULL AND fd.flight_id > %(after)s
+        AND (%(flights)s::integer[] IS NULL OR fd.flight_id = ANY(%(flights)s::integer[]))
+    ORDER BY fd.flight_id
+    LIMIT %(limit)s
+"""
+
+# the number of seats FREE_SEATS sends for all flights, counted in the database
+FREE_SEAT_COUNT = """
+    SELECT COALESCE(sum(LEAST(fd.available_seating, free.seats)), 0)
+    FROM {schema}.flight_data fd
+    JOIN (
+        SELECT flight_id, count(*) AS seats FROM {schema}.seats WHERE seat_status = 'Available' GROUP BY flight_id
+    ) AS free ON free.flight_id = fd.flight_id
+    WHERE fd.available_seating > 0
+"""
+
+# the seats of seat_classes for the given flights that do not have them yet
+ADD_FLIGHT_SEATS = """
+    INSERT INTO {schema}.seats (seat_number, seat_status, flight_id)
+    SELECT sc.seat_number, 'Available', fd.flight_id
+    FROM {schema}.flight_data fd
+    CROSS JOIN {schema}.seat_classes sc
+    WHERE fd.flight_id = ANY(%s::integer[]) AND NOT EXISTS (
+        SELECT 1 FROM {schema}.seats s WHERE s.flight_id = fd.flight_id AND s.seat_number = sc.seat_number
+    )
+"""
+
+# occupies the seats of the bookings from first to last and takes them from the available_seating of their flights,
+# two set-based updates however many bookings were written
+BOOK_SEATS = """
+    WITH booked AS (
+        SELECT flight_id, seat_id FROM {schema}.bookings WHERE booking_id BETWEEN %(first)s AND %(last)s
+    ),
+    occupied AS (
+        UPDATE {schema}.seats SET seat_status = 'Occupied'
+        FROM booked
+        WHERE seats.seat_id = booked.seat_id
+    )
+    UPDATE {schema}.flight_data fd SET available_seating = fd.available_seating - per_flight.seats
+    FROM (SELECT flight_id, count(*) AS seats FROM booked GROUP BY flight_id) AS per_flight
+    WHERE fd.flight_id = per_flight.flight_id
+"""
+
+
+class SeatAllocator:
+    """
+    Free seats of every flight, so bookings get unique seats of the flight they book. The seat ids are kept in
+    one array grouped by flight and shuffled within every flight once, a flight only keeps as many seats as its
+    available_seating (FREE_SEATS already sends no more). Booking takes the next seat of the flight, so a seat costs O(1) whatever the number of
+    seats, and a chunk of bookings is allocated with a few array operations.
+    """
+    def __init__(self, flight_ids: np.ndarray, available_seating: np.ndarray, seat_counts: np.ndarray,
+                 seat_ids: np.ndarray, rng: np.random.Generator):
+        group = np.repeat(np.arange(len(flight_ids)), seat_counts)
+        seat_ids = seat_ids[np.lexsort((rng.random(len(seat_ids)), group))]
+        position = np.arange(len(seat_ids)) - np.repeat(np.cumsum(seat_counts) - seat_counts, seat_counts)
+
+        self.flight_ids = flight_ids
+        self.seat_ids = seat_ids[position < np.repeat(available_seating, seat_counts)]
+        self.seats = np.minimum(seat_counts, available_seating)
+        self.offsets = np.cumsum(self.seats) - self.seats
+        self.taken = np.zeros(len(flight_ids), dtype=np.int64)
+        # flights with seats left, drawn from uniformly
+        self.open = np.flatnonzero(self.seats > 0)
+
+    @classmethod
+    def from_rows(cls, rows, rng: np.random.Generator) -> "SeatAllocator":
+        """Builds the allocator from the (flight_id, available_seating, seat_ids) rows of FREE_SEATS."""
+        flight_ids, available_seating, seat_counts, seat_ids = [], [], [], []
+        for flight_id, available, seats in rows:
+            flight_ids.append(flight_id)
+            available_seating.append(available)
+            seat_counts.append(len(seats))
+            seat_ids.append(np.asarray(seats, dtype=np.int64))
+
+        return cls(
+            np.asarray(flight_ids, dtype=np.int64),
+            np.asarray(available_seating, dtype=np.int64),
+            np.asarray(seat_counts, dtype=np.int64),
+            np.concatenate(seat_ids) if seat_ids else np.empty(0, dtype=np.int64),
+            rng
+        )
+
+    def free_seats(self) -> int:
+        return int((self.seats - self.taken).sum())
+
+    def allocate(self, rng: np.random.Generator, size: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Books size seats on flights drawn at random, returns the flight ids and seat ids. Fewer seats are
+        returned once every flight is full.
+        """
+        flights, seats = [], []
+        while size > 0 and len(self.open):
+            drawn = np.sort(self.open[rng.integers(0, len(self.open), size=size)])
+            # the n-th draw of a flight in this round takes its n-th next seat
+            position = self.taken[drawn] + np.arange(len(drawn)) - np.searchsorted(drawn, drawn)
+            fits = position < self.seats[drawn]
+            drawn, position = drawn[fits], position[fits]
+
+            booked, counts = np.unique(drawn, return_counts=True)
+            self.taken[booked] += counts
+            full = booked[self.taken[booked] == self.seats[booked]]
+            if len(full):
+                self.open = np.setdiff1d(self.open, full, assume_unique=True)
+
+            flights.append(self.flight_ids[drawn])
+            seats.append(self.seat_ids[self.offsets[drawn] + position])
+            size -= len(drawn)
+
+        if not flights:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        # draws come out grouped by flight
+        order = rng.permutation(sum(len(part) for part in flights))
+
+        return np.concatenate(flights)[order], np.concatenate(seats)[order]
+
+    def allocate_flights(self, flight_ids: list[int]) -> list[int]:
+        """Books the next seat of every given flight, None for flights that are full or have no free seats."""
+        seats = []
+        for flight_id in flight_ids:
+            index = int(np.searchsorted(self.flight_ids, flight_id))
+            if index == len(self.flight_ids) or self.flight_ids[index] != flight_id or self.taken[index] == self.seats[index]:
+                seats.append(None)
+                continue
+
+            seats.append(int(self.seat_ids[self.offsets[index] + self.taken[index]]))
+            self.taken[index] += 1
+            if self.taken[index] == self.seats[index]:
+                self.open = self.open[self.open != index]
+
+        return seats
+
+
+class PagedSeatAllocator:
+    """
+    Allocates the seats of a number of bookings a page of SEAT_PAGE_FLIGHTS flights at a time, so the client holds
+    the free seats of one page however many flights there are. The flights are walked once in the order of their
+    ids, every page gets the share of the bookings its free seats have of all free seats and books them like a
+    SeatAllocator. fetch_page(after) returns the FREE_SEATS rows of the page of flights after the flight id after.
+    """
+    def __init__(self, fetch_page, free_seats: int, bookings: int, rng: np.random.Generator):
+        self.fetch_page = fetch_page
+        self.rng = rng
+        # the bookings that get a seat, of all bookings
+        self.bookings = min(bookings, free_seats)
+        # free seats and bookings of the pages not read yet
+        self.unread_seats = free_seats
+        self.unread_bookings = self.bookings
+        self.after = 0
+        # seats allocated on the last page that were not handed out yet
+        self.flight_ids = np.empty(0, dtype=np.int64)
+        self.seat_ids = np.empty(0, dtype=np.int64)
+
+    def allocate(self, rng: np.random.Generator, size: int) -> tuple[np.ndarray, np.ndarray]:
+        """Books size seats like SeatAllocator.allocate, fewer once the seats of all bookings were handed out."""
+        while len(self.seat_ids) < size and self.unread_bookings > 0:
+            rows = self.fetch_page(self.after)
+            if not rows:
+                break
+            self.after = rows[-1][0]
+
+            page = SeatAllocator.from_rows(rows, self.rng)
+            page_seats = min(page.free_seats(), self.unread_seats)
+            # the last page takes the bookings left, so the shares add up to all bookings
+            share = min(round(self.unread_bookings * page_seats / self.unread_seats), page_seats)
+            self.unread_seats -= page_seats
+            self.unread_bookings -= share
+
+            flight_ids, seat_ids = page.allocate(rng, share)
+            self.flight_ids = np.concatenate((self.flight_ids, flight_ids))
+            self.seat_ids = np.concatenate((self.seat_ids, seat_ids))
+
+        flight_ids, self.flight_ids = self.flight_ids[:size], self.flight_ids[size:]
+        seat_ids, self.seat_ids = self.seat_ids[:size], self.seat_ids[size:]
+
+        return flight_ids, seat_ids
+
+
+class AllocatedSeats:
+    """
+    Seats allocated up front and handed out in order, for generators that can not share a SeatAllocator,
+    like the blocks of a sharded fill. block gives the seats of rows start to start + size. Seats spooled to
+    a file are memory-mapped and pickled as the path of the file.
+    """
+    def __init__(self, flight_ids: np.ndarray, seat_ids: np.ndarray, path: str = None):
+        self.flight_ids = flight_ids
+        self.seat_ids = seat_ids
+        self.path = path
+        self.next = 0
+
+    @classmethod
+    def spool(cls, allocator: PagedSeatAllocator, rng: np.random.Generator, size: int, path: str,
+              chunk_size: int) -> "AllocatedSeats":
+        """Allocates the seats of size bookings chunk_size at a time into a .npy file at path."""
+        spooled = np.lib.format.open_memmap(path, mode="w+", dtype=np.int64, shape=(2, size))
+        count = 0
+        while count < size:
+            flight_ids, seat_ids = allocator.allocate(rng, min(chunk_size, size - count))
+            if not len(seat_ids):
+                break
+            spooled[0, count:count + len(seat_ids)] = flight_ids
+            spooled[1, count:count + len(seat_ids)] = seat_ids
+            count += len(seat_ids)
+        spooled.flush()
+
+        return cls(spooled[0, :count], spooled[1, :count], path)
+
+    def __getstate__(self) -> dict:
+        if self.path is None:
+            return self.__dict__
+
+        return {"path": self.path, "count": len(self), "next": self.next}
+
+    def __setstate__(self, state: dict) -> None:
+        if "count" not in state:
+            self.__dict__.update(state)
+            return
+
+        spooled = np.load(state["path"], mmap_mode="r")
+        self.__init__(spooled[0, :state["count"]], spooled[1, :state["count"]], state["path"])
+        self.next = state["next"]
+
+    def __len__(self) -> int:
+        return len(self.seat_ids)
+
+    def block(self, start: int, size: int) -> "AllocatedSeats":
+        return AllocatedSeats(self.flight_ids[start:start + size], self.seat_ids[start:start + size])
+
+    def allocate(self, rng: np.random.Generator, size: int) -> tuple[np.ndarray, np.ndarray]:
+        start, self.next = self.next, min(self.next + size, len(self))
+
+        return self.flight_ids[start:self.next], self.seat_ids[start:self.next]
@@ -0,0 +1,166 @@
+# Set-based versions of the fill methods. Every statement generates all rows of a table inside
+# Postgres, so no row data crosses the wire. {schema} is replaced with the schema of the ORM,
+# foreign keys are drawn at random from arrays aggregated once per statement.
+SERVER_SIDE_FILLS = {
+    "seat_classes": """
+        INSERT INTO {schema}.seat_classes (seat_number, seat_class)
+        SELECT
+            seat_row || letter,
+            CASE WHEN seat_row <= 3 THEN 'Business' WHEN seat_row <= 6 THEN 'First Class' ELSE 'Economy' END
+        FROM generate_series(1, %(seat_rows)s) AS seat_row
+        CROSS JOIN unnest(%(seat_letters)s::text[]) WITH ORDINALITY AS letters (letter, position)
+        ORDER BY seat_row, position
+        ON CONFLICT (seat_number) DO NOTHING
+    """,
+    "seats": """
+        INSERT INTO {schema}.seats (seat_number, seat_status, flight_id)
+        SELECT sc.seat_number, 'Available', fd.flight_id
+        FROM {schema}.flight_data fd
+        CROSS JOIN {schema}.seat_classes sc
+        -- only the seats that are missing, so filling again adds nothing
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {schema}.seats s WHERE s.flight_id = fd.flight_id AND s.seat_number = sc.seat_number
+        )
+        ORDER BY fd.flight_id, sc.seat_number
+    """,
+    "flight_statuses": """
+        INSERT INTO {schema}.flight_statuses (flight_status_type)
+        SELECT unnest(%(flight_statuses)s::text[])
+        ON CONFLICT (flight_status_type) DO NOTHING
+    """,
+    "problems": """
+        INSERT INTO {schema}.problems (problem_type)
+        SELECT unnest(%(problem_types)s::text[])
+        ON CONFLICT (problem_type) DO NOTHING
+    """,
+    "subsystems": """
+        INSERT INTO {schema}.subsystems (subsystem_type)
+        SELECT unnest(%(subsystem_types)s::text[])
+        ON CONFLICT (subsystem_type) DO NOTHING
+    """,
+    "maintenance_types": """
+        INSERT INTO {schema}.maintenance_types (maintenance_type_name)
+        SELECT unnest(%(maintenance_type_names)s::text[])
+        ON CONFLICT (maintenance_type_name) DO NOTHING
+    """,
+    # fillings of the available seats, at most available_seating of every flight, each booked once on its own flight
+    "bookings": """
+        WITH customers AS (SELECT array_agg(customer_id) AS ids FROM {schema}.customers),
+        free_seats AS (
+            SELECT s.seat_id, s.flight_id, fd.available_seating,
+                   row_number() OVER (PARTITION BY s.flight_id ORDER BY random()) AS position
+            FROM {schema}.seats s
+            JOIN {schema}.flight_data fd ON fd.flight_id = s.flight_id
+            WHERE s.seat_status = 'Available' AND fd.available_seating > 0
+        ),
+        booked_seats AS (
+            SELECT seat_id, flight_id FROM free_seats
+            WHERE position <= available_seating
+            ORDER BY random()
+            LIMIT %(fillings)s
+        ),
+        inserted AS (
+            INSERT INTO {schema}.bookings (flight_id, customer_id, seat_id, price, payment_status, booking_date_and_time)
+            SELECT
+                booked_seats.flight_id,
+                customers.ids[1 + floor(random() * cardinality(customers.ids))::int],
+                booked_seats.seat_id,
+                round((50 + random() * 950)::numeric, 2),
+                random() < 0.5,
+                date_trunc('second', CASE
+                    WHEN random() < 0.5 THEN localtimestamp - random() * interval '730 days'
+                    ELSE localtimestamp + random() * interval '5 days'
+                END)
+            FROM booked_seats, customers
+            RETURNING flight_id, seat_id
+        ),
+        seating AS (
+            UPDATE {schema}.flight_data fd SET available_seating = fd.available_seating - per_flight.seats
+            FROM (SELECT flight_id, count(*) AS seats FROM inserted GROUP BY flight_id) AS per_flight
+            WHERE fd.flight_id = per_flight.flight_id
+        )
+        -- last, its row count is the number of bookings
+        UPDATE {schema}.seats SET seat_status = 'Occupied'
+        WHERE seat_id IN (SELECT seat_id FROM inserted)
+    """,
+    "maintenance_events": """
+        WITH aircrafts AS (SELECT array_agg(aircraft_registration_number) AS ids FROM {schema}.aircrafts),
+        airports AS (SELECT array_agg(airport_id) AS ids FROM {schema}.airports),
+        subsystems AS (SELECT array_agg(subsystem_id) AS ids FROM {schema}.subsystems),
+        maintenance_types AS (SELECT array_agg(maintenance_type_id) AS ids FROM {schema}.maintenance_types)
+        INSERT INTO {schema}.maintenance_events (aircraft_registration_number, maintenance_starttime, duration, airport_id, subsystem_id, maintenance_type_id)
+        SELECT
+            aircrafts.ids[1 + floor(random() * cardinality(aircrafts.ids))::int],
+            date_trunc('second', localtimestamp - random() * interval '365 days'),
+            (1 + floor(random() * 12)) * interval '1 hour',
+            airports.ids[1 + floor(random() * cardinality(airports.ids))::int],
+            subsystems.ids[1 + floor(random() * cardinality(subsystems.ids))::int],
+            maintenance_types.ids[1 + floor(random() * cardinality(maintenance_types.ids))::int]
+        FROM generate_series(1, %(fillings)s), aircrafts, airports, subsystems, maintenance_types
+    """,
+    # the volatile subqueries are not flattened, so columns computed in them are drawn once per row
+    "aircraft_slots": """
+        WITH aircrafts AS (SELECT array_agg(aircraft_registration_number) AS ids FROM {schema}.aircrafts),
+        maintenance_events AS (SELECT array_agg(maintenance_id) AS ids FROM {schema}.maintenance_events)
+        INSERT INTO {schema}.aircraft_slots (aircraft_registration_number, slot_start, slot_end, slot_type, slot_scheduled, maintenance_id)
+        SELECT aircraft, slot_start, slot_start + slot_hours * interval '1 hour', slot_type, slot_scheduled, maintenance_id
+        FROM (
+            SELECT
+                aircrafts.ids[1 + floor(random() * cardinality(aircrafts.ids))::int] AS aircraft,
+                date_trunc('second', localtimestamp - random() * interval '365 days') AS slot_start,
+                1 + floor(random() * 12) AS slot_hours,
+                (%(slot_types)s::text[])[1 + floor(random() * cardinality(%(slot_types)s::text[]))::int] AS slot_type,
+                random() < 0.5 AS slot_scheduled,
+                maintenance_events.ids[1 + floor(random() * cardinality(maintenance_events.ids))::int] AS maintenance_id
+            FROM generate_series(1, %(fillings)s), aircrafts, maintenance_events
+        ) AS drawn
+    """,
+    # due_date >= forecasted_date >= reporting_date and execution_date >= reporting_date
+    "work_orders": """
+        WITH aircrafts AS (SELECT array_agg(aircraft_registration_number) AS ids FROM {schema}.aircrafts),
+        maintenance_events AS (SELECT array_agg(maintenance_id) AS ids FROM {schema}.maintenance_events),
+        airports AS (SELECT array_agg(airport_id) AS ids FROM {schema}.airports),
+        reporteurs AS (SELECT array_agg(reporteur_id) AS ids FROM {schema}.reporteurs)
+        INSERT INTO {schema}.work_orders (aircraft_registration_number, maintenance_id, airport_id, execution_date, scheduled, forecasted_date, forecasted_manhours, frequency, reporteur_id, due_date, reporting_date)
+        SELECT
+            aircraft, maintenance_id, airport_id,
+            reporting_date + floor(random() * (current_date + 365 - reporting_date + 1))::int,
+            scheduled, forecasted_date, forecasted_manhours, frequency, reporteur_id,
+            forecasted_date + floor(random() * (current_date + 365 - forecasted_date + 1))::int,
+            reporting_date
+        FROM (
+            SELECT *, reporting_date + floor(random() * (current_date + 365 - reporting_date + 1))::int AS forecasted_date
+            FROM (
+                SELECT
+                    aircrafts.ids[1 + floor(random() * cardinality(aircrafts.ids))::int] AS aircraft,
+                    maintenance_events.ids[1 + floor(random() * cardinality(maintenance_events.ids))::int] AS maintenance_id,
+                    airports.ids[1 + floor(random() * cardinality(airports.ids))::int] AS airport_id,
+                    random() < 0.5 AS scheduled,
+                    1 + floor(random() * 9) AS forecasted_manhours,
+                    1 + floor(random() * 9)::int AS frequency,
+                    reporteurs.ids[1 + floor(random() * cardinality(reporteurs.ids))::int] AS reporteur_id,
+                    current_date - floor(random() * 731)::int AS reporting_date
+                FROM generate_series(1, %(fillings)s), aircrafts, maintenance_events, airports, reporteurs
+            ) AS drawn
+        ) AS forecasted
+    """,
+    "customer_preferences": """
+        WITH customers AS (SELECT array_agg(customer_id) AS ids FROM {schema}.customers)
+        INSERT INTO {schema}.customer_preferences (customer_id, customer_preferences_data)
+        SELECT
+            customers.ids[1 + floor(random() * cardinality(customers.ids))::int],
+            json_build_object(
+                'meal', (ARRAY['vegetarian', 'vegan', 'gluten-free', 'standard'])[1 + floor(random() * 4)::int],
+                'seating', json_build_object(
+                    'aisle', random() < 0.5,
+                    'extra_legroom', random() < 0.5,
+                    'seat_near_exit', random() < 0.5
+                ),
+                'notifications', json_build_object(
+                    'email', random() < 0.5,
+                    'sms', random() < 0.5
+                )
+            )
+        FROM generate_series(1, %(fillings)s), customers
+    """
+}
@@ -0,0 +1,110 @@
+from datetime import datetime
+
+import numpy as np
+import psycopg2
+
+from .copy_stream import build_copy_buffer
+from .instrumentation import CountingConnection
+from .prepared import batch_size, execute_statement, prepare_insert_statement
+from .vectorized import ColumnGenerator, bookings_rows, seats_rows
+
+# blocks do not depend on the number of workers, every block has its own random stream
+SHARD_BLOCK_SIZE = 10000
+
+SHARDED_TABLES = {
+    "seats": {
+        "rows": seats_rows,
+        "columns": ("seat_number", "seat_status", "flight_id"),
+        "returning": "seat_id"
+    },
+    "bookings": {
+        "rows": bookings_rows,
+        "columns": ("flight_id", "customer_id", "seat_id", "price", "payment_status", "booking_date_and_time"),
+        "returning": "booking_id"
+    },
+    # generated by the generation plan of the ORM, the spec completed from the catalog like in unsharded fills,
+    # see PostgresORM.get_generation_plan
+    "work_orders": None,
+    "aircraft_slots": None,
+    "maintenance_events": None
+}
+
+
+def generate_block(table: str, generate, block: int, fillings: int, seed: int, pools: dict, now: datetime,
+                   value_pools=None) -> list[tuple]:
+    start = block * SHARD_BLOCK_SIZE
+    size = min(SHARD_BLOCK_SIZE, fillings - start)
+
+    if table == "seats":
+        return seats_rows(start, size, pools)
+    if table == "bookings":
+        # seats are allocated up front, so the blocks book different seats whichever process writes them
+        pools = {**pools, "seats": pools["seats"].block(start, size)}
+
+    columns = ColumnGenerator(np.random.default_rng([seed, block]), now, value_pools=value_pools)
+
+    return generate(columns, size, pools)
+
+
+def write_prepared(cursor, schema_name: str, table: str, columns: tuple, rows: list[tuple], batch_rows: int,
+                   prepared: dict) -> None:
+    """Writes rows with prepared multi-row INSERTs, prepared once per batch size on the connection of the cursor."""
+    size = batch_size(batch_rows, len(columns))
+    for start in range(0, len(rows), size):
+        batch = rows[start:start + size]
+        if len(batch) not in prepared:
+            prepared[len(batch)] = f'shard_insert_{len(batch)}'
+            cursor.execute(prepare_insert_statement(prepared[len(batch)], schema_name, table, columns, len(batch)))
+
+        cursor.execute(
+            execute_statement(prepared[len(batch)], len(columns), len(batch)), [value for row in batch for value in row]
+        )
+
+
+def write_shard(connection_kwargs: dict, schema_name: str, table: str, spec: dict, blocks: range, fillings: int,
+                seed: int, pools: dict, now: datetime, first_key: int, value_pools=None, write_mode: str = "copy",
+                batch_rows: int = 500) -> tuple[int, dict]:
+    """
+    Generates the given blocks of a table and streams them through COPY on a connection of its own, or writes
+    them with prepared multi-row INSERTs of batch_rows rows in the "prepared" write mode.
+    Keys are derived from the position of the row, so the rows do not depend on how the blocks are split.
+    The shard is committed once, a failing shard leaves nothing behind. Shards commit independently of each
+    other, the caller removes the rows of the other shards when one of them fails. spec holds the rows function,
+    the columns and the returning key, from SHARDED_TABLES or the generation plan of the table.
+    Returns the rows written and the counters of the connection of the shard, see CountingConnection.
+    """
+    columns = (spec["returning"], *spec["columns"])
+
+    connection = psycopg2.connect(**connection_kwargs, connection_factory=CountingConnection)
+    try:
+        cursor = connection.cursor()
+        prepared = {}
+        written = 0
+        for block in blocks:
+            rows = generate_block(table, spec["rows"], block, fillings, seed, pools, now, value_pools)
+            key = first_key + block * SHARD_BLOCK_SIZE
+            rows = [(key + offset, *row) for offset, row in enumerate(rows)]
+
+            if write_mode == "prepared":
+                write_prepared(cursor, schema_name, table, columns, rows, batch_rows, prepared)
+            else:
+                cursor.copy_expert(
+                    f'COPY {schema_name}.{table} ({", ".join(columns)}) FROM STDIN', build_copy_buffer(rows)
+                )
+            written += len(rows)
+
+        connection.commit()
+    finally:
+        connection.close()
+
+    return written, connection.counters
+
+
+def split_blocks(fillings: int, workers: int) -> list[range]:
+    if fillings <= 0:
+        return []
+
+    blocks = -(-fillings // SHARD_BLOCK_SIZE)
+    per_worker = -(-blocks // workers)
+
+    return [range(start, min(start + per_worker, blocks)) for start in range(0, blocks, per_worker)]
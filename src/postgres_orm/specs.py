@@ -0,0 +1,62 @@
+# Specs of the tables of the airport schema whose rows are independent column draws, see generator.py for the
+# kinds. Tables without a spec and without a fill method of their own are generated from the catalog alone.
+# flight_data, bookings, seats, the lookup tables, the tables with unique natural keys and the JSON documents keep
+# their fill methods, their rows depend on other rows or on other tables beyond a key.
+YEAR = 365
+
+SLOT_TYPES = ("Maintenance", "Cleaning", "Inspection", "Repair")
+AIRCRAFT_TYPES = ("Boeing 737", "Airbus A320", "Boeing 777", "Airbus A350")
+AIRCRAFT_CAPACITY = 300
+REPORTEUR_CLASSES = ("Steward", "Pilot", "Mechanic")
+
+TABLE_SPECS = {
+    "customers": {
+        "name": ("pool", "name"),
+        "email": ("pool", "{}{}@google.com", "user_name", "digits"),
+        "phone_number": ("pool", "phone_number"),
+        "address": ("pool", "address")
+    },
+    "airlines": {
+        "airline_name": ("pool", "{} Air", "company")
+    },
+    "aircrafts": {
+        "aircraft_type": ("choice", AIRCRAFT_TYPES),
+        "aircraft_company": ("pool", "company"),
+        "aircraft_capacity": ("constant", AIRCRAFT_CAPACITY)
+    },
+    "reporteurs": {
+        "reporteur_class": ("choice", REPORTEUR_CLASSES),
+        "reporteur_name": ("pool", "name")
+    },
+    # due_date >= forecasted_date >= reporting_date and execution_date >= reporting_date
+    "work_orders": {
+        "aircraft_registration_number": ("key", "aircrafts", "aircraft_registration_number"),
+        "maintenance_id": ("key", "maintenance_events", "maintenance_id"),
+        "airport_id": ("key", "airports", "airport_id"),
+        "execution_date": ("dates", "reporting_date", YEAR),
+        "scheduled": ("booleans",),
+        "forecasted_date": ("dates", "reporting_date", YEAR),
+        "forecasted_manhours": ("integers", 1, 9),
+        "frequency": ("integers", 1, 9),
+        "reporteur_id": ("key", "reporteurs", "reporteur_id"),
+        "due_date": ("dates", "forecasted_date", YEAR),
+        "reporting_date": ("dates", -2 * YEAR, 0)
+    },
+    "aircraft_slots": {
+        "aircraft_registration_number": ("key", "aircrafts", "aircraft_registration_number"),
+        "slot_start": ("datetimes", -YEAR, 0),
+        "slot_end": ("offset", "slot_start", ("hours", 1, 12)),
+        "slot_type": ("choice", SLOT_TYPES),
+        "slot_scheduled": ("booleans",),
+        "maintenance_id": ("key", "maintenance_events", "maintenance_id")
+    },
+    # maintenance_window is generated from the start time and the duration
+    "maintenance_events": {
+        "aircraft_registration_number": ("key", "aircrafts", "aircraft_registration_number"),
+        "maintenance_starttime": ("datetimes", -YEAR, 0),
+        "duration": ("hours", 1, 12),
+        "airport_id": ("key", "airports", "airport_id"),
+        "subsystem_id": ("key", "subsystems", "subsystem_id"),
+        "maintenance_type_id": ("key", "maintenance_types", "maintenance_type_id")
+    }
+}
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import uuid
+from threading import Lock
+
+import numpy as np
+from faker import Faker, VERSION as FAKER_VERSION
+
+# Strings Faker generates, drawn from pools generated once per seed instead of one Faker call per row. The pools
+# of a seeded run are kept in one file of VALUE_POOL_DIR, unseeded runs keep theirs in memory. A file holds an 8 byte
+# header size, a JSON header of kind -> (offset, count, width) and one fixed width byte array per kind, memory-mapped
+# when read, so drawing a column is an index draw and a copy of the drawn values.
+VALUE_POOL_DIR = "value_pools"
+VALUE_POOL_SIZE = 10000
+
+# the Faker method and arguments every pool is generated with
+BASE_POOLS = {
+    "first_name": ("first_name", {}),
+    "last_name": ("last_name", {}),
+    "user_name": ("user_name", {}),
+    "digits": ("numerify", {"text": "###"}),
+    "free_email_domain": ("free_email_domain", {}),
+    "phone_number": ("phone_number", {}),
+    "company": ("company", {}),
+    "street_address": ("street_address", {}),
+    "city": ("city", {}),
+    "state_abbr": ("state_abbr", {}),
+    "postcode": ("postcode", {}),
+    "country": ("country", {}),
+    "sentence": ("sentence", {"nb_words": 10})
+}
+
+# kinds mixed from the pools of other kinds, every part drawn on its own, so a mix has as many distinct values as
+# the product of the sizes of its parts, e.g. 10^8 names from 10^4 first and last names
+MIXED_POOLS = {
+    "name": ("{} {}", ("first_name", "last_name")),
+    "email": ("{}{}@{}", ("user_name", "digits", "free_email_domain")),
+    "address": ("{}\n{}, {} {}", ("street_address", "city", "state_abbr", "postcode"))
+}
+
+HEADER_SIZE_BYTES = 8
+
+
+def value_pool_path(directory: str, seed: int, size: int) -> str:
+    """The file of the pools of a seed, which changes with the pool definitions and the Faker version."""
+    definitions = json.dumps({"pools": BASE_POOLS, "faker": FAKER_VERSION}, sort_keys=True)
+    digest = hashlib.sha256(definitions.encode()).hexdigest()[:8]
+
+    return os.path.join(directory, f'pools_{seed}_{size}_{digest}.bin')
+
+
+def generate_value_pools(seed: int, size: int) -> dict[str, np.ndarray]:
+    """size values of every kind of BASE_POOLS as fixed width byte arrays, from a Faker seeded with seed if given."""
+    faker = Faker()
+    if seed is not None:
+        faker.seed_instance(seed)
+
+    pools = {}
+    for kind, (method, kwargs) in BASE_POOLS.items():
+        provider = getattr(faker, method)
+        pools[kind] = np.array([provider(**kwargs).encode() for _ in range(size)])
+
+    return pools
+
+
+def write_value_pools(path: str, pools: dict[str, np.ndarray]) -> None:
+    header, offset = {}, 0
+    for kind, values in pools.items():
+        header[kind] = (offset, len(values), values.dtype.itemsize)
+        offset += values.nbytes
+
+    encoded_header = json.dumps(header).encode()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # written to a name of its own and renamed, so a reader never maps a partly written file and processes building
+    # the same pools at once do not write into each other's file; the last rename wins with the same content
+    partial_path = f'{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp'
+    try:
+        with open(partial_path, "wb") as file:
+            file.write(len(encoded_header).to_bytes(HEADER_SIZE_BYTES, "little"))
+            file.write(encoded_header)
+            for values in pools.values():
+                file.write(values.tobytes())
+        os.replace(partial_path, path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+
+def read_value_pools(path: str) -> dict[str, np.ndarray]:
+    with open(path, "rb") as file:
+        header_size = int.from_bytes(file.read(HEADER_SIZE_BYTES), "little")
+        header = json.loads(file.read(header_size))
+
+    start = HEADER_SIZE_BYTES + header_size
+
+    return {
+        kind: np.memmap(path, dtype=f'S{width}', mode="r", offset=start + offset, shape=(count,))
+        for kind, (offset, count, width) in header.items()
+    }
+
+
+class ValuePools:
+    """
+    The pools of one seed, generated on the first draw if the file does not exist yet and memory-mapped from then
+    on. Without a seed the pools are generated from an unseeded Faker and kept in memory, so unseeded runs neither
+    share pools nor write files. The first draw is locked, ORMs cloned for parallel fills share the object.
+    Pickled as its location, so worker processes map the file instead of copying the pools; pools in memory are
+    pickled with their values.
+    """
+    def __init__(self, seed: int = None, size: int = VALUE_POOL_SIZE, directory: str = VALUE_POOL_DIR,
+                 pools: dict[str, np.ndarray] = None):
+        self.seed = seed
+        self.size = size
+        self.directory = directory
+        self.path = value_pool_path(directory, seed, size) if seed is not None else None
+        self.__pools = pools
+        self.__lock = Lock()
+
+    def __getstate__(self) -> dict:
+        state = {"seed": self.seed, "size": self.size, "directory": self.directory}
+        if self.seed is None:
+            state["pools"] = self.pools
+
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)
+
+    @property
+    def pools(self) -> dict[str, np.ndarray]:
+        with self.__lock:
+            if self.__pools is None:
+                if self.path is None:
+                    self.__pools = generate_value_pools(None, self.size)
+                else:
+                    if not os.path.exists(self.path):
+                        write_value_pools(self.path, generate_value_pools(self.seed, self.size))
+                    self.__pools = read_value_pools(self.path)
+
+        return self.__pools
+
+    def kinds(self) -> tuple[str, ...]:
+        return (*BASE_POOLS, *MIXED_POOLS)
+
+    def draw(self, rng: np.random.Generator, kind: str, size: int) -> np.ndarray:
+        """size values of a kind of BASE_POOLS or MIXED_POOLS as a string array."""
+        if kind in MIXED_POOLS:
+            return self.compose(rng, *MIXED_POOLS[kind], size)
+        if kind not in BASE_POOLS:
+            raise ValueError(f'Unknown value pool {kind}, expected one of {self.kinds()}')
+
+        pool = self.pools[kind]
+
+        return np.char.decode(pool[rng.integers(0, len(pool), size=size)], "utf-8")
+
+    def compose(self, rng: np.random.Generator, template: str, kinds: tuple[str, ...], size: int) -> np.ndarray:
+        """size values of template, every {} replaced with a value drawn from the pool of the kind at its position."""
+        literals = template.split("{}")
+        if len(literals) != len(kinds) + 1:
+            raise ValueError(f'Template {template!r} has {len(literals) - 1} fields for {len(kinds)} kinds')
+
+        values = np.full(size, literals[0])
+        for kind, literal in zip(kinds, literals[1:]):
+            values = np.char.add(np.char.add(values, self.draw(rng, kind, size)), literal)
+
+        return values
@@ -0,0 +1,127 @@
+from datetime import datetime, time
+
+import numpy as np
+
+YEAR = np.timedelta64(365, 'D')
+
+
+class ColumnGenerator:
+    """
+    Draws whole columns of random values as numpy arrays instead of one value per call. Strings are drawn from
+    value_pools, see value_pools.py, faker is used by the columns that have no pool, see generator.py.
+    """
+    def __init__(self, rng: np.random.Generator, now: datetime, faker=None, value_pools=None):
+        self.rng = rng
+        self.faker = faker
+        self.value_pools = value_pools
+        self.now = np.datetime64(now, 's')
+        self.today = self.now.astype('datetime64[D]')
+
+    def choice(self, pool: np.ndarray, size: int, p: list[float] = None) -> np.ndarray:
+        return pool[self.rng.choice(len(pool), size=size, p=p)]
+
+    def integers(self, low: int, high: int, size: int) -> np.ndarray:
+        """Integers from low to high, both inclusive like random.randint."""
+        return self.rng.integers(low, high, size=size, endpoint=True)
+
+    def uniform(self, low: float, high: float, size: int, decimals: int = None) -> np.ndarray:
+        values = self.rng.uniform(low, high, size=size)
+
+        return values if decimals is None else values.round(decimals)
+
+    def booleans(self, size: int, chance: float = 0.5) -> np.ndarray:
+        return self.rng.random(size) < chance
+
+    def datetimes_between(self, start, end, size: int) -> np.ndarray:
+        """Timestamps with second precision, start and end can be scalars or arrays."""
+        start = np.asarray(start, dtype='datetime64[s]')
+        span = (np.asarray(end, dtype='datetime64[s]') - start).astype(np.int64)
+
+        return start + (self.rng.random(size) * span).astype('timedelta64[s]')
+
+    def dates_between(self, start, end, size: int) -> np.ndarray:
+        """Dates from start to end, both inclusive, start and end can be scalars or arrays."""
+        start = np.asarray(start, dtype='datetime64[D]')
+        span = (np.asarray(end, dtype='datetime64[D]') - start).astype(np.int64)
+
+        return start + self.rng.integers(0, span + 1, size=size).astype('timedelta64[D]')
+
+    def times(self, size: int) -> list[time]:
+        seconds = self.rng.integers(0, 24 * 60 * 60, size=size).tolist()
+
+        return [time(second // 3600, second // 60 % 60, second % 60) for second in seconds]
+
+    def hours(self, low: int, high: int, size: int) -> np.ndarray:
+        return self.integers(low, high, size).astype('timedelta64[h]')
+
+    def strings(self, kind: str, size: int) -> np.ndarray:
+        return self.value_pools.draw(self.rng, kind, size)
+
+    def mixed_strings(self, template: str, kinds: tuple[str, ...], size: int) -> np.ndarray:
+        """template with every {} replaced with a value of the kind at its position."""
+        return self.value_pools.compose(self.rng, template, kinds, size)
+
+
+def flight_data_rows(columns: ColumnGenerator, size: int, pools: dict) -> list[tuple]:
+    aircraft_index = columns.rng.integers(0, len(pools["aircrafts"]), size=size)
+    capacity = pools["capacities"][aircraft_index]
+
+    capacity_multiplier = np.where(columns.booleans(size), 1, 0.9)
+    number_of_passengers = (capacity_multiplier * capacity).astype(np.int64)
+
+    # 80% first status, 15% second and 5% third, 80% of the flights have the first problem
+    status_draw = columns.rng.random(size)
+    status_index = np.where(status_draw >= 0.8, np.where(status_draw <= 0.95, 1, 2), 0)
+    problem_id = np.where(
+        columns.rng.random(size) <= 0.8,
+        pools["problems"][0],
+        columns.choice(pools["problems"], size)
+    )
+
+    return list(zip(
+        columns.choice(pools["flights"], size).tolist(),
+        pools["aircrafts"][aircraft_index].tolist(),
+        pools["flight_statuses"][status_index].tolist(),
+        problem_id.tolist(),
+        number_of_passengers.tolist(),
+        columns.integers(1, 9, size).tolist(),
+        columns.integers(1, 9, size).tolist(),
+        (capacity - number_of_passengers).tolist(),
+        columns.dates_between(columns.today, columns.today + YEAR, size).tolist(),
+        columns.times(size)
+    ))
+
+
+def bookings_rows(columns: ColumnGenerator, size: int, pools: dict) -> list[tuple]:
+    # every booking gets a seat of its own flight from the allocator, fewer bookings once the flights are full
+    flight_id, seat_id = pools["seats"].allocate(columns.rng, size)
+    size = len(seat_id)
+
+    # half of the bookings lie in the last two years, the other half in the next five days
+    past = columns.booleans(size)
+    booking_date_and_time = np.where(
+        past,
+        columns.datetimes_between(columns.now - 2 * YEAR, columns.now, size),
+        columns.datetimes_between(columns.now, columns.now + np.timedelta64(5, 'D'), size)
+    )
+
+    return list(zip(
+        flight_id.tolist(),
+        columns.choice(pools["customers"], size).tolist(),
+        seat_id.tolist(),
+        columns.uniform(50, 1000, size, decimals=2).tolist(),
+        columns.booleans(size).tolist(),
+        booking_date_and_time.tolist()
+    ))
+
+
+def seats_rows(start: int, size: int, pools: dict) -> list[tuple]:
+    """Rows start to start + size of the cross join of flight_data and seat_classes."""
+    index = np.arange(start, start + size)
+    seat_numbers = pools["seat_classes"]
+
+    return list(zip(
+        seat_numbers[index % len(seat_numbers)].tolist(),
+        ["Available"] * size,
+        pools["flight_data"][index // len(seat_numbers)].tolist()
+    ))
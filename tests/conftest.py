@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the package lives in src and is not installed
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
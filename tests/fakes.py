@@ -0,0 +1,117 @@
+import re
+
+import psycopg2
+
+from postgres_orm import PostgresORM
+
+BAD_VALUE = "bad"
+
+
+class FakeCursor:
+    """
+    Records the statements of the ORM per transaction and returns increasing keys for serial columns, rejects rows
+    holding BAD_VALUE like a failing trigger.
+    """
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+        self.result = []
+
+    def execute(self, query, params=None):
+        if self.connection.rows_of(query, params) and params and BAD_VALUE in params:
+            raise psycopg2.Error("rejected")
+        if query.startswith("PREPARE"):
+            name, values = re.match(r'PREPARE (\w+) AS .* VALUES (.*)', query).groups()
+            self.connection.prepared[name] = (values.count("("), "RETURNING" in query)
+        self.connection.transaction.append((query, params))
+        self.rowcount = 1
+
+        if "fill_checkpoints" in query and "RETURNING rows_done" in query:
+            self.result = [self.connection.checkpoint]
+        elif query.startswith("SELECT min("):
+            # an empty table, for the key pool
+            self.result = [(None, None, 0)]
+        elif "nextval" in query:
+            self.result = [(key,) for key in self.connection.keys(params[1])]
+        elif "RETURNING" in query or query.startswith("EXECUTE") and self.connection.prepared[query.split()[1]][1]:
+            self.result = [(key,) for key in self.connection.keys(self.connection.rows_of(query, params))]
+        else:
+            self.result = [(1,)]
+
+    def copy_expert(self, sql, file, size=8192):
+        content = file.read()
+        if BAD_VALUE in content:
+            raise psycopg2.Error("rejected")
+        self.connection.transaction.append(("COPY", content.count("\n")))
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.transaction = []
+        self.committed = []
+        # the statements of every committed transaction
+        self.transactions = []
+        # (rows written, rows the checkpoint advanced by) of everything committed, after every commit
+        self.commits = []
+        # START_CHECKPOINT returns it as rows_done and completed
+        self.checkpoint = (0, False)
+        # name -> (rows, returning) of the prepared inserts
+        self.prepared = {}
+        self.last_key = 0
+
+    def keys(self, count: int) -> list[int]:
+        self.last_key += count
+
+        return list(range(self.last_key - count + 1, self.last_key + 1))
+
+    def rows_of(self, query: str, params) -> int:
+        """The rows a statement inserts: a plain or a prepared INSERT, possibly behind a SAVEPOINT, or a COPY."""
+        if query == "COPY":
+            return params
+        if "EXECUTE " in query:
+            return self.prepared[query.split("EXECUTE ")[1].split()[0]][0]
+        if "INSERT INTO" in query and not query.startswith("PREPARE") and "fill_checkpoints" not in query:
+            return 1
+
+        return 0
+
+    def written_rows(self, statements: list) -> int:
+        return sum(self.rows_of(query, params) for query, params in statements)
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed.extend(self.transaction)
+        self.transactions.append(self.transaction)
+        self.transaction = []
+        self.commits.append((self.written_rows(self.committed), checkpointed_rows(self.committed)))
+
+    def rollback(self):
+        self.transaction = []
+
+    def close(self):
+        pass
+
+
+def checkpointed_rows(statements: list) -> int:
+    return sum(params[0] for query, params in statements if "rows_done = rows_done +" in query)
+
+
+class FakeORM(PostgresORM):
+    def get_connection(self):
+        return FakeConnection()
+
+
+def fake_orm(write_mode: str = "insert", commit_policy: str = "row") -> FakeORM:
+    return FakeORM("", "", "", "", "db", "schema", write_mode=write_mode, chunk_size=10, commit_policy=commit_policy,
+                   commit_every=3, batch_rows=4)
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+import pytest
+
+from fakes import fake_orm
+
+BOOKING_COLUMNS = ("flight_id", "customer_id", "seat_id", "price", "payment_status", "booking_date_and_time")
+
+
+@pytest.mark.parametrize("write_mode", ["insert", "copy", "prepared"])
+@pytest.mark.parametrize("commit_policy", ["row", "batch"])
+def test_seats_are_occupied_in_the_transaction_of_their_bookings(write_mode, commit_policy):
+    orm = fake_orm(write_mode, commit_policy)
+    bookings = [(1, 1, seat, 100.0, True, datetime(2024, 1, 1)) for seat in range(25)]
+
+    orm._PostgresORM__write_rows(
+        "bookings", BOOKING_COLUMNS, iter(bookings), returning="booking_id",
+        on_write=orm._PostgresORM__book_written_seats
+    )
+    orm._PostgresORM__commit()
+
+    # a fill failing or dying after any commit leaves no committed booking with a seat that is still available
+    booked = 0
+    for transaction in orm.connection.transactions:
+        occupied = sum(
+            params["last"] - params["first"] + 1 for query, params in transaction if "'Occupied'" in query
+        )
+        assert occupied == orm.connection.written_rows(transaction)
+        booked += occupied
+    assert booked == 25
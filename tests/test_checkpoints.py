@@ -0,0 +1,70 @@
+import pytest
+
+from fakes import BAD_VALUE, FakeConnection, FakeORM, fake_orm
+
+COLUMNS = ("a", "b")
+
+
+def checkpointed_orm(write_mode: str = "insert", commit_policy: str = "row") -> FakeORM:
+    orm = fake_orm(write_mode, commit_policy)
+    orm._PostgresORM__checkpoint = ("run", "t")
+
+    return orm
+
+
+def write(write_mode: str, commit_policy: str, rows: list, **kwargs) -> FakeConnection:
+    orm = checkpointed_orm(write_mode, commit_policy)
+    orm._PostgresORM__write_rows("t", COLUMNS, iter(rows), **kwargs)
+    orm._PostgresORM__commit()
+
+    return orm.connection
+
+
+@pytest.mark.parametrize("write_mode", ["insert", "copy", "prepared"])
+@pytest.mark.parametrize("commit_policy", ["row", "batch", "table"])
+def test_every_commit_checkpoints_the_rows_it_commits(write_mode, commit_policy):
+    rows = [(index, "x") for index in range(25)]
+
+    connection = write(write_mode, commit_policy, rows)
+
+    # a crash after any commit resumes at the rows that were committed, neither skipping nor repeating rows
+    for written, checkpointed in connection.commits:
+        assert written == checkpointed
+    assert connection.commits[-1] == (25, 25)
+
+
+@pytest.mark.parametrize("write_mode", ["insert", "copy", "prepared"])
+@pytest.mark.parametrize("commit_policy", ["row", "batch"])
+def test_rejected_rows_count_as_done(write_mode, commit_policy):
+    rows = [(index, BAD_VALUE if index == 12 else "x") for index in range(25)]
+
+    connection = write(write_mode, commit_policy, rows)
+
+    written, checkpointed = connection.commits[-1]
+    assert written == 24
+    assert checkpointed == 25
+
+
+def test_rows_written_apart_from_the_table_do_not_advance_its_checkpoint():
+    connection = write("insert", "batch", [(index, "x") for index in range(5)], checkpointed=False)
+
+    assert connection.commits[-1] == (5, 0)
+
+
+def test_resumed_conflicts_are_the_ones_the_checkpoint_misses():
+    orm = checkpointed_orm()
+    orm._PostgresORM__checkpoint = ("run", "maintenance_events")
+    # 60 of 100 rows were done before the run was resumed, 5 of the 20 conflicts of the table
+    orm._PostgresORM__resumed_rows = 60
+    orm.connection.checkpoint = (5, False)
+    filled = []
+
+    def fill_conflict(conflicts):
+        filled.append((conflicts, orm._PostgresORM__checkpoint))
+        return True
+
+    orm._PostgresORM__fill_conflict = fill_conflict
+
+    assert orm._PostgresORM__fill_conflicts(40)
+    assert filled == [(15, ("run", "maintenance_events_conflicts"))]
+    assert orm._PostgresORM__checkpoint == ("run", "maintenance_events")
@@ -0,0 +1,36 @@
+from datetime import date, datetime, time, timedelta
+
+from psycopg2.extras import Json
+
+from postgres_orm.copy_stream import build_copy_buffer, format_copy_value
+
+
+def test_none_is_null_marker():
+    assert format_copy_value(None) == '\\N'
+
+
+def test_booleans():
+    assert format_copy_value(True) == 't'
+    assert format_copy_value(False) == 'f'
+
+
+def test_special_characters_are_escaped():
+    assert format_copy_value('a\tb\nc\rd\\e') == 'a\\tb\\nc\\rd\\\\e'
+
+
+def test_json_and_dicts_are_dumped():
+    assert format_copy_value(Json({"a": 1})) == '{"a": 1}'
+    assert format_copy_value({"a": [1, 2]}) == '{"a": [1, 2]}'
+
+
+def test_temporal_values():
+    assert format_copy_value(date(2024, 1, 2)) == '2024-01-02'
+    assert format_copy_value(datetime(2024, 1, 2, 3, 4, 5)) == '2024-01-02 03:04:05'
+    assert format_copy_value(time(3, 4)) == '03:04:00'
+    assert format_copy_value(timedelta(days=1, seconds=5)) == '1 days 5 seconds 0 microseconds'
+
+
+def test_buffer_has_one_line_per_row():
+    buffer = build_copy_buffer([(1, "a\tb", None), (2, "c", True)])
+
+    assert buffer.read() == '1\ta\\tb\t\\N\n2\tc\tt\n'
@@ -0,0 +1,58 @@
+import os
+from datetime import datetime
+
+from fakes import FakeORM
+
+from postgres_orm.dataset import MANIFEST_FILE, dataset_key
+
+INPUTS = {
+    "seed": 42,
+    "fillings": 100,
+    "frequent_flyers": 3,
+    "reference_time": "2025-01-01T00:00:00",
+    "write_mode": "copy",
+    "chunk_size": 10,
+    "value_pool_size": 10000,
+    "scale_factor": None
+}
+
+
+def test_key_changes_with_every_input():
+    keys = {dataset_key(INPUTS)}
+    for name, value in [("chunk_size", 20), ("value_pool_size", 100), ("scale_factor", 2), ("seed", 43)]:
+        keys.add(dataset_key({**INPUTS, name: value}))
+
+    assert len(keys) == 5
+    assert dataset_key(dict(reversed(INPUTS.items()))) == dataset_key(INPUTS)
+
+
+def builder(chunk_size: int, built: list, reloaded: list) -> FakeORM:
+    orm = FakeORM("", "", "", "", "db", "schema", chunk_size=chunk_size)
+    orm.get_filling_order = lambda: ["customers"]
+    orm.fill_tables = lambda tables, fillings: {table: True for table in tables}
+
+    def dump_dataset(path, tables, inputs):
+        os.makedirs(path)
+        with open(os.path.join(path, MANIFEST_FILE), "w") as file:
+            file.write("{}")
+        built.append((path, inputs["chunk_size"]))
+        return True
+
+    orm.dump_dataset = dump_dataset
+    orm.restore_dataset = lambda path: reloaded.append(path) or True
+
+    return orm
+
+
+def test_datasets_of_other_chunk_sizes_are_built_not_reloaded(tmp_path):
+    built, reloaded = [], []
+    reference_time = datetime(2025, 1, 1)
+
+    for chunk_size in (10, 20, 10):
+        builder(chunk_size, built, reloaded).build_dataset(
+            42, frequent_flyers=0, reference_time=reference_time, cache_dir=str(tmp_path)
+        )
+
+    assert [chunk_size for _, chunk_size in built] == [10, 20]
+    assert built[0][0] != built[1][0]
+    assert reloaded == [built[0][0]]
@@ -0,0 +1,122 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from postgres_orm.generator import RowPlan, complete_spec, default_spec
+from postgres_orm.specs import TABLE_SPECS
+from postgres_orm.vectorized import ColumnGenerator
+
+NOW = datetime(2024, 6, 1, 12)
+
+
+def columns(seed: int = 1) -> ColumnGenerator:
+    return ColumnGenerator(np.random.default_rng(seed), NOW)
+
+
+def catalog_column(name: str, data_type: str, not_null: bool = True, generated: bool = False, serial: bool = False,
+                   default: bool = False, references: tuple = None) -> dict:
+    return {
+        "name": name,
+        "type": data_type,
+        "not_null": not_null,
+        "generated": generated,
+        "serial": serial,
+        "default": default,
+        "primary_key": serial,
+        "references": references
+    }
+
+
+def test_columns_are_drawn_after_the_columns_they_depend_on():
+    plan = RowPlan(TABLE_SPECS["work_orders"])
+    order = plan.order
+
+    assert order.index("reporting_date") < order.index("forecasted_date") < order.index("due_date")
+    assert plan.columns == tuple(TABLE_SPECS["work_orders"])
+
+
+def test_rows_respect_their_bounds():
+    plan = RowPlan(TABLE_SPECS["work_orders"])
+    pools = {
+        "aircrafts": np.array(["A1", "A2"]),
+        "maintenance_events": np.array([1, 2, 3]),
+        "airports": np.array(["ABC"]),
+        "reporteurs": np.array([7])
+    }
+
+    rows = plan(columns(), 500, pools)
+    positions = {column: index for index, column in enumerate(plan.columns)}
+
+    assert len(rows) == 500
+    for row in rows:
+        assert row[positions["due_date"]] >= row[positions["forecasted_date"]] >= row[positions["reporting_date"]]
+        assert row[positions["execution_date"]] >= row[positions["reporting_date"]]
+        assert 1 <= row[positions["frequency"]] <= 9
+        assert row[positions["aircraft_registration_number"]] in ("A1", "A2")
+
+
+def test_same_seed_gives_the_same_rows():
+    plan = RowPlan({"a": ("integers", 1, 100), "b": ("uniform", 0, 1, 2)})
+
+    assert plan(columns(3), 50, {}) == plan(columns(3), 50, {})
+
+
+def test_offsets_follow_their_column():
+    plan = RowPlan({"end": ("offset", "start", ("hours", 1, 12)), "start": ("datetimes", -365, 0)})
+    rows = plan(columns(), 100, {})
+
+    assert all(1 * 3600 <= (end - start).total_seconds() <= 12 * 3600 for end, start in rows)
+
+
+def test_invalid_plans_raise():
+    with pytest.raises(ValueError):
+        RowPlan({"a": ("unknown",)})
+    with pytest.raises(ValueError):
+        RowPlan({"a": ("dates", "b", 0)})
+    with pytest.raises(ValueError):
+        RowPlan({"a": ("dates", "b", 0), "b": ("dates", "a", 0)})
+
+
+def test_key_sources_are_collected():
+    plan = RowPlan(TABLE_SPECS["aircraft_slots"])
+
+    assert plan.key_sources["aircrafts"] == ("aircrafts", "aircraft_registration_number")
+    assert plan.key_sources["maintenance_events"] == ("maintenance_events", "maintenance_id")
+
+
+def test_complete_spec_leaves_database_columns_out_and_defaults_the_rest():
+    catalog = [
+        catalog_column("id", "integer", serial=True),
+        catalog_column("total", "numeric", generated=True),
+        catalog_column("created", "timestamp without time zone", default=True),
+        catalog_column("note", "text", not_null=False),
+        catalog_column("customer_id", "integer", references=("customers", "customer_id")),
+        catalog_column("code", "character varying(3)"),
+        catalog_column("name", "text")
+    ]
+
+    spec = complete_spec("orders", {"name": ("constant", "x")}, catalog)
+
+    assert spec == {
+        "customer_id": ("key", "customers", "customer_id"),
+        "code": ("text", 3),
+        "name": ("constant", "x")
+    }
+
+
+def test_complete_spec_rejects_unknown_and_generated_columns():
+    catalog = [catalog_column("id", "integer", serial=True)]
+
+    with pytest.raises(ValueError):
+        complete_spec("orders", {"missing": ("constant", 1)}, catalog)
+    with pytest.raises(ValueError):
+        complete_spec("orders", {"id": ("constant", 1)}, catalog)
+
+
+def test_default_spec_of_types():
+    assert default_spec("t", catalog_column("a", "numeric(5,2)")) == ("uniform", 0, 999, 2)
+    assert default_spec("t", catalog_column("a", "boolean")) == ("booleans",)
+    assert default_spec("t", catalog_column("a", "interval")) == ("hours", 1, 12)
+    with pytest.raises(ValueError):
+        default_spec("t", catalog_column("a", "point"))
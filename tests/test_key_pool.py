@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from postgres_orm.key_pool import KEY_SAMPLE_SIZE, KeyPool, KeyRange, KeyRanges
+
+
+def test_key_range_is_indexed_like_its_keys():
+    keys = KeyRange(10, 15)
+
+    assert len(keys) == 5
+    assert keys[0] == 10
+    assert keys[-1] == 14
+    assert keys[np.array([0, 4])].tolist() == [10, 14]
+    assert list(keys) == [10, 11, 12, 13, 14]
+    assert 12 in keys and 15 not in keys and "12" not in keys
+    with pytest.raises(IndexError):
+        keys[5]
+
+
+def test_key_range_follows_only_consecutive_keys():
+    keys = KeyRange(1, 4)
+
+    assert keys.follows([4, 5])
+    assert not keys.follows([5, 6])
+    assert not keys.follows([])
+
+
+def test_pool_keeps_a_range_while_keys_are_consecutive():
+    pool = KeyPool()
+    pool.load("customers", "customer_id", KeyRange(1, 11), 10)
+    pool.add("customers", "customer_id", [11, 12])
+
+    assert isinstance(pool.keys("customers"), KeyRange)
+    assert pool.row_count("customers") == 12
+    assert 12 in pool.keys("customers")
+
+
+def test_pool_falls_back_to_runs_on_a_gap():
+    pool = KeyPool()
+    pool.load("customers", "customer_id", KeyRange(1, 4), 3)
+    pool.add("customers", "customer_id", [10, 11])
+    pool.add("customers", "customer_id", [12, 20])
+
+    keys = pool.keys("customers")
+    assert isinstance(keys, KeyRanges)
+    assert keys.starts.tolist() == [1, 10, 20]
+    assert keys.tolist() == [1, 2, 3, 10, 11, 12, 20]
+    assert 10 in keys and 5 not in keys
+    assert pool.is_current("customers")
+    assert pool.row_count("customers") == 7
+
+
+def test_key_ranges_are_indexed_like_their_keys():
+    keys = KeyRanges.of([3, 4, 5, 9, 12, 13])
+
+    assert len(keys) == 6
+    assert keys[0] == 3
+    assert keys[3] == 9
+    assert keys[-1] == 13
+    assert keys[np.array([0, 2, 3, 4, 5])].tolist() == [3, 5, 9, 12, 13]
+    with pytest.raises(IndexError):
+        keys[6]
+
+
+def test_keys_out_of_order_leave_the_pool_to_be_loaded_again():
+    pool = KeyPool()
+    pool.load("customers", "customer_id", KeyRanges([1, 10], [4, 12]), 5)
+    pool.add("customers", "customer_id", [5])
+
+    assert not pool.is_current("customers")
+    assert pool.row_count("customers") == 6
+
+
+def test_a_list_pool_is_capped_at_the_sample_size():
+    pool = KeyPool()
+    pool.load("flights", "flight_number", ["AB1234"], 1)
+    pool.add("flights", "flight_number", ["CD5678"])
+    assert pool.keys("flights") == ["AB1234", "CD5678"]
+
+    pool.add("flights", "flight_number", [f"XX{number}" for number in range(KEY_SAMPLE_SIZE)])
+
+    assert not pool.is_current("flights")
+    assert len(pool.keys("flights")) == 2
+    assert pool.row_count("flights") == KEY_SAMPLE_SIZE + 2
+
+
+def test_adding_keys_of_another_column_invalidates_the_pool():
+    pool = KeyPool()
+    pool.load("flights", "flight_number", ["AB1234"], 1)
+    pool.add("flights", "origin", ["XYZ"])
+
+    assert not pool.is_loaded("flights", "flight_number")
@@ -0,0 +1,28 @@
+from datetime import date
+
+from postgres_orm.partitions import archive_cutoff, months_between, next_month, partition_month, partition_name
+
+
+def test_next_month_wraps_the_year():
+    assert next_month(date(2024, 12, 1)) == date(2025, 1, 1)
+    assert next_month(date(2024, 1, 1)) == date(2024, 2, 1)
+
+
+def test_months_between_includes_both_ends():
+    assert months_between(date(2024, 11, 15), date(2025, 1, 3)) == [
+        date(2024, 11, 1), date(2024, 12, 1), date(2025, 1, 1)
+    ]
+    assert months_between(date(2024, 2, 1), date(2024, 1, 31)) == []
+
+
+def test_partition_names_round_trip():
+    name = partition_name("customer_feedback_and_survey", date(2024, 3, 1))
+
+    assert name == "customer_feedback_and_survey_2024_03"
+    assert partition_month(name) == date(2024, 3, 1)
+    assert partition_month("customer_feedback_and_survey_default") is None
+
+
+def test_archive_cutoff_on_leap_day():
+    assert archive_cutoff(date(2024, 5, 10)) == date(2022, 5, 10)
+    assert archive_cutoff(date(2024, 2, 29)) == date(2022, 2, 28)
@@ -0,0 +1,65 @@
+import threading
+import time
+
+import pytest
+
+from postgres_orm.pipeline import ChunkPipeline, check_not_producer, chunked
+
+
+def test_chunked_keeps_the_order():
+    assert list(chunked(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_pipeline_yields_every_chunk_in_order():
+    pipeline = ChunkPipeline(iter(range(10)), 4, 2)
+
+    assert list(pipeline) == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+def test_producer_stays_within_the_queue_bound():
+    produced = []
+    lock = threading.Lock()
+
+    def rows():
+        for row in range(100):
+            with lock:
+                produced.append(row)
+            yield row
+
+    consumed = 0
+    for chunk in ChunkPipeline(rows(), 1, 2):
+        time.sleep(0.01)
+        consumed += len(chunk)
+        with lock:
+            # the queue, the chunk being produced and the chunk being written
+            assert len(produced) <= consumed + 2 + 1
+
+    assert consumed == 100
+
+
+def test_generator_errors_are_raised_in_the_writer():
+    def rows():
+        yield 1
+        raise KeyError("broken")
+
+    with pytest.raises(KeyError):
+        list(ChunkPipeline(rows(), 1, 2))
+
+
+def test_a_writer_stopping_early_stops_the_producer():
+    pipeline = ChunkPipeline(iter(range(1000)), 1, 2)
+    for _ in pipeline:
+        break
+
+    assert not [thread for thread in threading.enumerate() if thread.name == "chunk-producer"]
+
+
+def test_producers_can_not_use_the_connection():
+    def rows():
+        check_not_producer("Query")
+        yield 1
+
+    with pytest.raises(RuntimeError):
+        list(ChunkPipeline(rows(), 1, 2))
+    # the writer thread can
+    check_not_producer("Query")
@@ -0,0 +1,40 @@
+from postgres_orm.plans import find_regressions, summarize_explain
+
+
+def summary(milliseconds: float, seq_scans: list[str] = ()) -> dict:
+    return {"execution_time": milliseconds, "planning_time": 0.1, "seq_scans": list(seq_scans), "plan": {}}
+
+
+def test_summarize_explain_collects_seq_scans_of_all_nodes():
+    explain = [{
+        "Execution Time": 5.0,
+        "Planning Time": 0.5,
+        "Plan": {
+            "Node Type": "Hash Join",
+            "Plans": [
+                {"Node Type": "Seq Scan", "Relation Name": "bookings"},
+                {"Node Type": "Hash", "Plans": [{"Node Type": "Seq Scan", "Relation Name": "customers"}]}
+            ]
+        }
+    }]
+
+    result = summarize_explain(explain)
+
+    assert result["seq_scans"] == ["bookings", "customers"]
+    assert result["execution_time"] == 5.0
+
+
+def test_new_seq_scan_is_a_regression():
+    regressions = find_regressions({"Q1": summary(5)}, {"Q1": summary(5, ["bookings"])})
+
+    assert regressions == ["Q1: new Seq Scan on bookings"]
+
+
+def test_slowdown_is_a_regression_above_the_noise_floor():
+    assert len(find_regressions({"Q1": summary(10)}, {"Q1": summary(25)})) == 1
+    assert find_regressions({"Q1": summary(10)}, {"Q1": summary(15)}) == []
+    assert find_regressions({"Q1": summary(0.1)}, {"Q1": summary(0.9)}) == []
+
+
+def test_queries_without_baseline_are_skipped():
+    assert find_regressions({}, {"Q1": summary(100, ["bookings"])}) == []
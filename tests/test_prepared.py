@@ -0,0 +1,38 @@
+from postgres_orm.prepared import MAX_STATEMENT_PARAMETERS, batch_size, execute_statement, prepare_insert_statement
+from postgres_orm.sharding import write_prepared
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, query, params=None):
+        self.statements.append((query, params))
+
+
+def test_batches_stay_within_the_parameter_limit():
+    assert batch_size(500, 6) == 500
+    assert batch_size(500, 1000) == MAX_STATEMENT_PARAMETERS // 1000
+    assert batch_size(500, MAX_STATEMENT_PARAMETERS + 1) == 1
+
+
+def test_prepared_insert_numbers_the_parameters_row_by_row():
+    statement = prepare_insert_statement("fill_insert_0", "s", "t", ("a", "b"), 2, returning="id")
+
+    assert statement == 'PREPARE fill_insert_0 AS INSERT INTO s.t (a, b) VALUES ($1, $2), ($3, $4) RETURNING id'
+    assert execute_statement("fill_insert_0", 2, 2) == 'EXECUTE fill_insert_0 (%s, %s, %s, %s)'
+
+
+def test_shards_prepare_once_per_batch_size():
+    cursor = RecordingCursor()
+    prepared = {}
+    rows = [(key, "x") for key in range(5)]
+
+    write_prepared(cursor, "s", "t", ("id", "a"), rows, 2, prepared)
+    write_prepared(cursor, "s", "t", ("id", "a"), rows, 2, prepared)
+
+    prepares = [query for query, _ in cursor.statements if query.startswith("PREPARE")]
+    executed = [params for query, params in cursor.statements if query.startswith("EXECUTE")]
+    assert len(prepares) == 2
+    assert executed[:3] == [[0, "x", 1, "x"], [2, "x", 3, "x"], [4, "x"]]
+    assert len(executed) == 6
@@ -0,0 +1,19 @@
+from postgres_orm.queries import parse_query_file, read_sql_file
+
+
+def test_report_queries_are_split_by_their_headers():
+    queries = parse_query_file("section_A.sql")
+
+    assert list(queries) == [f'Q{number}' for number in range(1, 13)]
+    assert all(not query.endswith(";") for query in queries.values())
+
+
+def test_json_queries_are_named():
+    assert list(parse_query_file("section_B.sql")) == ["JQ1", "JQ2", "JQ3", "JQ4"]
+
+
+def test_schema_is_replaced():
+    content = read_sql_file("section_A.sql", "bench")
+
+    assert "airport_lab." not in content
+    assert "bench." in content
@@ -0,0 +1,27 @@
+from postgres_orm.scale import KEY_SPACE_LIMITS, SCALE_ROWS, conflict_rows, scaled_rows
+
+FIXED_ROWS = {"seat_classes": 240, "flight_statuses": 3}
+
+
+def test_tables_grow_with_the_scale_factor():
+    rows = scaled_rows(10, FIXED_ROWS)
+
+    assert rows["bookings"] == SCALE_ROWS["bookings"] * 10
+    assert rows["flight_statuses"] == 3
+    assert rows["seats"] == rows["flight_data"] * 240
+
+
+def test_small_scale_factors_keep_one_row():
+    assert scaled_rows(0.0001, FIXED_ROWS)["airlines"] == 1
+
+
+def test_random_key_tables_stop_at_half_of_their_key_space():
+    rows = scaled_rows(100000, FIXED_ROWS)
+
+    assert rows["airports"] == KEY_SPACE_LIMITS["airports"]
+    assert rows["flights"] == KEY_SPACE_LIMITS["flights"]
+
+
+def test_conflicts_are_a_share_of_the_events():
+    assert conflict_rows(100) == 20
+    assert conflict_rows(1) == 1
@@ -0,0 +1,117 @@
+import pickle
+
+import numpy as np
+
+from postgres_orm.seat_allocator import AllocatedSeats, PagedSeatAllocator, SeatAllocator
+
+# flight id -> (available_seating, free seat ids)
+FLIGHTS = {
+    1: (3, [10, 11, 12, 13, 14]),
+    2: (2, [20, 21]),
+    3: (4, [30, 31])
+}
+
+
+def allocator(seed: int = 0) -> SeatAllocator:
+    rows = [(flight_id, available, seats) for flight_id, (available, seats) in FLIGHTS.items()]
+
+    return SeatAllocator.from_rows(rows, np.random.default_rng(seed))
+
+
+def test_seats_are_unique_and_belong_to_their_flight():
+    seats = allocator()
+    flights, seat_ids = seats.allocate(np.random.default_rng(1), 100)
+
+    assert len(seat_ids) == len(set(seat_ids.tolist()))
+    for flight_id, seat_id in zip(flights.tolist(), seat_ids.tolist()):
+        assert seat_id in FLIGHTS[flight_id][1]
+
+
+def test_flights_are_capped_at_their_available_seating():
+    seats = allocator()
+
+    assert seats.free_seats() == 3 + 2 + 2
+    flights, _ = seats.allocate(np.random.default_rng(1), 100)
+
+    assert len(flights) == 7
+    assert np.bincount(flights)[1] == 3
+    assert seats.free_seats() == 0
+    assert len(seats.allocate(np.random.default_rng(2), 5)[0]) == 0
+
+
+def test_allocation_is_reproducible():
+    first = allocator(5).allocate(np.random.default_rng(9), 4)
+    second = allocator(5).allocate(np.random.default_rng(9), 4)
+
+    assert first[0].tolist() == second[0].tolist()
+    assert first[1].tolist() == second[1].tolist()
+
+
+def test_allocate_flights_books_the_given_flights():
+    seats = allocator()
+
+    booked = seats.allocate_flights([2, 2, 2, 4])
+
+    assert sorted(booked[:2]) == [20, 21]
+    assert booked[2:] == [None, None]
+    assert seats.free_seats() == 5
+
+
+def test_allocated_seats_hand_out_blocks_in_order():
+    seats = AllocatedSeats(np.array([1, 1, 2, 3]), np.array([10, 11, 20, 30]))
+
+    block = seats.block(1, 2)
+    assert block.allocate(None, 5)[1].tolist() == [11, 20]
+    assert seats.allocate(None, 3)[1].tolist() == [10, 11, 20]
+    assert seats.allocate(None, 3)[1].tolist() == [30]
+
+
+def paged(bookings: int, page_flights: int = 1) -> PagedSeatAllocator:
+    rows = [(flight_id, available, seats) for flight_id, (available, seats) in FLIGHTS.items()]
+    pages = []
+
+    def fetch_page(after):
+        page = [row for row in rows if row[0] > after][:page_flights]
+        pages.append(page)
+        return page
+
+    allocator = PagedSeatAllocator(fetch_page, 3 + 2 + 2, bookings, np.random.default_rng(0))
+    allocator.pages = pages
+
+    return allocator
+
+
+def test_paged_seats_are_shared_over_the_pages_by_their_free_seats():
+    seats = paged(4)
+    rng = np.random.default_rng(1)
+
+    first = seats.allocate(rng, 2)
+    # only the pages needed for a chunk are read
+    assert len(seats.pages) == 1
+    rest = seats.allocate(rng, 10)
+
+    flights = np.concatenate((first[0], rest[0]))
+    seat_ids = np.concatenate((first[1], rest[1]))
+    assert len(seat_ids) == 4 == len(set(seat_ids.tolist()))
+    # 4 of 7 free seats: round(4 * 3 / 7) on the first flight, round(2 * 2 / 4) and the last one on the others
+    assert np.bincount(flights, minlength=4)[1:].tolist() == [2, 1, 1]
+    for flight_id, seat_id in zip(flights.tolist(), seat_ids.tolist()):
+        assert seat_id in FLIGHTS[flight_id][1]
+
+
+def test_paged_seats_stop_at_the_free_seats():
+    seats = paged(100, page_flights=2)
+
+    assert seats.bookings == 7
+    assert len(seats.allocate(np.random.default_rng(1), 100)[1]) == 7
+    assert len(seats.allocate(np.random.default_rng(1), 100)[1]) == 0
+
+
+def test_spooled_seats_are_pickled_as_their_file(tmp_path):
+    path = str(tmp_path / "seats.npy")
+    seats = AllocatedSeats.spool(paged(100), np.random.default_rng(1), 10, path, chunk_size=3)
+
+    assert len(seats) == 7
+    restored = pickle.loads(pickle.dumps(seats))
+    assert len(pickle.dumps(seats)) < 200
+    assert restored.block(2, 3).seat_ids.tolist() == seats.seat_ids[2:5].tolist()
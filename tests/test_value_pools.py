@@ -0,0 +1,36 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from postgres_orm.value_pools import ValuePools
+
+
+def test_seeded_pools_are_written_once_and_reproducible(tmp_path):
+    pools = ValuePools(7, size=50, directory=str(tmp_path))
+    first = pools.draw(np.random.default_rng(1), "name", 20).tolist()
+
+    assert os.path.exists(pools.path)
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
+    assert ValuePools(7, size=50, directory=str(tmp_path)).draw(np.random.default_rng(1), "name", 20).tolist() == first
+
+
+def test_unseeded_pools_stay_in_memory(tmp_path):
+    pools = ValuePools(size=20, directory=str(tmp_path))
+    pools.draw(np.random.default_rng(1), "city", 5)
+
+    assert os.listdir(tmp_path) == []
+    restored = pickle.loads(pickle.dumps(pools))
+    assert restored.draw(np.random.default_rng(1), "city", 5).tolist() == pools.draw(np.random.default_rng(1), "city", 5).tolist()
+
+
+def test_templates_mix_the_given_kinds(tmp_path):
+    pools = ValuePools(1, size=20, directory=str(tmp_path))
+    emails = pools.compose(np.random.default_rng(1), "{}{}@google.com", ("user_name", "digits"), 10).tolist()
+
+    assert all(email.endswith("@google.com") for email in emails)
+    with pytest.raises(ValueError):
+        pools.compose(np.random.default_rng(1), "{} {}", ("city",), 1)
+    with pytest.raises(ValueError):
+        pools.draw(np.random.default_rng(1), "unknown", 1)
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import numpy as np
+
+from postgres_orm.vectorized import ColumnGenerator, flight_data_rows, seats_rows
+
+NOW = datetime(2024, 6, 1, 12)
+
+
+def columns(seed: int = 1) -> ColumnGenerator:
+    return ColumnGenerator(np.random.default_rng(seed), NOW)
+
+
+def test_integers_include_both_ends():
+    values = columns().integers(1, 3, 1000)
+
+    assert set(values.tolist()) == {1, 2, 3}
+
+
+def test_dates_and_datetimes_stay_between_their_bounds():
+    generator = columns()
+    start = generator.today
+    end = start + np.timedelta64(2, 'D')
+
+    dates = generator.dates_between(start, end, 1000)
+    datetimes = generator.datetimes_between(generator.now, generator.now + np.timedelta64(1, 'h'), 1000)
+
+    assert dates.min() == start and dates.max() == end
+    assert (datetimes >= generator.now).all() and (datetimes <= generator.now + np.timedelta64(1, 'h')).all()
+
+
+def test_times_are_valid_times_of_day():
+    times = columns().times(100)
+
+    assert all(0 <= value.hour < 24 for value in times)
+
+
+def test_flight_data_passengers_fit_the_aircraft():
+    pools = {
+        "aircrafts": np.array(["A1", "A2"]),
+        "capacities": np.array([100, 200]),
+        "flights": np.array(["F1"]),
+        "flight_statuses": np.array(["On time", "Delayed", "Cancelled"]),
+        "problems": np.array([1, 2, 3])
+    }
+
+    rows = flight_data_rows(columns(), 500, pools)
+
+    capacities = {"A1": 100, "A2": 200}
+    for _, aircraft, _, _, passengers, _, _, available, _, _ in rows:
+        assert passengers in (capacities[aircraft], int(0.9 * capacities[aircraft]))
+        assert passengers + available == capacities[aircraft]
+
+
+def test_seats_rows_are_the_cross_join_of_flights_and_seat_classes():
+    pools = {"seat_classes": np.array(["1A", "1B", "2A"]), "flight_data": np.array([10, 11])}
+
+    rows = seats_rows(0, 4, pools) + seats_rows(4, 2, pools)
+
+    assert rows == [(seat, "Available", flight) for flight in (10, 11) for seat in ("1A", "1B", "2A")]